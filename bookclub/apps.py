@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BookClubConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bookclub'
+
+    def ready(self):
+        from bookclub import signals
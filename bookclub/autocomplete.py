@@ -0,0 +1,178 @@
+"""A per-process prefix index of book titles and authors for the search box's suggestions.
+
+Titles are normalized to lower case words without accents or punctuation and indexed under every word they
+contain from that word to the end of the title, and under their author, so "hobb" and "tolkien" both suggest
+The Hobbit. The keys are held in one sorted list with the rank by popularity of their title alongside, so a prefix
+is a range found with two bisects and its suggestions are the best ranks in it. The few prefixes whose ranges are
+too long to scan have their suggestions worked out when the index is built.
+
+build_autocomplete, seeding and importing books save the index to AUTOCOMPLETE_INDEX_PATH. Each process loads it
+on the first suggestion and loads it again once the file is rebuilt, checking at most every
+AUTOCOMPLETE_CHECK_SECONDS. Without the file, the index is built from the database instead, and built again when
+the number or last id of the books or ratings has changed since.
+"""
+import bisect
+import heapq
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from django.conf import settings
+from django.db.models import Count, Max
+from bookclub.models import Book, Rating
+
+INDEX_FORMAT = 1
+SUGGESTIONS = 5
+SCAN_LIMIT = 256
+MAX_KEY_WORDS = 8
+MAX_KEY_LENGTH = 64
+KEY_END = '\U0010ffff'
+
+logger = logging.getLogger(__name__)
+
+_loaded = {'index': None, 'version': None, 'checked_at': 0.0, 'lock': threading.Lock()}
+
+
+def normalize(text):
+    """ Lower case words without accents or punctuation, separated by single spaces """
+
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(character for character in text if not unicodedata.combining(character))
+    return ' '.join(re.findall(r'[^\W_]+', text))
+
+
+def keys_of(text):
+    """ The text from each of its first words to its end, as far as MAX_KEY_LENGTH """
+
+    words = normalize(text).split(' ')
+    return {' '.join(words[start:])[:MAX_KEY_LENGTH] for start in range(min(len(words), MAX_KEY_WORDS))} - {''}
+
+
+def build_index():
+    """ Index the title and author of every book, titles ranked by the number of ratings of their books """
+
+    ratings = dict(Rating.objects.filter(book__isnull=False).order_by().values('book')
+                   .annotate(count=Count('id')).values_list('book', 'count'))
+    popularity, keys = {}, {}
+    for book_id, title, author in Book.objects.values_list('id', 'title', 'author').iterator(chunk_size=10000):
+        popularity[title] = popularity.get(title, 0) + ratings.get(book_id, 0)
+        keys.setdefault(title, set()).update(keys_of(title) | keys_of(author))
+    titles = sorted(popularity, key=lambda title: (-popularity[title], title))
+    entries = sorted((key, rank) for rank, title in enumerate(titles) for key in keys[title])
+    index = {
+        'format': INDEX_FORMAT,
+        'titles': titles,
+        'keys': [key for key, rank in entries],
+        'ranks': array('l', [rank for key, rank in entries]),
+    }
+    index['top'] = long_prefixes(index['keys'], index['ranks'])
+    return index
+
+
+def long_prefixes(keys, ranks):
+    """ The best ranks under each prefix whose range of keys is longer than SCAN_LIMIT """
+
+    top = {}
+    stack = [('', 0, len(keys))]
+    while stack:
+        prefix, low, high = stack.pop()
+        if high - low <= SCAN_LIMIT:
+            continue
+        if prefix:
+            top[prefix] = heapq.nsmallest(SUGGESTIONS, set(ranks[low:high]))
+        start = bisect.bisect_right(keys, prefix, low, high)
+        while start < high:
+            extended = keys[start][:len(prefix) + 1]
+            end = bisect.bisect_left(keys, extended + KEY_END, start, high)
+            stack.append((extended, start, end))
+            start = end
+    return top
+
+
+def save_index(index, path=None):
+    path = path or settings.AUTOCOMPLETE_INDEX_PATH
+    with open(f'{path}.tmp', 'wb') as file:
+        pickle.dump(index, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f'{path}.tmp', path)
+
+
+def rebuild_saved_index():
+    """ Build the index and save it to AUTOCOMPLETE_INDEX_PATH, for the processes to load. Does nothing without one """
+
+    if settings.AUTOCOMPLETE_INDEX_PATH:
+        save_index(build_index())
+
+
+def index_version(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def database_version():
+    """ The counts and last ids of the books and ratings, which change when an index built from them goes stale """
+
+    books = Book.objects.aggregate(count=Count('id'), last=Max('id'))
+    ratings = Rating.objects.aggregate(count=Count('id'), last=Max('id'))
+    return books['count'], books['last'], ratings['count'], ratings['last']
+
+
+def load_index(path):
+    try:
+        with open(path, 'rb') as file:
+            index = pickle.load(file)
+        return index if index.get('format') == INDEX_FORMAT else None
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def get_index():
+    """ This process's index, loaded again when the saved index has been rebuilt since it was loaded, or built again
+    from the database when there is no saved index and the books or ratings have changed """
+
+    now = time.monotonic()
+    if _loaded['index'] is not None and now - _loaded['checked_at'] < settings.AUTOCOMPLETE_CHECK_SECONDS:
+        return _loaded['index']
+    with _loaded['lock']:
+        path = settings.AUTOCOMPLETE_INDEX_PATH
+        saved = index_version(path)
+        version = saved if saved is not None else database_version()
+        if _loaded['index'] is None or version != _loaded['version']:
+            index = load_index(path) if saved is not None else None
+            if index is None:
+                if path:
+                    logger.warning('No autocomplete index at %s, building it from the database', path)
+                index = build_index()
+            _loaded['index'], _loaded['version'] = index, version
+        _loaded['checked_at'] = now
+    return _loaded['index']
+
+
+def refresh():
+    """ Forget this process's index, so the next suggestion loads or builds it again """
+
+    with _loaded['lock']:
+        _loaded['index'] = None
+        _loaded['version'] = None
+
+
+def suggest(term, limit=SUGGESTIONS):
+    """ The titles of the most popular books with a title word, or their author, starting with the term """
+
+    prefix = normalize(term)
+    if not prefix:
+        return []
+    index = get_index()
+    keys = index['keys']
+    low = bisect.bisect_left(keys, prefix)
+    high = bisect.bisect_left(keys, prefix + KEY_END, low)
+    if high - low > SCAN_LIMIT and limit <= SUGGESTIONS:
+        ranks = index['top'][prefix]
+    else:
+        ranks = heapq.nsmallest(limit, set(index['ranks'][low:high]))
+    return [index['titles'][rank] for rank in ranks[:limit]]
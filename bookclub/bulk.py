@@ -0,0 +1,48 @@
+"""Bulk inserts of plain row tuples for the seeder and the importers.
+
+bulk_create spends most of its time building a model instance per row and, on SQLite, is held to a few hundred
+rows a statement by the bound parameter limit. insert_rows instead streams the rows to PostgreSQL with COPY and
+runs one prepared INSERT over batches of them elsewhere. The rows skip save signals and field defaults, so every
+column without a database default must be given, either in the rows or as a constant.
+"""
+import csv
+import io
+from django.db import connection
+
+INSERT_BATCH_SIZE = 5000
+
+
+def copy_rows(table, columns, rows):
+    """ Load rows with COPY, the fastest path on PostgreSQL """
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(f'COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def insert_rows(model, field_names, rows, constants=None, batch_size=INSERT_BATCH_SIZE):
+    """ Insert tuples of the values of field_names into the model's table, each followed by the constants, a dict
+    of values shared by every row """
+
+    constants = constants or {}
+    fields = [model._meta.get_field(name) for name in list(field_names) + list(constants)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    constant_values = tuple(constants.values())
+    if connection.vendor == 'postgresql':
+        copy_rows(table, columns, (tuple(row) + constant_values for row in rows))
+        return
+
+    rows = list(rows)
+    dates = [position for position, field in enumerate(fields) if field.get_internal_type() == 'DateTimeField']
+    adapt = connection.ops.adapt_datetimefield_value
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(fields))})"
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = [tuple(row) + constant_values for row in rows[start:start + batch_size]]
+            if dates:
+                batch = [tuple(adapt(value) if position in dates else value for position, value in enumerate(row))
+                         for row in batch]
+            cursor.executemany(sql, batch)
@@ -0,0 +1,17 @@
+"""Template context shared by every page."""
+from django.utils.functional import SimpleLazyObject
+from bookclub.inbox import unread_count
+from bookclub.viewer import ViewerState
+
+
+def inbox(request):
+    """ The unread message count of the inbox badge, read from the user's counter only when a template shows it """
+
+    return {'inbox_count': SimpleLazyObject(
+        lambda: unread_count(request.user) if request.user.is_authenticated else 0)}
+
+
+def viewer(request):
+    """ The viewer state that book, user and club lists mark their rows from, loaded once per request as needed """
+
+    return {'viewer': ViewerState(request.user)}
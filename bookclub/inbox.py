@@ -0,0 +1,99 @@
+"""Unread message counts kept up to date as messages are sent and read.
+
+The inbox badge on every page reads a user's count from their UnreadCount row, so rendering it never writes. The
+row is moved with an F() update when a message to the user is created or deleted unread, and when a chat is opened
+and its messages are marked read in one UPDATE. Changes the counters do not see, such as messages inserted without
+the ORM or a single message saved with a different is_read, are put right by reconcile, which the
+reconcile_unread_counts command runs.
+
+The inbox lists a user's chats a page at a time, most recently active first. The other participant and unread
+count of each chat are read in the same query as the chats, and their last messages in one more.
+"""
+from datetime import datetime
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateTimeField, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from bookclub.models import Chat, Message, UnreadCount
+from bookclub.pagination import CursorPaginator
+
+NO_MESSAGES_DATE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def unread_count(user):
+    """ The number of unread messages received by the user """
+
+    return UnreadCount.objects.filter(user_id=user.pk).values_list('count', flat=True).first() or 0
+
+
+def add_unread(user_id, change):
+    """ Move the user's unread count by change, creating their counter the first time it goes up. A counter that
+    drifted below the messages taken off it stops at 0, and a missing one is not created to go down """
+
+    if UnreadCount.objects.filter(user_id=user_id).update(count=Greatest(F('count') + change, 0)) or change <= 0:
+        return
+    try:
+        with transaction.atomic():
+            UnreadCount.objects.create(user_id=user_id, count=change)
+    except IntegrityError:
+        UnreadCount.objects.filter(user_id=user_id).update(count=F('count') + change)
+
+
+def mark_chat_read(chat, user):
+    """ Mark the messages the user received in a chat as read, in one UPDATE. Returns how many were unread """
+
+    with transaction.atomic():
+        read = Message.objects.filter(chat=chat, receiver_user=user, is_read=False).update(is_read=True)
+        if read:
+            add_unread(user.pk, -read)
+    return read
+
+
+def reconcile():
+    """ Recount the unread messages of every user and fix the counters that drifted. Returns how many were fixed.
+    The counters are locked before the messages are counted, so a message sent or read meanwhile waits to move its
+    counter until the recount is saved rather than being counted twice or not at all """
+
+    with transaction.atomic():
+        stored = dict(UnreadCount.objects.select_for_update().values_list('user_id', 'count'))
+        actual = dict(Message.objects.filter(is_read=False).order_by().values('receiver_user')
+                      .annotate(unread=Count('id')).values_list('receiver_user', 'unread'))
+        drifted = [user_id for user_id in actual.keys() | stored.keys()
+                   if actual.get(user_id, 0) != stored.get(user_id)]
+        stale = [user_id for user_id in drifted if user_id in stored]
+        for user_id in stale:
+            UnreadCount.objects.filter(user_id=user_id).update(count=actual.get(user_id, 0))
+        UnreadCount.objects.bulk_create([UnreadCount(user_id=user_id, count=actual[user_id])
+                                         for user_id in drifted if user_id not in stored], batch_size=1000,
+                                        ignore_conflicts=True)
+    return len(drifted)
+
+
+def user_chats(user):
+    """ The user's chats, each annotated with the id and date of its last message, 0 and NO_MESSAGES_DATE when it
+    has none, and the number of its messages the user has not read """
+
+    messages = Message.objects.filter(chat=OuterRef('pk')).order_by()
+    last_message = messages.order_by('-date', '-id')[:1]
+    unread = messages.filter(receiver_user=user, is_read=False).values('chat').annotate(unread=Count('id'))
+    return (Chat.objects.filter(Q(user=user) | Q(receiver=user))
+            .select_related('user', 'receiver')
+            .annotate(last_message_id=Coalesce(Subquery(last_message.values('id')), Value(0),
+                                               output_field=IntegerField()),
+                      last_message_date=Coalesce(Subquery(last_message.values('date')), Value(NO_MESSAGES_DATE),
+                                                 output_field=DateTimeField()),
+                      unread=Coalesce(Subquery(unread.values('unread')), Value(0), output_field=IntegerField())))
+
+
+def inbox_page(user, cursor=None):
+    """ The page of the user's chats a cursor points to, most recently active first, each with the other
+    participant as chat.other and its last message as chat.last_message """
+
+    paginator = CursorPaginator(user_chats(user), settings.USERS_PER_PAGE, ('-last_message_date', '-id'))
+    page = paginator.get_page(cursor)
+    last_messages = Message.objects.in_bulk([chat.last_message_id for chat in page if chat.last_message_id])
+    for chat in page:
+        chat.other = chat.user if chat.receiver_id == user.pk else chat.receiver
+        chat.last_message = last_messages.get(chat.last_message_id)
+    return page
@@ -0,0 +1,264 @@
+"""Load tests that drive the real views with many logged in synthetic users.
+
+Every virtual user belongs to one thread and makes its requests through its own client, either a Django test
+client calling the app in this process or a local HTTP client calling a running server with the same database.
+Each request picks a scenario by weight. The test client also counts the database queries of every request.
+"""
+import math
+import platform
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.test import Client
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from bookclub.models import User, Book, Club, Chat
+
+LOADTEST_RESULTS_PATH = 'data/loadtest.json'
+POOL_SIZE = 1000
+SEARCH_TERMS = 200
+MAX_SKIPPED = 1000
+
+
+def home(rng, user, pools):
+    return 'GET', reverse('home'), None
+
+
+def book_list(rng, user, pools):
+    return 'GET', f"{reverse('book_list')}?page={rng.randint(1, pools['book_pages'])}", None
+
+
+def book_profile(rng, user, pools):
+    return 'GET', reverse('book_profile', args=[rng.choice(pools['book_ids'])]), None
+
+
+def search_page(rng, user, pools):
+    return 'POST', reverse('search_page'), {'query': rng.choice(pools['search_terms'])}
+
+
+def inbox(rng, user, pools):
+    return 'GET', reverse('inbox'), None
+
+
+def chat(rng, user, pools):
+    if not user['chat_ids']:
+        return None
+    return 'GET', reverse('chat', args=[rng.choice(user['chat_ids'])]), None
+
+
+def club_profile(rng, user, pools):
+    if not pools['club_ids']:
+        return None
+    return 'GET', reverse('club_profile', args=[rng.choice(pools['club_ids'])]), None
+
+
+def club_members(rng, user, pools):
+    club_ids = user['club_ids'] or pools['club_ids']
+    if not club_ids:
+        return None
+    return 'GET', reverse('club_members', args=[rng.choice(club_ids)]), None
+
+
+def feed(rng, user, pools):
+    if not user['club_ids']:
+        return None
+    return 'GET', reverse('feed', args=[rng.choice(user['club_ids'])]), None
+
+
+def user_feed(rng, user, pools):
+    return 'GET', reverse('user_feed', args=[rng.choice(user['followee_ids'] or pools['user_ids'])]), None
+
+
+SCENARIOS = {
+    'home': (10, home),
+    'book_list': (15, book_list),
+    'book_profile': (10, book_profile),
+    'search_page': (10, search_page),
+    'inbox': (10, inbox),
+    'chat': (10, chat),
+    'club_profile': (5, club_profile),
+    'club_members': (10, club_members),
+    'feed': (10, feed),
+    'user_feed': (10, user_feed),
+}
+
+
+def load_pools(rng):
+    """ Random samples of the books, clubs and users to visit, the number of pages of books and words from book
+    titles to search for """
+
+    def sample(ids):
+        ids = list(ids)
+        return rng.sample(ids, min(POOL_SIZE, len(ids)))
+
+    all_book_ids = list(Book.objects.values_list('id', flat=True))
+    book_ids = sample(all_book_ids)
+    titles = Book.objects.filter(id__in=book_ids[:SEARCH_TERMS]).values_list('title', flat=True)
+    words = [word for title in titles for word in title.split() if len(word) > 3]
+    return {
+        'book_ids': book_ids,
+        'book_pages': max(1, math.ceil(len(all_book_ids) / settings.BOOKS_PER_PAGE)),
+        'club_ids': sample(Club.objects.values_list('id', flat=True)),
+        'user_ids': sample(User.objects.filter(is_active=True).values_list('id', flat=True)),
+        'search_terms': rng.sample(words, min(SEARCH_TERMS, len(words))) or ['book'],
+    }
+
+
+def load_virtual_users(count, rng):
+    """ count active users with the chats, clubs and followees they would visit """
+
+    user_ids = list(User.objects.filter(is_active=True).values_list('id', flat=True))
+    virtual_users = []
+    for user in User.objects.filter(id__in=rng.sample(user_ids, min(count, len(user_ids)))):
+        virtual_users.append({
+            'user': user,
+            'chat_ids': list(Chat.objects.filter(Q(user=user) | Q(receiver=user)).values_list('id', flat=True)),
+            'club_ids': list(user.memberships.values_list('club_id', flat=True)),
+            'followee_ids': list(user.followees.values_list('id', flat=True)),
+        })
+    return virtual_users
+
+
+class QueryCounter:
+    """Counts the queries run on a connection without logging them, as CaptureQueriesContext would"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class InProcessClient:
+    """Calls the views in this process, counting the queries of every request"""
+
+    def __init__(self, user, host):
+        self.client = Client(SERVER_NAME=host)
+        self.client.force_login(user)
+
+    def request(self, method, path, data):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            if method == 'POST':
+                response = self.client.post(path, data)
+            else:
+                response = self.client.get(path)
+        return response.status_code, counter.count
+
+
+class HttpClient:
+    """Calls a running server over HTTP with a session made for the user, so no password is needed"""
+
+    def __init__(self, user, base_url):
+        self.base_url = base_url.rstrip('/')
+        client = Client()
+        client.force_login(user)
+        self.csrf_token = get_random_string(64)
+        cookies = {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value,
+                   settings.CSRF_COOKIE_NAME: self.csrf_token}
+        self.cookie = '; '.join(f'{name}={value}' for name, value in cookies.items())
+        self.opener = urllib.request.build_opener(NoRedirect)
+
+    def request(self, method, path, data):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                         headers={'Cookie': self.cookie, 'X-CSRFToken': self.csrf_token})
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def run_thread(virtual_users, pools, make_client, scenarios, requests, rng, samples):
+    """ Make requests as the virtual users, appending (scenario, status, seconds, queries) to samples """
+
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+    clients = {}
+    skipped = 0
+    while requests > 0 and skipped < MAX_SKIPPED:
+        user = rng.choice(virtual_users)
+        name = rng.choices(names, weights)[0]
+        request = scenarios[name][1](rng, user, pools)
+        if request is None:
+            skipped += 1
+            continue
+        skipped = 0
+        if user['user'].id not in clients:
+            clients[user['user'].id] = make_client(user['user'])
+        start_time = time.perf_counter()
+        try:
+            status, queries = clients[user['user'].id].request(*request)
+        except Exception:
+            status, queries = 500, None
+        samples.append((name, status, time.perf_counter() - start_time, queries))
+        requests -= 1
+
+
+def run_worker(*args):
+    try:
+        run_thread(*args)
+    finally:
+        connection.close()
+
+
+def run_load(virtual_users, pools, make_client, scenarios=SCENARIOS, requests=1000, threads=8, seed=0):
+    """ Spread the requests and the virtual users over the threads. Returns the samples and the wall time """
+
+    threads = max(1, min(threads, len(virtual_users)))
+    samples = []
+    start_time = time.perf_counter()
+    if threads == 1:
+        run_thread(virtual_users, pools, make_client, scenarios, requests, random.Random(seed), samples)
+    else:
+        workers = [threading.Thread(target=run_worker, args=(
+            virtual_users[number::threads], pools, make_client, scenarios,
+            requests // threads + (number < requests % threads), random.Random(f'{seed}:{number}'), samples))
+            for number in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return samples, time.perf_counter() - start_time
+
+
+def summarise(samples, wall_seconds):
+    """ Per scenario: requests, errors, throughput, latency percentiles and queries per request """
+
+    summary = {}
+    for name in sorted({sample[0] for sample in samples}):
+        rows = [sample for sample in samples if sample[0] == name]
+        seconds = np.array([row[2] for row in rows])
+        queries = [row[3] for row in rows if row[3] is not None]
+        summary[name] = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if row[1] >= 400),
+            'requests_per_second': len(rows) / wall_seconds,
+            'mean_ms': float(seconds.mean() * 1000),
+            'p50_ms': float(np.percentile(seconds, 50) * 1000),
+            'p95_ms': float(np.percentile(seconds, 95) * 1000),
+            'p99_ms': float(np.percentile(seconds, 99) * 1000),
+            'mean_queries': float(np.mean(queries)) if queries else None,
+            'max_queries': max(queries) if queries else None,
+        }
+    return summary
+
+
+def environment():
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'database': connection.vendor,
+            'users': User.objects.count(), 'books': Book.objects.count(), 'clubs': Club.objects.count()}
@@ -0,0 +1,101 @@
+import itertools
+import json
+import random
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bookclub.models import Book
+from bookclub.search import backend, icontains, match_ids, reindex
+
+SEARCH_BENCHMARK_RESULTS_PATH = 'data/search_benchmark.json'
+VOCABULARY_SIZE = 20000
+WORDS_PER_TITLE = 4
+LATENCY_SAMPLES = 50
+
+
+class Rollback(Exception):
+    """Raised to roll the synthetic books back once they are measured"""
+
+
+def make_words(rng, count):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def generate_books(count, rng):
+    """ Books whose title and author words follow a power law, as real catalogues do. Returns the books and the
+    vocabulary by rank """
+
+    words = make_words(rng, VOCABULARY_SIZE)
+    weights = list(itertools.accumulate(1 / rank ** 0.9 for rank in range(1, len(words) + 1)))
+    books = []
+    for number in range(count):
+        title = ' '.join(rng.choices(words, cum_weights=weights, k=WORDS_PER_TITLE)).title()
+        author = ' '.join(rng.choices(words, cum_weights=weights, k=2)).title()
+        books.append(Book(isbn=f'B{number:011d}', title=title, author=author, pub_year=rng.randint(1900, 2022),
+                          publisher=rng.choice(words).title(), small_url='http://example.com/s.jpg',
+                          medium_url='http://example.com/m.jpg', large_url='http://example.com/l.jpg'))
+    return books, words
+
+
+def make_queries(rng, words, count):
+    """ Common words, rare words, word prefixes and two word queries, in equal parts """
+
+    common, rare = words[:200], words[-5000:]
+    kinds = [lambda: rng.choice(common), lambda: rng.choice(rare), lambda: rng.choice(common)[:3],
+             lambda: f'{rng.choice(common)} {rng.choice(words[:2000])}']
+    return [kinds[number % len(kinds)]() for number in range(count)]
+
+
+def measure(run, queries):
+    latencies = []
+    for query in queries:
+        start_time = time.perf_counter()
+        run(query)
+        latencies.append(time.perf_counter() - start_time)
+    return {'p50_ms': float(np.percentile(latencies, 50) * 1000),
+            'p99_ms': float(np.percentile(latencies, 99) * 1000),
+            'mean_ms': float(np.mean(latencies) * 1000)}
+
+
+class Command(BaseCommand):
+    """Compare the full-text search index with the icontains scans it replaced, on synthetic books inserted in a
+    transaction that is rolled back afterwards"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000, help='Synthetic books to search. Defaults to 100k.')
+        parser.add_argument('--queries', type=int, default=LATENCY_SAMPLES, help='Queries timed on each path.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic books and queries.')
+        parser.add_argument('--output', default=SEARCH_BENCHMARK_RESULTS_PATH, help='Where to write the JSON results.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        books, words = generate_books(options['books'], rng)
+        queries = make_queries(rng, words, options['queries'])
+        report = {}
+        try:
+            with transaction.atomic():
+                start_time = time.perf_counter()
+                Book.objects.bulk_create(books, batch_size=1000)
+                report['insert_seconds'] = time.perf_counter() - start_time
+                start_time = time.perf_counter()
+                reindex([Book])
+                report['reindex_seconds'] = time.perf_counter() - start_time
+                report['books'] = Book.objects.count()
+                report['backend'] = backend()
+                report['full_text'] = measure(lambda query: match_ids(Book, query, 0, 11), queries)
+                report['icontains'] = measure(lambda query: list(icontains(Book, query)[:11]), queries)
+                raise Rollback
+        except Rollback:
+            pass
+
+        for path in ['full_text', 'icontains']:
+            self.stdout.write(f"{path}: p50 {report[path]['p50_ms']:.2f}ms, p99 {report[path]['p99_ms']:.2f}ms, "
+                              f"mean {report[path]['mean_ms']:.2f}ms over {report['books']} books")
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
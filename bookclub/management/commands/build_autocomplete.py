@@ -0,0 +1,18 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from bookclub.autocomplete import build_index, save_index
+
+
+class Command(BaseCommand):
+    """Build the prefix index of book titles and authors the search box suggests from"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.AUTOCOMPLETE_INDEX_PATH, help='Where to save the index.')
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        index = build_index()
+        save_index(index, options['output'])
+        self.stdout.write(f"Indexed {len(index['titles'])} titles under {len(index['keys'])} keys in "
+                          f"{time.perf_counter() - start_time:.1f}s")
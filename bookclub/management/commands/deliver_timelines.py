@@ -0,0 +1,14 @@
+import time
+from django.core.management.base import BaseCommand
+from bookclub.timelines import deliver_missed, trim
+
+
+class Command(BaseCommand):
+    """Push the posts that were never delivered to the timelines of their readers, meant to be run periodically"""
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        reader_ids = deliver_missed()
+        trim(sorted(reader_ids))
+        self.stdout.write(f'Delivered the missed posts to {len(reader_ids)} timelines in '
+                          f'{time.perf_counter() - start_time:.1f}s')
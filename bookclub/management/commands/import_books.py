@@ -0,0 +1,88 @@
+import os
+import time
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from bookclub.models import Book
+from bookclub.autocomplete import rebuild_saved_index
+from bookclub.search import reindex
+
+BOOKS_CSV_PATH = 'data/BX_Books.csv'
+RATINGS_CSV_PATH = 'data/BX-Book-Ratings.csv'
+MIN_RATINGS = 5
+BATCH_SIZE = 2000
+BOOK_FIELDS = ['title', 'author', 'pub_year', 'publisher', 'small_url', 'medium_url', 'large_url']
+BX_COLUMNS = {'book_title': 'title', 'book_author': 'author', 'year_of_publication': 'pub_year',
+              'image_url_s': 'small_url', 'image_url_m': 'medium_url', 'image_url_l': 'large_url'}
+
+
+def read_bx_csv(path, **kwargs):
+    dataframe = pd.read_csv(path, sep=';', on_bad_lines='skip', encoding="latin-1", **kwargs)
+    dataframe.columns = dataframe.columns.str.strip().str.lower().str.replace('-', '_')
+    return dataframe
+
+
+def catalogue_books(books, ratings, min_ratings=MIN_RATINGS):
+    """ Books published between 1800 and 2022 with more than min_ratings explicit ratings, keyed by upper case ISBN """
+
+    explicit = ratings[ratings.book_rating != 0]
+    counts = explicit.isbn.value_counts()
+    popular = counts[counts > min_ratings].index
+
+    books = books.assign(year_of_publication=pd.to_numeric(books.year_of_publication, errors='coerce'))
+    books = books[books.year_of_publication.between(1800, 2022) & books.isbn.isin(popular)]
+    books = books.rename(columns=BX_COLUMNS).assign(isbn=books.isbn.str.upper())
+    books = books.drop_duplicates('isbn')[['isbn'] + BOOK_FIELDS]
+    books[BOOK_FIELDS] = books[BOOK_FIELDS].fillna('')
+    return books.astype({'pub_year': 'int64'}).set_index('isbn')
+
+
+def existing_books(isbns):
+    """ The id and fields of the books already stored, keyed by ISBN """
+
+    rows = Book.objects.values_list('isbn', 'id', *BOOK_FIELDS).iterator(chunk_size=10000)
+    existing = pd.DataFrame(list(rows), columns=['isbn', 'id'] + BOOK_FIELDS).set_index('isbn')
+    return existing[existing.index.isin(isbns)]
+
+
+def import_catalogue(books_path=BOOKS_CSV_PATH, ratings_path=RATINGS_CSV_PATH, min_ratings=MIN_RATINGS):
+    """ Create the books that are new and update the ones that changed. Returns (created, updated, unchanged) """
+
+    books = catalogue_books(read_bx_csv(books_path, dtype={'ISBN': str}),
+                            read_bx_csv(ratings_path, usecols=['ISBN', 'Book-Rating'], dtype={'ISBN': str}),
+                            min_ratings)
+    existing = existing_books(books.index)
+
+    new = books[~books.index.isin(existing.index)]
+    stored = books.loc[existing.index]
+    changed = (stored[BOOK_FIELDS] != existing[BOOK_FIELDS]).any(axis=1)
+    updates = stored[changed].assign(id=existing.loc[changed, 'id'])
+
+    with transaction.atomic():
+        Book.objects.bulk_create([Book(**fields) for fields in new.reset_index().to_dict('records')],
+                                 batch_size=BATCH_SIZE)
+        Book.objects.bulk_update([Book(**fields) for fields in updates.reset_index().to_dict('records')],
+                                 BOOK_FIELDS, batch_size=BATCH_SIZE)
+        reindex([Book])
+    return len(new), len(updates), len(stored) - len(updates)
+
+
+class Command(BaseCommand):
+    """Load the BX catalogue into the Book table, touching only the books that are new or have changed"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', default=BOOKS_CSV_PATH, help='The BX books CSV.')
+        parser.add_argument('--ratings', default=RATINGS_CSV_PATH, help='The BX ratings CSV.')
+        parser.add_argument('--min-ratings', type=int, default=MIN_RATINGS,
+                            help='Only import books with more explicit ratings than this.')
+
+    def handle(self, *args, **options):
+        for path in [options['books'], options['ratings']]:
+            if not os.path.exists(path):
+                raise CommandError(f'No such file {path}')
+
+        start_time = time.perf_counter()
+        created, updated, unchanged = import_catalogue(options['books'], options['ratings'], options['min_ratings'])
+        rebuild_saved_index()
+        self.stdout.write(f'{created} books created, {updated} updated and {unchanged} unchanged '
+                          f'in {time.perf_counter() - start_time:.1f}s')
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+import pandas as pd
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from bookclub.bulk import insert_rows
+from bookclub.models import User, Book, Rating
+
+RATINGS_CSV_PATH = 'data/BX-Book-Ratings.csv'
+CHECKPOINT_PATH = 'data/import_ratings.checkpoint.json'
+CHUNK_SIZE = 100000
+BATCH_SIZE = 5000
+
+
+def read_chunks(path, chunk_size):
+    """ Stream the BX ratings CSV with normalised column names """
+
+    chunks = pd.read_csv(path, sep=';', on_bad_lines='skip', encoding="latin-1", chunksize=chunk_size,
+                         dtype={'ISBN': str})
+    for chunk in chunks:
+        chunk.columns = chunk.columns.str.strip().str.lower().str.replace('-', '_')
+        yield chunk
+
+
+def load_book_ids():
+    books = Book.objects.values_list('isbn', 'id').iterator(chunk_size=10000)
+    return {isbn.upper(): book_id for isbn, book_id in books}
+
+
+def load_bx_user_ids():
+    users = User.objects.filter(bx_user_id__isnull=False).values_list('bx_user_id', 'id')
+    return dict(users.iterator(chunk_size=10000))
+
+
+def create_bx_users(bx_user_ids, user_ids, password):
+    """ Create an inactive user for each BX reader not seen before and add them to user_ids """
+
+    new_ids = [bx_user_id for bx_user_id in bx_user_ids if bx_user_id not in user_ids]
+    if not new_ids:
+        return
+    User.objects.bulk_create([User(
+        email=f'bx{bx_user_id}@bx.invalid',
+        first_name='BX',
+        last_name=f'Reader {bx_user_id}',
+        location='Unknown',
+        password=password,
+        is_active=False,
+        bx_user_id=bx_user_id,
+    ) for bx_user_id in new_ids], batch_size=BATCH_SIZE)
+    user_ids.update(User.objects.filter(bx_user_id__in=new_ids).values_list('bx_user_id', 'id'))
+
+
+def resolve_chunk(chunk, book_ids):
+    """ Keep the explicit ratings of catalogue books, with their book id and upper case ISBN """
+
+    chunk = chunk[pd.to_numeric(chunk['book_rating'], errors='coerce').between(1, 10)]
+    isbns = chunk['isbn'].astype(str).str.strip().str.upper()
+    chunk = chunk.assign(isbn=isbns, book_id=isbns.map(book_ids))
+    chunk = chunk.dropna(subset=['book_id'])
+    chunk = chunk[pd.to_numeric(chunk['user_id'], errors='coerce').notna()]
+    chunk = chunk.astype({'user_id': 'int64', 'book_id': 'int64', 'book_rating': 'int64'})
+    return chunk.drop_duplicates(['user_id', 'book_id'], keep='last')
+
+
+def delete_imported_ratings(after_id=0):
+    """ Delete imported ratings in one statement. Through the ORM every row would be fetched to send signals """
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {Rating._meta.db_table} WHERE imported = %s AND id > %s', [True, after_id])
+
+
+def read_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_checkpoint(path, checkpoint):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(checkpoint, file)
+    os.replace(temporary_path, path)
+
+
+class Command(BaseCommand):
+    """Import the explicit BX ratings of catalogue books into the Rating table, resuming an interrupted import"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=RATINGS_CSV_PATH, help='The BX ratings CSV.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='CSV rows read and committed at once.')
+        parser.add_argument('--checkpoint', default=CHECKPOINT_PATH, help='Where the progress of the import is kept.')
+        parser.add_argument('--restart', action='store_true',
+                            help='Delete the imported ratings and import again from the start.')
+
+    def handle(self, *args, **options):
+        path, chunk_size, checkpoint_path = options['path'], options['chunk_size'], options['checkpoint']
+        if not os.path.exists(path):
+            raise CommandError(f'No ratings file at {path}')
+
+        if options['restart']:
+            delete_imported_ratings()
+            checkpoint = None
+        else:
+            checkpoint = read_checkpoint(checkpoint_path)
+            if checkpoint is None and Rating.objects.filter(imported=True).exists():
+                raise CommandError('The BX ratings have already been imported. Use --restart to import them again.')
+        if checkpoint and (checkpoint['path'] != path or checkpoint['chunk_size'] != chunk_size):
+            raise CommandError(f'The checkpoint is for {checkpoint["path"]} in chunks of {checkpoint["chunk_size"]}. '
+                               f'Use the same options or --restart.')
+        if checkpoint:
+            # Ratings committed after the last checkpoint was written belong to a chunk that will be imported again
+            delete_imported_ratings(after_id=checkpoint['last_rating_id'])
+            self.stdout.write(f"Resuming after {checkpoint['chunks_done']} chunks")
+        else:
+            checkpoint = {'path': path, 'chunk_size': chunk_size, 'chunks_done': 0, 'imported': 0,
+                          'last_rating_id': Rating.objects.aggregate(last=Max('id'))['last'] or 0}
+
+        start_time = time.perf_counter()
+        book_ids = load_book_ids()
+        user_ids = load_bx_user_ids()
+        password = make_password(None)
+
+        for index, chunk in enumerate(read_chunks(path, chunk_size)):
+            if index < checkpoint['chunks_done']:
+                continue
+            chunk = resolve_chunk(chunk, book_ids)
+            with transaction.atomic():
+                create_bx_users(chunk['user_id'].unique().tolist(), user_ids, password)
+                rows = zip(chunk['user_id'].map(user_ids).tolist(), chunk['book_id'].tolist(),
+                           chunk['isbn'].tolist(), chunk['book_rating'].tolist())
+                insert_rows(Rating, ['user', 'book', 'isbn', 'rating'], rows, {'imported': True})
+            checkpoint.update(chunks_done=index + 1, imported=checkpoint['imported'] + len(chunk),
+                              last_rating_id=Rating.objects.aggregate(last=Max('id'))['last'] or 0)
+            write_checkpoint(checkpoint_path, checkpoint)
+            self.stdout.write(f"[ CHUNK {index + 1} | {checkpoint['imported']} ratings imported ]", ending='\r')
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(f"\nImported {checkpoint['imported']} ratings in {time.perf_counter() - start_time:.1f}s")
@@ -0,0 +1,70 @@
+import json
+import random
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from bookclub.loadtest import (load_pools, load_virtual_users, run_load, summarise, environment, InProcessClient,
+                               HttpClient, LOADTEST_RESULTS_PATH, SCENARIOS)
+from bookclub.models import User
+from bookclub.seeding import SCALES
+
+
+def format_value(value, digits=1):
+    return 'n/a' if value is None else f'{value:.{digits}f}'
+
+
+class Command(BaseCommand):
+    """Drive weighted scenarios against the real views as many logged in users and report how each URL holds up"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES),
+                            help='Seed the database at this scale first. The database must not be seeded yet.')
+        parser.add_argument('--users', type=int, default=50, help='Synthetic users to log in.')
+        parser.add_argument('--threads', type=int, default=8, help='Threads making requests at once.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests to make in total.')
+        parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                            help='Scenarios to run. Defaults to every scenario.')
+        parser.add_argument('--url', help='Call a server running on this database over HTTP, such as '
+                                          'http://127.0.0.1:8000, instead of calling the views in this process.')
+        parser.add_argument('--host', default='localhost', help='Host header of the requests made in this process.')
+        parser.add_argument('--seed', type=int, default=0, help='Seed the choice of users, pages and scenarios.')
+        parser.add_argument('--output', default=LOADTEST_RESULTS_PATH, help='Where to write the JSON results.')
+
+    def handle(self, *args, **options):
+        if options['scale']:
+            if User.objects.exists():
+                raise CommandError('The database is already seeded. Run without --scale, or reset it first.')
+            call_command('seed', scale=options['scale'], stdout=self.stdout)
+
+        rng = random.Random(options['seed'])
+        pools = load_pools(rng)
+        virtual_users = load_virtual_users(options['users'], rng)
+        if not virtual_users or not pools['book_ids']:
+            raise CommandError('The load test needs users and books. Seed the database or use --scale.')
+
+        if options['url']:
+            make_client = lambda user: HttpClient(user, options['url'])
+        else:
+            make_client = lambda user: InProcessClient(user, options['host'])
+        scenarios = {name: SCENARIOS[name] for name in options['scenarios']}
+        self.stdout.write(f"{options['requests']} requests as {len(virtual_users)} users on {options['threads']} "
+                          f"threads...")
+        samples, wall_seconds = run_load(virtual_users, pools, make_client, scenarios, options['requests'],
+                                         options['threads'], options['seed'])
+        summary = summarise(samples, wall_seconds)
+
+        self.stdout.write(f"{'scenario':<14}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+                          f"{'p99 ms':>9}{'queries':>9}{'max q':>7}")
+        for name, row in summary.items():
+            self.stdout.write(f"{name:<14}{row['requests']:>9}{row['errors']:>8}{row['requests_per_second']:>9.1f}"
+                              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                              f"{format_value(row['mean_queries']):>9}{format_value(row['max_queries'], 0):>7}")
+        errors = sum(row['errors'] for row in summary.values())
+        self.stdout.write(f'{len(samples)} requests in {wall_seconds:.1f}s, {len(samples) / wall_seconds:.1f} '
+                          f'requests a second, {errors} errors')
+
+        report = {'environment': environment(), 'options': {key: options[key] for key in
+                                                            ['users', 'threads', 'requests', 'url', 'seed']},
+                  'wall_seconds': wall_seconds, 'results': summary}
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
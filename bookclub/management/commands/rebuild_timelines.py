@@ -0,0 +1,12 @@
+import time
+from django.core.management.base import BaseCommand
+from bookclub.timelines import rebuild
+
+
+class Command(BaseCommand):
+    """Refill every home timeline from the club posts and user posts each user can see"""
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        rebuild()
+        self.stdout.write(f'Rebuilt the timelines in {time.perf_counter() - start_time:.1f}s')
@@ -0,0 +1,12 @@
+import time
+from django.core.management.base import BaseCommand
+from bookclub.inbox import reconcile
+
+
+class Command(BaseCommand):
+    """Recount every user's unread messages and fix the inbox counters that drifted, meant to be run periodically"""
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        fixed = reconcile()
+        self.stdout.write(f'Fixed {fixed} unread counts in {time.perf_counter() - start_time:.1f}s')
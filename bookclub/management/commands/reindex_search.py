@@ -0,0 +1,12 @@
+import time
+from django.core.management.base import BaseCommand
+from bookclub.search import reindex
+
+
+class Command(BaseCommand):
+    """Refill the full-text search index of books, clubs and users from their tables"""
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        reindex()
+        self.stdout.write(f'Rebuilt the search index in {time.perf_counter() - start_time:.1f}s')
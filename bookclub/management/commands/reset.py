@@ -0,0 +1,116 @@
+import time
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from bookclub.models import User, Club, Book, Rating, Application, Meeting, Chat, Message, RecommendedBook, Post, \
+    UserPost
+from bookclub.search import SEARCH_FIELDS, reindex
+from recommender.snapshots import log_bulk_change
+
+RESET_MODELS = [User, Club, Book, Rating, Application, Meeting, Chat, Message, RecommendedBook, Post, UserPost]
+# The models whose delete receivers record what a reset would otherwise lose, deleted through the ORM in safe mode.
+# The other receivers only keep caches, counters and the search index in step, which the reset empties or rebuilds
+SAFE_RESET_MODELS = [Rating]
+
+
+def references(model):
+    """ The foreign keys of a model, including those of auto created many to many tables """
+
+    return [field for field in model._meta.concrete_fields if field.is_relation and field.remote_field]
+
+
+def reset_plan(targets=RESET_MODELS):
+    """ The targets and every model whose rows a delete of them would cascade to, children before parents, and
+    the foreign keys to them that a delete sets to null """
+
+    all_models = apps.get_models(include_auto_created=True)
+    cleared = set(targets)
+    nulled = []
+    changed = True
+    while changed:
+        changed = False
+        for model in all_models:
+            if model in cleared:
+                continue
+            for field in references(model):
+                if field.related_model not in cleared:
+                    continue
+                if field.remote_field.on_delete is models.CASCADE:
+                    cleared.add(model)
+                    changed = True
+                    break
+                if field.remote_field.on_delete is models.SET_NULL:
+                    nulled.append(field)
+                elif field.remote_field.on_delete is not models.DO_NOTHING:
+                    raise CommandError(f'{model._meta.label}.{field.name} does not allow its rows to be reset')
+
+    ordered = []
+    remaining = [model for model in all_models if model in cleared]
+    while remaining:
+        parents = {field.related_model for model in remaining for field in references(model)
+                   if field.related_model is not model}
+        leaves = [model for model in remaining if model not in parents]
+        if not leaves:
+            raise CommandError('The models to reset reference each other in a cycle')
+        ordered += leaves
+        remaining = [model for model in remaining if model not in leaves]
+    nulled = [field for field in nulled if field.model not in cleared]
+    return ordered, nulled
+
+
+def null_references(fields):
+    with connection.cursor() as cursor:
+        for field in fields:
+            cursor.execute(f'UPDATE {connection.ops.quote_name(field.model._meta.db_table)} '
+                           f'SET {connection.ops.quote_name(field.column)} = NULL')
+
+
+def truncate(ordered):
+    """ Empty the tables in one TRUNCATE on PostgreSQL, otherwise one DELETE per table in order. SQLite empties a
+    table without reading its rows when a DELETE has no WHERE clause and foreign keys are not being enforced """
+
+    tables = [connection.ops.quote_name(model._meta.db_table) for model in ordered]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+        return
+    with connection.constraint_checks_disabled():
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for table in tables:
+                    cursor.execute(f'DELETE FROM {table}')
+
+
+def reset(targets=RESET_MODELS, safe=False):
+    """ Delete every row of the targets and of the models their deletes cascade to. In safe mode the
+    SAFE_RESET_MODELS are deleted through the ORM first, so their receivers run. Returns the models emptied """
+
+    ordered, nulled = reset_plan(targets)
+    with transaction.atomic():
+        if safe:
+            for model in ordered:
+                if model in SAFE_RESET_MODELS:
+                    model._base_manager.all().delete()
+        null_references(nulled)
+    truncate(ordered)
+    if not safe and Rating in ordered:
+        # The deleted ratings are not in the rating change log, so the snapshots taken before still hold them
+        log_bulk_change()
+    reindex([model for model in ordered if model in SEARCH_FIELDS])
+    return ordered
+
+
+class Command(BaseCommand):
+    """Delete the users, clubs, books and everything that depends on them in bulk, without the ORM's collector"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--safe', action='store_true',
+                            help='Delete the ratings through the ORM so the rating change log records them.')
+
+    def handle(self, *args, **options):
+        start_time = time.perf_counter()
+        ordered = reset(safe=options['safe'])
+        # The deleted memberships did not invalidate the cached club lists of their users
+        cache.clear()
+        self.stdout.write(f'Emptied {len(ordered)} tables in {time.perf_counter() - start_time:.1f}s')
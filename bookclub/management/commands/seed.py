@@ -1,11 +1,21 @@
+import os
 import random
-from django.core.management.base import BaseCommand, CommandError
-from faker import Faker
-from bookclub.models import User, Club, Book, Application, Post, UserPost
-from django.core.exceptions import ValidationError
-import csv
-import pandas as pd
-import numpy as np
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from bookclub.bulk import insert_rows
+from bookclub.models import User, Club, Book, Application, Membership, Post, UserPost, Chat, Message, Rating
+from bookclub.seeding import SCALES, IdPool, init_worker, generate_users, generate_clubs, generate_activity
+from bookclub.autocomplete import rebuild_saved_index as rebuild_autocomplete
+from bookclub.inbox import reconcile as reconcile_unread_counts
+from bookclub.search import reindex as reindex_search
+from bookclub.timelines import rebuild as rebuild_timelines
+from recommender.snapshots import log_bulk_change
 
 
 def create_set_users():
@@ -45,117 +55,106 @@ def create_set_users():
     )
 
 
-def generate_genre():
-    genres = ['Action', 'Adventure', 'Romance', 'Science Fiction', 'Horror', 'Non-fiction', 'Poetry', 'Thriller',
-              'Classics', 'Comics', 'Crime', 'Fantasy', 'Psychological', 'Foreign', 'Biographies', 'Religious']
-    return random.choice(genres)
+TASK_SIZE = 1000
+ROW_TABLES = {
+    'users': (User, ['id', 'email', 'password', 'first_name', 'last_name', 'public_bio', 'favourite_genre',
+                     'location', 'age', 'date_joined', 'is_email_verified'],
+              {'is_staff': False, 'is_active': True, 'is_superuser': False}),
+    'clubs': (Club, ['id', 'name', 'description', 'location', 'owner', 'meeting_online', 'organiser_owner'], {}),
+    'members': (Club.members.through, ['club', 'user'], {}),
+    'organisers': (Club.organisers.through, ['club', 'user'], {}),
+    'memberships': (Membership, ['club', 'user', 'role', 'joined_at'], {}),
+    'applications': (Application, ['applicant', 'club'], {}),
+    'posts': (Post, ['author', 'club', 'text', 'created_at'], {}),
+    'user_posts': (UserPost, ['author', 'text', 'created_at'], {}),
+    'follows': (User.followers.through, ['from_user', 'to_user'], {}),
+    'chats': (Chat, ['id', 'user', 'receiver', 'has_unread'], {}),
+    'messages': (Message, ['chat', 'sender_user', 'receiver_user', 'body', 'date', 'is_read'], {}),
+    'ratings': (Rating, ['user', 'book', 'isbn', 'rating'], {'imported': False}),
+}
 
 
-def generate_provider():
-    providers = ['aol', 'yahoo', 'gmail', 'outlook', 'protonmail', 'hotmail', 'gov', 'icloud']
-    return random.choice(providers)
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
 
 
-def generate_boolean():
-    boolean = [True, False]
-    return random.choice(boolean)
+def bounded_map(executor, func, tasks, in_flight):
+    """ Like executor.map, keeping at most in_flight tasks submitted so results cannot pile up in memory """
 
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(func, *task))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
-def get_random_user():
-    return list(User.objects.all())[random.randint(0, User.objects.count() - 1)]
 
+class InProcessExecutor:
+    """Runs the generators in this process, for a single worker"""
 
-def get_total_users():
-    return User.objects.all().count()
+    def __init__(self, initializer, initargs):
+        initializer(*initargs)
 
+    def map(self, func, tasks):
+        return (func(*task) for task in tasks)
 
-def get_total_clubs():
-    return Club.objects.all().count()
+    def shutdown(self):
+        pass
 
 
-def get_all_users_list():
-    return list(User.objects.all())
+class PoolExecutor:
+    def __init__(self, workers, initializer, initargs):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
 
+    def map(self, func, tasks):
+        return bounded_map(self.executor, func, tasks, self.workers * 2)
 
-def get_all_clubs_users(club):
-    return club.get_all_users()
-
-
-def generate_club_hierarchy(club):
-    users = get_all_users_list()
-    for i in range(0, 15):
-        application_possible = True
-        random_user = random.choice(users)
-        all_club_users = get_all_clubs_users(club)
-        current_applications = Application.objects.filter(applicant=random_user, club=club).count()
-        if current_applications or random_user in all_club_users:
-            application_possible = False
-        if application_possible:
-            Application.objects.create(
-                applicant=random_user,
-                club=club
-            )
-
-    for i in range(0, 30):
-        random_user = random.choice(users)
-        all_clubs_users = get_all_clubs_users(club)
-        if random_user not in all_clubs_users:
-            club.make_member(random_user)
-
-    for i in range(0, 10):
-        random_user = random.choice(users)
-        all_clubs_users = get_all_clubs_users(club)
-        if random_user not in all_clubs_users:
-            club.make_member(random_user)
-            club.make_organiser(random_user)
+    def shutdown(self):
+        self.executor.shutdown()
 
 
 class Command(BaseCommand):
-    faker = Faker('en_GB')
-    TOTAL_USERS = 500
-    TOTAL_CLUBS = 50
+    """Seed the database with the set users and clubs and with synthetic users, clubs and activity at a scale"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), default='small',
+                            help=', '.join(f"{name}: {scale['users']} users and {scale['clubs']} clubs"
+                                           for name, scale in SCALES.items()))
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes generating the synthetic data.')
+        parser.add_argument('--seed', type=int, default=None, help='Seed the generators to repeat a run exactly.')
+        parser.add_argument('--skip-books', action='store_true', help='Keep the books already in the database.')
 
     def handle(self, *args, **options):
         seed_possible = self.verify_seeding_possible()
         if seed_possible:
-            print()
-            print("--- Bookwise Seeder ---")
-            print()
-            print("Seed books:")
-            self.load_books()
-            print("All books have been successfully seeded")
-            print()
+            self.stdout.write()
+            self.stdout.write("--- Bookwise Seeder ---")
+            self.stdout.write()
+            if not options['skip_books']:
+                self.stdout.write("Seed books:")
+                self.load_books()
+                self.stdout.write("All books have been successfully seeded")
+                self.stdout.write()
             create_set_users()
-            print('Created set users')
-            print()
+            self.stdout.write('Created set users')
+            self.stdout.write()
             self.default_superuser()
-            print()
-            print('Seed users:')
-            print()
-            self.generate_users()
-            print('All users have been successfully seeded')
-            print()
-            print('Seed clubs:')
-            print()
             self.create_set_clubs()
-            print('Created set clubs')
-            print()
-            self.generate_clubs()
-            print('All clubs have been successfully seeded')
-            print()
-            print('Seed user events:')
-            print()
-            self.generate_user_events()
-            print('User events have been successfully seeded')
-            print()
-            print('Seeder has successfully completed')
+            self.stdout.write('Created set clubs')
+            self.stdout.write()
+            seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+            self.generate(SCALES[options['scale']], max(options['workers'], 1), seed)
+            self.stdout.write('Seeder has successfully completed')
 
         else:
-            print()
-            print('The database must first be unseeded.')
-            print('To do this, enter the command below:')
-            print('> python3 manage.py unseed')
-            print()
+            self.stdout.write()
+            self.stdout.write('The database must first be unseeded.')
+            self.stdout.write('To do this, enter the command below:')
+            self.stdout.write('> python3 manage.py unseed')
+            self.stdout.write()
 
     def verify_seeding_possible(self):
         seed_possible = True
@@ -182,187 +181,101 @@ class Command(BaseCommand):
             age=20,
             is_email_verified=True,
         )
-        print("Default superuser created with details:")
-        print("Email: ctrl@intelligence.com")
-        print("Password: Password123")
-        print()
-
-    def create_user(self):
-        provider = generate_provider()
-        first_name = self.faker.first_name()
-        last_name = self.faker.last_name()
-        email = f'{first_name.lower()}.{last_name.lower()}@{provider}.com'
-        password = 'pbkdf2_sha256$260000$EoTovTO51J1EMhVCgfWM0t$jQjs11u15ELqQDNthGsC+vdLoDJRn2LDjU2qE7KqKj0='
-        bio = self.faker.text(max_nb_chars=400)
-        genre = generate_genre()
-        location = self.faker.city()
-        age = random.randint(16, 100)
-
-        generatedUser = User(
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name,
-            public_bio=bio,
-            favourite_genre=genre,
-            location=location,
-            age=age)
-        return generatedUser
-
-    def create_club(self):
-        location = self.faker.city()
-        name = location + ' Book Club'
-        description = self.faker.text(512)
-        owner = get_random_user()
-        meeting_online = generate_boolean()
-
-        generatedClub = Club(
-            name=name,
-            description=description,
-            location=location,
-            owner=owner,
-            meeting_online=meeting_online
-        )
-        return generatedClub
-
-    def generate_users(self):
-        total_users = 0
-        while total_users < self.TOTAL_USERS:
-            try:
-                temp_user = self.create_user()
-                temp_user.full_clean()
-                temp_user.save()
-                total_users = get_total_users()
-                percent_complete = float((total_users / self.TOTAL_USERS) * 100)
-                print(f'[ DONE: {round(percent_complete)}% | {total_users}/{self.TOTAL_USERS} ]', end='\r')
-            except ValidationError:
-                pass
-
-    def generate_clubs(self):
-        total_clubs = 0
-        while total_clubs < self.TOTAL_CLUBS:
-            try:
-                temp_club = self.create_club()
-                temp_club.full_clean()
-                temp_club.save()
-                generate_club_hierarchy(temp_club)
-                self.generate_club_posts(temp_club)
-                total_clubs = get_total_clubs()
-                percent_complete = float((total_clubs / self.TOTAL_CLUBS) * 100)
-                print(f'[ DONE: {round(percent_complete)}% | {total_clubs}/{self.TOTAL_CLUBS} ]', end='\r')
-            except ValidationError:
-                pass
-
-    def generate_club_posts(self, club):
-        number_of_posts = random.randint(0, 25)
-        club_owner = club.owner
-        for i in range(0, number_of_posts):
-            text = self.faker.text(max_nb_chars=120)
-            Post.objects.create(club=club, author=club_owner, text=text)
-
-    def generate_user_events(self):
-        count = 0
-        users = get_all_users_list()
-        for usr in users:
-            number_of_posts = random.randint(0, 5)
-            for i in range(0, number_of_posts):
-                text = self.faker.text(max_nb_chars=84)
-                UserPost.objects.create(author=usr, text=text)
-            number_to_follow = random.randint(5, 50)
-            for j in range(0, number_to_follow):
-                random_user = random.choice(users)
-                usr.toggle_follow(random_user)
-            count += 1
-            percent_complete = float((count/get_total_users()) * 100)
-            print(f'[ DONE: {round(percent_complete)}% ]', end='\r')
+        self.stdout.write("Default superuser created with details:")
+        self.stdout.write("Email: ctrl@intelligence.com")
+        self.stdout.write("Password: Password123")
+        self.stdout.write()
+
+    def generate(self, scale, workers, seed):
+        """ Generate the synthetic users, then the clubs, then the users' activity, each phase inserted in
+        transactions of one task's rows """
+
+        first_user_id, first_club_id = next_id(User), next_id(Club)
+        users = IdPool(User.objects.order_by('id').values_list('id', flat=True), first_user_id,
+                       first_user_id + scale['users'])
+        clubs = IdPool(Club.objects.order_by('id').values_list('id', flat=True), first_club_id,
+                       first_club_id + scale['clubs'])
+        club_owners = dict(Club.objects.values_list('id', 'owner_id'))
+        books = list(Book.objects.values_list('id', 'isbn'))
+        initargs = (scale, users, clubs, club_owners, books, seed)
+        if workers == 1:
+            executor = InProcessExecutor(init_worker, initargs)
+        else:
+            executor = PoolExecutor(workers, init_worker, initargs)
+
+        self.stdout.write(f'Seed {len(users)} users, {len(clubs)} clubs and their activity with seed {seed}:')
+        try:
+            self.stdout.write()
+            self.run_phase('users', executor, generate_users, len(users))
+            self.run_phase('clubs', executor, generate_clubs, len(clubs))
+            self.run_phase('activity', executor, generate_activity, len(users))
+        finally:
+            executor.shutdown()
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Club, Chat]):
+                cursor.execute(sql)
+        # The seeded ratings are not in the rating change log, so the snapshots taken before would never see them
+        log_bulk_change()
+
+        # The seeded posts were inserted without the ORM, so they were never pushed to any timeline
+        start_time = time.perf_counter()
+        rebuild_timelines()
+        self.stdout.write(f'Rebuilt the timelines in {time.perf_counter() - start_time:.1f}s')
+        # Nor were the seeded messages added to the unread counts of their receivers
+        reconcile_unread_counts()
+        # Nor were the seeded books, users and clubs added to the search index
+        reindex_search()
+        # Nor do the suggestions of the search box know the seeded ratings
+        rebuild_autocomplete()
+
+    def run_phase(self, name, executor, func, total):
+        start_time = time.perf_counter()
+        tasks = [(first, min(first + TASK_SIZE, total)) for first in range(0, total, TASK_SIZE)]
+        counts = {}
+        next_chat_id = next_id(Chat)
+        for done, rows in enumerate(executor.map(func, tasks), 1):
+            if 'chats' in rows:
+                rows['chats'] = [(next_chat_id + position,) + chat for position, chat in enumerate(rows['chats'])]
+                rows['messages'] = [(next_chat_id + message[0],) + message[1:] for message in rows['messages']]
+                next_chat_id += len(rows['chats'])
+            with transaction.atomic():
+                for key, table_rows in rows.items():
+                    model, field_names, constants = ROW_TABLES[key]
+                    insert_rows(model, field_names, table_rows, constants)
+                    counts[key] = counts.get(key, 0) + len(table_rows)
+            self.stdout.write(f'[ {name.upper()}: {round(done / len(tasks) * 100)}% | {done}/{len(tasks)} tasks ]',
+                              ending='\r')
+        summary = ', '.join(f'{count} {key.replace("_", " ")}' for key, count in counts.items())
+        self.stdout.write(f'\nSeeded {summary} in {time.perf_counter() - start_time:.1f}s')
+        self.stdout.write()
 
     def create_set_clubs(self):
         owner_john = User.objects.get(email="johndoe@bookclub.com")
-        bush_house = Club.objects.create(
+        Club.objects.create(
             name="Bush House Book Club",
             description="Bush House Official Book Club!",
             location="Strand, London",
             owner=owner_john,
             meeting_online=True
         )
-        bush_house.full_clean()
-        bush_house.save()
-        generate_club_hierarchy(bush_house)
-        self.generate_club_posts(bush_house)
 
         owner_jane = User.objects.get(email="janedoe@bookclub.com")
-        somerset_house = Club.objects.create(
+        Club.objects.create(
             name="Somerset House Book Club",
             description="Somerset House Official Book Club!",
             location="Strand, London",
             owner=owner_jane,
             meeting_online=True
         )
-        somerset_house.full_clean()
-        somerset_house.save()
-        generate_club_hierarchy(somerset_house)
-        self.generate_club_posts(somerset_house)
 
-        strand_house = Club.objects.create(
+        Club.objects.create(
             name="Strand House Book Club",
             description="Strand House Official Book Club!",
             location="Strand, London",
             owner=owner_john,
             meeting_online=False
         )
-        strand_house.full_clean()
-        strand_house.save()
-        generate_club_hierarchy(strand_house)
-        self.generate_club_posts(strand_house)
 
     def load_books(self):
-        count = 0
-
-        books = pd.read_csv('data/BX_Books.csv', sep=';', on_bad_lines='skip', encoding="latin-1")
-        books.columns = books.columns.str.strip().str.lower().str.replace('-', '_')
-
-        ratings = pd.read_csv('data/BX-Book-Ratings.csv', sep=';', on_bad_lines='skip', encoding="latin-1")
-        ratings.columns = ratings.columns.str.strip().str.lower().str.replace('-', '_')
-
-        ratings = ratings[ratings.book_rating != 0]
-
-        books = books[books.year_of_publication != 0]
-        books = books[books.year_of_publication != np.nan]
-        book_dates_too_old = books[books.year_of_publication < 1800]
-        book_dates_future = books[books.year_of_publication > 2022]
-        books = books.loc[~(books.isbn.isin(book_dates_too_old.isbn))]
-        books = books.loc[~(books.isbn.isin(book_dates_future.isbn))]
-
-        books = books.values.tolist()
-
-        books_list = ratings.isbn.value_counts().rename_axis('isbn').reset_index(name='count')
-        books_list = books_list[books_list['count'] > 5]['isbn'].to_list()
-
-
-        create_books_lists = []
-
-        for book in books:
-            if book[0] in books_list:
-                book_to_append = Book(
-                    isbn=book[0].upper(),
-                    title=book[1],
-                    author=book[2],
-                    pub_year=book[3],
-                    publisher=book[4],
-                    small_url=book[5],
-                    medium_url=book[6],
-                    large_url=book[7]
-                )
-                create_books_lists.append(book_to_append)
-                count += 1
-                percent_complete = float((count / len(books_list)) * 100)
-
-                print(f'[ DONE: {round(percent_complete)}% | {count}/{len(books_list)} ]', end='\r')
-
-                if len(create_books_lists) > 50:
-                    Book.objects.bulk_create(create_books_lists)
-                    create_books_lists = []
-
-        if create_books_lists:
-            Book.objects.bulk_create(create_books_lists)
-
+        call_command('import_books', stdout=self.stdout)
@@ -0,0 +1,47 @@
+"""A per-user cache of the clubs each user belongs to.
+
+The clubs of the logged in user are shown on the club switcher, the profile pages and the feed. They are kept in
+the cache backend as a {club id: role} dict under a key of the user's own, so requests never share a list, and the
+key is deleted whenever one of the user's memberships changes or one of their clubs is disbanded.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from bookclub.models import Club
+
+USER_CLUBS_TIMEOUT = 60 * 60
+
+
+def user_clubs_key(user_id):
+    return f'bookclub:user_clubs:{user_id}'
+
+
+def get_user_club_roles(user):
+    """ {club id: role} of every club the user belongs to, from the cache when it holds them """
+
+    key = user_clubs_key(user.pk)
+    roles = cache.get(key)
+    if roles is None:
+        roles = dict(user.memberships.values_list('club_id', 'role'))
+        cache.set(key, roles, USER_CLUBS_TIMEOUT)
+    return roles
+
+
+def get_user_clubs(user):
+    """ The user's clubs, each with the user's role in it """
+
+    roles = get_user_club_roles(user)
+    clubs = list(Club.objects.filter(id__in=roles).select_related('owner'))
+    for club in clubs:
+        club.role = roles[club.id]
+    return clubs
+
+
+def invalidate_user_clubs(user_ids):
+    """ Forget the cached clubs of the users now, and again once the transaction commits, so a request that read the
+    memberships before the commit cannot leave its stale copy in the cache """
+
+    keys = [user_clubs_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.5 on 2026-10-19 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating_pk', models.BigIntegerField()),
+                ('user_pk', models.BigIntegerField(blank=True, null=True)),
+                ('isbn', models.CharField(blank=True, max_length=12)),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('insert', 'Insert'), ('update', 'Update'), ('delete', 'Delete')], max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
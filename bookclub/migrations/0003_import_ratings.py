@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-19 15:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0002_ratingchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rating',
+            name='imported',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='bx_user_id',
+            field=models.IntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
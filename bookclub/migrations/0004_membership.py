@@ -0,0 +1,50 @@
+# Generated by Django 3.2.5 on 2026-10-19 16:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_memberships(apps, schema_editor):
+    """Give every owner, organiser and member of a club a membership with their highest role"""
+    Club = apps.get_model('bookclub', 'Club')
+    Membership = apps.get_model('bookclub', 'Membership')
+    roles = {}
+    for club_id, user_id in Club.members.through.objects.values_list('club_id', 'user_id'):
+        roles[club_id, user_id] = 'member'
+    for club_id, user_id in Club.organisers.through.objects.values_list('club_id', 'user_id'):
+        roles[club_id, user_id] = 'organiser'
+    for club_id, user_id in Club.objects.values_list('id', 'owner_id'):
+        roles[club_id, user_id] = 'owner'
+    Membership.objects.bulk_create([Membership(club_id=club_id, user_id=user_id, role=role)
+                                    for (club_id, user_id), role in roles.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0003_import_ratings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Membership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('organiser', 'Organiser'), ('member', 'Member')], max_length=9)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='bookclub.club')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='membership',
+            index=models.Index(fields=['user', 'club'], name='bookclub_me_user_id_fdefb0_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='membership',
+            constraint=models.UniqueConstraint(fields=('club', 'user'), name='unique_club_membership'),
+        ),
+        migrations.RunPython(backfill_memberships, migrations.RunPython.noop),
+    ]
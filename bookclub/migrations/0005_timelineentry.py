@@ -0,0 +1,65 @@
+# Generated by Django 3.2.5 on 2026-10-19 16:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timelines(apps, schema_editor):
+    """Fill every user's timeline with the newest posts of their clubs and followees, as timelines.rebuild does"""
+    quote = schema_editor.quote_name
+    schema_editor.execute(f"""
+        INSERT INTO {quote('bookclub_timelineentry')} (user_id, post_id, user_post_id, created_at)
+        SELECT user_id, post_id, user_post_id, created_at FROM (
+            SELECT user_id, post_id, user_post_id, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY user_id ORDER BY created_at DESC, COALESCE(post_id, user_post_id) DESC
+                   ) AS position
+            FROM (
+                SELECT membership.user_id AS user_id, post.id AS post_id, NULL AS user_post_id,
+                       post.created_at AS created_at
+                FROM {quote('bookclub_post')} post
+                JOIN {quote('bookclub_membership')} membership ON membership.club_id = post.club_id
+                UNION ALL
+                SELECT follow.to_user_id, NULL, user_post.id, user_post.created_at
+                FROM {quote('bookclub_userpost')} user_post
+                JOIN {quote('bookclub_user_followers')} follow ON follow.from_user_id = user_post.author_id
+            ) candidates
+        ) ranked WHERE position <= %s
+        ORDER BY user_id, created_at, COALESCE(post_id, user_post_id)""", [settings.TIMELINE_LENGTH])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0004_membership'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('post', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='bookclub.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+                ('user_post', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='bookclub.userpost')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-created_at'], name='bookclub_ti_user_id_6b9759_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_post'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'user_post'), name='unique_timeline_user_post'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
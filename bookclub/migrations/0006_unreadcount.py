@@ -0,0 +1,35 @@
+# Generated by Django 3.2.5 on 2026-10-19 16:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_unread_counts(apps, schema_editor):
+    """Give every user with unread messages a counter of them"""
+    Message = apps.get_model('bookclub', 'Message')
+    UnreadCount = apps.get_model('bookclub', 'UnreadCount')
+    counts = (Message.objects.filter(is_read=False).order_by().values('receiver_user')
+              .annotate(unread=models.Count('id')).values_list('receiver_user', 'unread'))
+    UnreadCount.objects.bulk_create([UnreadCount(user_id=user_id, count=unread) for user_id, unread in counts],
+                                    batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0005_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCount',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_count', serialize=False, to='bookclub.user')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='inbox_count',
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-19 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0006_unreadcount'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chat', '-date'], name='bookclub_me_chat_id_459e08_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.5 on 2026-10-19 16:34
+
+from django.db import migrations
+
+SEARCH_FIELDS = {
+    'bookclub_book': [('title', 'A'), ('author', 'B'), ('isbn', 'C'), ('publisher', 'D'), ('pub_year', 'D')],
+    'bookclub_club': [('name', 'A')],
+    'bookclub_user': [('first_name', 'A'), ('last_name', 'A'), ('email', 'B')],
+}
+
+
+def create_search_index(apps, schema_editor):
+    """Create and fill an FTS5 table per searchable table on SQLite, or a GIN index of their tsvector on PostgreSQL"""
+    quote = schema_editor.quote_name
+    for table, fields in SEARCH_FIELDS.items():
+        columns = [column for column, weight in fields]
+        if schema_editor.connection.vendor == 'sqlite':
+            schema_editor.execute(f"CREATE VIRTUAL TABLE {quote(table + '_fts')} USING fts5("
+                                  f"{', '.join(columns)}, tokenize='unicode61 remove_diacritics 2')")
+            schema_editor.execute(f"INSERT INTO {quote(table + '_fts')} (rowid, {', '.join(columns)}) "
+                                  f"SELECT id, {', '.join(columns)} FROM {quote(table)}")
+        elif schema_editor.connection.vendor == 'postgresql':
+            vector = ' || '.join(f"setweight(to_tsvector('simple', coalesce({quote(column)}::text, '')), '{weight}')"
+                                 for column, weight in fields)
+            schema_editor.execute(f"CREATE INDEX {quote(table + '_search')} ON {quote(table)} USING GIN (({vector}))")
+
+
+def drop_search_index(apps, schema_editor):
+    for table in SEARCH_FIELDS:
+        if schema_editor.connection.vendor == 'sqlite':
+            schema_editor.execute(f"DROP TABLE IF EXISTS {schema_editor.quote_name(table + '_fts')}")
+        elif schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(table + '_search')}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0007_message_chat_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:02
+
+from django.db import migrations
+
+
+def unindex_inactive_users(apps, schema_editor):
+    """Drop the inactive users, such as the imported BX readers, from the FTS5 table of users"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    quote = schema_editor.quote_name
+    schema_editor.execute(f"DELETE FROM {quote('bookclub_user_fts')} WHERE rowid IN "
+                          f"(SELECT id FROM {quote('bookclub_user')} WHERE NOT is_active)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0008_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(unindex_inactive_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.5 on 2026-10-19 18:20
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    """Create the tables of the database cache backends in CACHES, which migrate would otherwise leave to
+    createcachetable"""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0009_search_active_users'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
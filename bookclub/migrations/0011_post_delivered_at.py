@@ -0,0 +1,39 @@
+# Generated by Django 3.2.5 on 2026-10-19 17:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_posts_delivered(apps, schema_editor):
+    """Mark the posts already there as delivered, since migrating 0005 filled the timelines with them"""
+    for model_name in ['Post', 'UserPost']:
+        apps.get_model('bookclub', model_name).objects.update(delivered_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0010_cache_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userpost',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_posts_delivered, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('delivered_at', None)), fields=['id'], name='undelivered_post'),
+        ),
+        migrations.AddIndex(
+            model_name='userpost',
+            index=models.Index(condition=models.Q(('delivered_at', None)), fields=['id'], name='undelivered_user_post'),
+        ),
+    ]
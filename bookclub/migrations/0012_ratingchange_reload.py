@@ -0,0 +1,18 @@
+# Generated by Django 3.2.5 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookclub', '0011_post_delivered_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ratingchange',
+            name='action',
+            field=models.CharField(choices=[('insert', 'Insert'), ('update', 'Update'), ('delete', 'Delete'), ('reload', 'Reload')], max_length=6),
+        ),
+    ]
@@ -82,10 +82,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     currently_reading_books = models.ManyToManyField(Book, related_name='%(class)s_currently_reading_books')
     favourite_books = models.ManyToManyField(Book)
     is_email_verified = models.BooleanField(default=False)
-    inbox_count = models.IntegerField(default=None, blank=True, null=True)
     followers = models.ManyToManyField(
         'self', symmetrical=False, related_name='followees'
     )
+    bx_user_id = models.IntegerField(unique=True, blank=True, null=True)
 
     class Meta:
         """Model options."""
@@ -159,18 +159,13 @@ class User(AbstractBaseUser, PermissionsMixin):
         return Rating.objects.filter(user_id=self.id)
 
     def get_number_of_ratings(self):
-        return len(self.get_ratings())
+        return self.get_ratings().count()
     
     def get_all_clubs(self):
-        clubs = Club.objects.all()
-        user_clubs = []
-        for club in clubs:
-            if self in club.get_all_users():
-                user_clubs.append(club)
-        return user_clubs
+        return Club.objects.filter(memberships__user=self)
     
     def get_number_of_clubs(self):
-        return len(self.get_all_clubs())
+        return self.memberships.count()
 
     objects = UserManager()
 
@@ -209,37 +204,33 @@ class Club(models.Model):
         return self.location
 
     def user_level(self, user):
-        if self.owner == user:
-            return "Owner"
-        elif self.organisers.filter(email=user.email):
-            return "Organiser"
-        elif self.members.filter(email=user.email):
-            return "Member"
-        else:
-            return "Not in club"
+        role = self.memberships.filter(user_id=user.pk).values_list('role', flat=True).first()
+        return dict(Membership.ROLES).get(role, "Not in club")
 
     def make_owner(self, user):
-        if self.user_level(user) == "Member":
-            self.members.remove(user)
-        elif self.user_level(user) == "Organiser":
-            self.organisers.remove(user)
-
+        # Roles are granted before they are taken away, so memberships change role rather than being remade
+        user_level = self.user_level(user)
         self.members.add(self.owner)
         self.owner = user
         self.save()
 
+        if user_level == "Member":
+            self.members.remove(user)
+        elif user_level == "Organiser":
+            self.organisers.remove(user)
+
     def make_organiser(self, user):
         if self.user_level(user) == "Member":
-            self.members.remove(user)
             self.organisers.add(user)
+            self.members.remove(user)
             self.save()
         else:
             raise ValueError
 
     def demote_organiser(self, user):
         if self.user_level(user) == "Organiser":
-            self.organisers.remove(user)
             self.members.add(user)
+            self.organisers.remove(user)
             self.save()
         else:
             raise ValueError
@@ -275,11 +266,32 @@ class Club(models.Model):
         return Meeting.objects.filter(club_id=self.id).count()
 
     def get_all_users(self):
-        self.club_members = self.get_members()
-        self.club_organisers = self.get_organisers()
-        self.club_owner = User.objects.filter(email=self.get_owner().email)
-
-        return (self.club_members | self.club_organisers | self.club_owner).distinct()
+        return User.objects.filter(memberships__club=self)
+
+    def get_users_with_roles(self):
+        """Return the club's users, each annotated with their role"""
+        return self.get_all_users().annotate(role=models.F('memberships__role'))
+
+    def get_number_of_users(self):
+        return self.memberships.count()
+
+    def sync_memberships(self):
+        """Bring the club's memberships in line with its owner, organisers and members, returning the ids of the
+        users whose membership changed"""
+        roles = dict.fromkeys(self.members.values_list('id', flat=True), Membership.MEMBER)
+        roles.update(dict.fromkeys(self.organisers.values_list('id', flat=True), Membership.ORGANISER))
+        roles[self.owner_id] = Membership.OWNER
+        current = dict(self.memberships.values_list('user_id', 'role'))
+
+        self.memberships.exclude(user_id__in=roles).delete()
+        Membership.objects.bulk_create([Membership(club=self, user_id=user_id, role=role)
+                                        for user_id, role in roles.items() if user_id not in current])
+        for role, label in Membership.ROLES:
+            changed = [user_id for user_id, current_role in current.items()
+                       if roles.get(user_id) == role and current_role != role]
+            if changed:
+                self.memberships.filter(user_id__in=changed).update(role=role)
+        return {user_id for user_id in roles.keys() | current.keys() if roles.get(user_id) != current.get(user_id)}
 
     def remove_from_club(self, user):
         if self.user_level(user) == "Member":
@@ -310,6 +322,25 @@ class Club(models.Model):
         return self.gravatar(size=60)
 
 
+class Membership(models.Model):
+    """A model for a user's role in a club, kept in line with the club's owner, organisers and members"""
+    OWNER = 'owner'
+    ORGANISER = 'organiser'
+    MEMBER = 'member'
+    ROLES = [(OWNER, 'Owner'), (ORGANISER, 'Organiser'), (MEMBER, 'Member')]
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='memberships')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='memberships')
+    role = models.CharField(max_length=9, choices=ROLES)
+    joined_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        """Model options."""
+
+        constraints = [models.UniqueConstraint(fields=['club', 'user'], name='unique_club_membership')]
+        indexes = [models.Index(fields=['user', 'club'])]
+
+
 class Application(models.Model):
     """A model for denoting and storing applications made by users to join book clubs."""
     applicant = models.ForeignKey(User, blank=False, on_delete=models.CASCADE)
@@ -334,6 +365,7 @@ class Rating(models.Model):
     book = models.ForeignKey(Book, blank=True, null=True, on_delete=models.CASCADE)
     isbn = models.CharField(unique=False, max_length=12, blank=False)
     rating = models.IntegerField(validators=[MinValueValidator(0), MaxValueValidator(10)], blank=False)
+    imported = models.BooleanField(default=False)
 
     class Meta:
         """Model options."""
@@ -350,6 +382,27 @@ class Rating(models.Model):
         return self.rating
 
 
+class RatingChange(models.Model):
+    """A model for the append-only log of rating inserts, updates and deletes, and of bulk changes made without it"""
+    INSERT = 'insert'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    RELOAD = 'reload'
+    ACTIONS = [(INSERT, 'Insert'), (UPDATE, 'Update'), (DELETE, 'Delete'), (RELOAD, 'Reload')]
+
+    rating_pk = models.BigIntegerField()
+    user_pk = models.BigIntegerField(blank=True, null=True)
+    isbn = models.CharField(max_length=12, blank=True)
+    rating = models.IntegerField(blank=True, null=True)
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Model options."""
+
+        ordering = ['id']
+
+
 class Meeting(models.Model):
     """A model for denoting and storing meetings."""
     date = models.DateField()
@@ -392,6 +445,17 @@ class Message(models.Model):
     is_read = models.BooleanField(default=False)
     club = models.ForeignKey(Club, on_delete=models.CASCADE, blank=True, null=True)
 
+    class Meta:
+        """Model options."""
+
+        indexes = [models.Index(fields=['chat', '-date'])]
+
+
+class UnreadCount(models.Model):
+    """A model for the number of unread messages received by a user"""
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name='unread_count')
+    count = models.PositiveIntegerField(default=0)
+
 
 class Post(models.Model):
     """A model for a club post"""
@@ -399,9 +463,11 @@ class Post(models.Model):
     club = models.ForeignKey(Club, blank=False, on_delete=models.CASCADE)
     text = models.CharField(max_length=250)
     created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['id'], name='undelivered_post', condition=models.Q(delivered_at=None))]
 
         
 class UserPost(models.Model):
@@ -409,9 +475,30 @@ class UserPost(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     text = models.CharField(max_length=250)
     created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['id'], name='undelivered_user_post', condition=models.Q(delivered_at=None))]
+
+
+class TimelineEntry(models.Model):
+    """A model for a post delivered to the home timeline of one of its readers"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline')
+    post = models.ForeignKey(Post, null=True, on_delete=models.CASCADE)
+    user_post = models.ForeignKey(UserPost, null=True, on_delete=models.CASCADE)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        """Model options."""
+
+        ordering = ['-created_at', '-id']
+        constraints = [models.UniqueConstraint(fields=['user', 'post'], name='unique_timeline_post'),
+                       models.UniqueConstraint(fields=['user', 'user_post'], name='unique_timeline_user_post')]
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def get_post(self):
+        return self.post or self.user_post
 
   
 class RecommendedBook(models.Model):
@@ -0,0 +1,126 @@
+"""Keyset pagination with opaque cursors.
+
+Paginator's pages skip the rows before them with OFFSET, which reads every skipped row, and the views that build a
+Python list first read them all. CursorPaginator instead orders the queryset by a unique key, such as (-created_at,
+-id), and seeks past the last row of the page before, so every page reads only its own rows through the index
+behind the key. The cursors of the next and previous pages are signed tokens of the key values they start after,
+so clients cannot build or alter them.
+
+The search boxes of the paginated lists filter the rows on the server with matching, so a search covers every
+page rather than the one shown.
+"""
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CURSOR_SALT = 'bookclub.pagination'
+
+
+def matching(queryset, query, fields):
+    """ The rows with any of the fields containing the query, or every row when the query is empty """
+
+    query = (query or '').strip()
+    if not query:
+        return queryset
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f'{field}__icontains': query})
+    return queryset.filter(condition)
+
+
+class CursorPage:
+    """A page of rows with the cursors of the pages either side, used like Django's Page"""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self._next_cursor = next_cursor
+        self._previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._next_cursor is not None
+
+    def has_previous(self):
+        return self._previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        return self._next_cursor
+
+    def previous_cursor(self):
+        return self._previous_cursor
+
+
+class CursorPaginator:
+    """Paginates a queryset by seeking on its ordering key. The last field of the key must be unique"""
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def encode(self, row, direction):
+        values = [getattr(row, field) for field in self.fields]
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        return signing.dumps([direction] + values, salt=CURSOR_SALT, compress=True)
+
+    def decode(self, cursor):
+        try:
+            direction, *values = signing.loads(cursor, salt=CURSOR_SALT)
+            if direction not in ('next', 'previous') or len(values) != len(self.fields):
+                return None, None
+            return direction, [self.key_field(field).to_python(value) for field, value in zip(self.fields, values)]
+        except (signing.BadSignature, ValidationError, TypeError, ValueError):
+            return None, None
+
+    def key_field(self, name):
+        """ The model field or annotation a key value is read from """
+
+        annotations = self.queryset.query.annotations
+        if name in annotations:
+            return annotations[name].output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def seek(self, values, forward):
+        """ Rows after the key values in the page order when forward, otherwise rows before them """
+
+        condition = None
+        for field, order, value in reversed(list(zip(self.fields, self.ordering, values))):
+            lookup = 'gt' if order.startswith('-') != forward else 'lt'
+            after = Q(**{f'{field}__{lookup}': value})
+            condition = after if condition is None else after | (Q(**{field: value}) & condition)
+        return self.queryset.filter(condition)
+
+    def reverse_ordering(self):
+        return [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+
+    def get_page(self, cursor=None):
+        """ The page a cursor points to, or the first page when the cursor is missing or invalid """
+
+        direction, values = self.decode(cursor) if cursor else (None, None)
+        if direction == 'previous':
+            rows = list(self.seek(values, forward=False).order_by(*self.reverse_ordering())[:self.per_page + 1])
+            more_before = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            more_after = True
+        else:
+            queryset = self.seek(values, forward=True) if direction == 'next' else self.queryset
+            rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            more_after = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            more_before = direction == 'next'
+
+        next_cursor = self.encode(rows[-1], 'next') if rows and more_after else None
+        previous_cursor = self.encode(rows[0], 'previous') if rows and more_before else None
+        return CursorPage(rows, next_cursor, previous_cursor)
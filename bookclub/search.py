@@ -0,0 +1,155 @@
+"""Full-text search over books, clubs and users.
+
+Each searchable model has a set of weighted fields. On SQLite they are copied into an FTS5 table per model, keyed
+by the row's id, that the save and delete signals keep current and reindex refills after bulk inserts. On PostgreSQL
+a GIN index over the weighted tsvector of the same fields is kept current by the database itself. Queries match
+every word as a prefix and rank the results by bm25 on SQLite and ts_rank on PostgreSQL. Other databases fall back
+to the icontains scans the search page used before.
+
+Only the rows meeting their model's SEARCH_CONDITIONS are searched, which leaves out the inactive users the BX
+ratings import creates for its readers.
+"""
+import re
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from bookclub.models import Book, Club, User
+
+SEARCH_FIELDS = {
+    Book: [('title', 'A'), ('author', 'B'), ('isbn', 'C'), ('publisher', 'D'), ('pub_year', 'D')],
+    Club: [('name', 'A')],
+    User: [('first_name', 'A'), ('last_name', 'A'), ('email', 'B')],
+}
+SEARCH_CONDITIONS = {
+    User: {'is_active': True},
+}
+FTS_WEIGHTS = {'A': 10.0, 'B': 5.0, 'C': 2.0, 'D': 1.0}
+MAX_TERMS = 8
+
+
+def terms(query):
+    """ The words of a query, lower cased, without the punctuation the index splits them on """
+
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def backend():
+    return connection.vendor if connection.vendor in ('sqlite', 'postgresql') else 'icontains'
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def columns(model):
+    return [model._meta.get_field(name).column for name, weight in SEARCH_FIELDS[model]]
+
+
+def conditions(model):
+    """ The SQL and params of the SEARCH_CONDITIONS of a model, each starting with AND """
+
+    quote = connection.ops.quote_name
+    items = SEARCH_CONDITIONS.get(model, {}).items()
+    sql = ''.join(f' AND {quote(model._meta.get_field(name).column)} = %s' for name, value in items)
+    return sql, [value for name, value in items]
+
+
+def searchable(instance):
+    return all(getattr(instance, name) == value for name, value in SEARCH_CONDITIONS.get(type(instance), {}).items())
+
+
+def document(model):
+    """ The weighted tsvector PostgreSQL indexes and matches a model's rows by """
+
+    quote = connection.ops.quote_name
+    return ' || '.join(f"setweight(to_tsvector('simple', coalesce({quote(column)}::text, '')), '{weight}')"
+                       for column, (name, weight) in zip(columns(model), SEARCH_FIELDS[model]))
+
+
+def match_ids(model, query, offset, limit):
+    """ The ids of up to limit rows matching every word of the query, best match first, skipping offset of them """
+
+    words = terms(query)
+    if not words:
+        return []
+    quote = connection.ops.quote_name
+    if backend() == 'sqlite':
+        table = quote(fts_table(model))
+        weights = ', '.join(str(FTS_WEIGHTS[weight]) for name, weight in SEARCH_FIELDS[model])
+        sql = (f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY bm25({table}, {weights}), rowid '
+               f'LIMIT %s OFFSET %s')
+        params = [' '.join(f'"{word}"*' for word in words), limit, offset]
+    elif backend() == 'postgresql':
+        table, vector = quote(model._meta.db_table), document(model)
+        condition, condition_params = conditions(model)
+        sql = (f"SELECT id FROM {table} WHERE {vector} @@ to_tsquery('simple', %s){condition} "
+               f"ORDER BY ts_rank({vector}, to_tsquery('simple', %s)) DESC, id LIMIT %s OFFSET %s")
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        params = [tsquery] + condition_params + [tsquery, limit, offset]
+    else:
+        return list(icontains(model, query).order_by('pk').values_list('pk', flat=True)[offset:offset + limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def icontains(model, query):
+    """ The searchable rows with any searched field containing the whole query, as the search page matched them
+    before """
+
+    condition = Q()
+    for name, weight in SEARCH_FIELDS[model]:
+        condition |= Q(**{f'{name}__icontains': query})
+    return model.objects.filter(condition, **SEARCH_CONDITIONS.get(model, {}))
+
+
+def search(model, query, page=1, per_page=None):
+    """ The page of rows of a model matching a query, best match first, and whether there is a page after it """
+
+    per_page = per_page or settings.SEARCH_RESULTS_PER_PAGE
+    ids = match_ids(model, query, (max(page, 1) - 1) * per_page, per_page + 1)
+    rows = model.objects.in_bulk(ids[:per_page])
+    return [rows[pk] for pk in ids[:per_page] if pk in rows], len(ids) > per_page
+
+
+def index(instance):
+    """ Copy a row's searched fields into its model's FTS5 table, or drop it from the table when it is not searchable.
+    PostgreSQL's index needs no copy """
+
+    if backend() != 'sqlite':
+        return
+    model = type(instance)
+    if not searchable(instance):
+        unindex(model, instance.pk)
+        return
+    table = connection.ops.quote_name(fts_table(model))
+    values = [getattr(instance, name) for name, weight in SEARCH_FIELDS[model]]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+            cursor.execute(f"INSERT INTO {table} (rowid, {', '.join(columns(model))}) "
+                           f"VALUES (%s, {', '.join(['%s'] * len(values))})", [instance.pk] + values)
+
+
+def unindex(model, pk):
+    if backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {connection.ops.quote_name(fts_table(model))} WHERE rowid = %s', [pk])
+
+
+def reindex(models=None):
+    """ Refill the FTS5 tables of the models, of every searchable model when models is None, in one INSERT ... SELECT
+    each. Rows inserted without the ORM are only found once this has run """
+
+    if backend() != 'sqlite':
+        return
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for model in SEARCH_FIELDS if models is None else models:
+                table, fields = quote(fts_table(model)), ', '.join(quote(column) for column in columns(model))
+                condition, params = conditions(model)
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(f"INSERT INTO {table} (rowid, {', '.join(columns(model))}) "
+                               f"SELECT id, {fields} FROM {quote(model._meta.db_table)} WHERE 1 = 1{condition}", params)
@@ -0,0 +1,189 @@
+"""Synthetic users, clubs and activity for seeding the database at load testing scales.
+
+Users and clubs are given their ids before they are generated, so every row referring to them can be generated in
+any worker process from pools of ids, without asking the database. The workers return plain tuples and the seed
+command inserts them in bulk. Nothing here touches the database, so worker processes can import this module under
+any start method.
+"""
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from faker import Faker
+
+SCALES = {
+    'small': {'users': 500, 'clubs': 50, 'members': (20, 30), 'organisers': (5, 10), 'applications': (5, 15),
+              'club_posts': (0, 25), 'user_posts': (0, 5), 'follows': (5, 50), 'chats': (0, 3),
+              'messages': (1, 20), 'ratings': (0, 20)},
+    'medium': {'users': 10000, 'clubs': 500, 'members': (20, 60), 'organisers': (5, 10), 'applications': (5, 15),
+               'club_posts': (0, 50), 'user_posts': (0, 10), 'follows': (5, 50), 'chats': (0, 5),
+               'messages': (1, 30), 'ratings': (0, 30)},
+    'large': {'users': 100000, 'clubs': 5000, 'members': (20, 100), 'organisers': (5, 10),
+              'applications': (5, 20), 'club_posts': (0, 50), 'user_posts': (0, 10), 'follows': (5, 50),
+              'chats': (0, 5), 'messages': (1, 30), 'ratings': (0, 30)},
+    'huge': {'users': 1000000, 'clubs': 20000, 'members': (20, 200), 'organisers': (5, 10),
+             'applications': (5, 20), 'club_posts': (0, 50), 'user_posts': (0, 10), 'follows': (5, 30),
+             'chats': (0, 5), 'messages': (1, 30), 'ratings': (0, 30)},
+}
+PASSWORD = 'pbkdf2_sha256$260000$EoTovTO51J1EMhVCgfWM0t$jQjs11u15ELqQDNthGsC+vdLoDJRn2LDjU2qE7KqKj0='
+GENRES = ['Action', 'Adventure', 'Romance', 'Science Fiction', 'Horror', 'Non-fiction', 'Poetry', 'Thriller',
+          'Classics', 'Comics', 'Crime', 'Fantasy', 'Psychological', 'Foreign', 'Biographies', 'Religious']
+PROVIDERS = ['aol', 'yahoo', 'gmail', 'outlook', 'protonmail', 'hotmail', 'gov', 'icloud']
+TEXT_POOL_SIZE = 1000
+HISTORY_DAYS = 365
+UNREAD_CHANCE = 0.2
+
+_worker = {}
+
+
+class IdPool:
+    """The ids of a table's rows: some fixed ids followed by the ids from start up to stop"""
+
+    def __init__(self, fixed=(), start=0, stop=0):
+        self.fixed = list(fixed)
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return len(self.fixed) + self.stop - self.start
+
+    def __getitem__(self, index):
+        if index < len(self.fixed):
+            return self.fixed[index]
+        return self.start + index - len(self.fixed)
+
+    def is_new(self, index):
+        return index >= len(self.fixed)
+
+    def sample(self, rng, count, exclude=None):
+        """ count distinct ids, never exclude, or all of them if there are not enough """
+
+        indices = rng.sample(range(len(self)), min(count + 1, len(self)))
+        ids = [self[index] for index in indices if self[index] != exclude]
+        return ids[:count]
+
+
+def init_worker(scale, users, clubs, club_owners, books, seed):
+    """ Keep the pools a worker generates rows from, and pools of texts, since Faker's text is slow """
+
+    faker = Faker('en_GB')
+    faker.seed_instance(seed)
+    _worker.update(
+        scale=scale, users=users, clubs=clubs, club_owners=club_owners, books=books, seed=seed, faker=faker,
+        now=datetime.now(timezone.utc),
+        bios=[faker.text(max_nb_chars=400) for i in range(TEXT_POOL_SIZE)],
+        club_posts=[faker.text(max_nb_chars=120) for i in range(TEXT_POOL_SIZE)],
+        user_posts=[faker.text(max_nb_chars=84) for i in range(TEXT_POOL_SIZE)],
+        messages=[faker.sentence() for i in range(TEXT_POOL_SIZE)],
+        descriptions=[faker.text(max_nb_chars=512) for i in range(TEXT_POOL_SIZE)],
+    )
+
+
+def task_random(kind, first):
+    """ A generator seeded by the task, so the same seed gives the same rows however the tasks are spread """
+
+    seed = f"{_worker['seed']}:{kind}:{first}"
+    _worker['faker'].seed_instance(seed)
+    return random.Random(seed)
+
+
+def randint(rng, bounds):
+    return rng.randint(*bounds)
+
+
+def past_date(rng):
+    return _worker['now'] - timedelta(seconds=rng.uniform(0, HISTORY_DAYS * 24 * 3600))
+
+
+def email_part(name):
+    return re.sub('[^a-z0-9]', '', name.lower())
+
+
+def generate_users(first, last):
+    """ Rows of id, email, password, first_name, last_name, public_bio, favourite_genre, location, age,
+    date_joined, is_email_verified for the new users among the pool indices first to last """
+
+    rng = task_random('users', first)
+    faker, users = _worker['faker'], _worker['users']
+    rows = []
+    for index in range(first, last):
+        if not users.is_new(index):
+            continue
+        user_id = users[index]
+        first_name, last_name = faker.first_name(), faker.last_name()
+        email = f'{email_part(first_name)}.{email_part(last_name)}.{user_id}@{rng.choice(PROVIDERS)}.com'
+        rows.append((user_id, email, PASSWORD, first_name, last_name, rng.choice(_worker['bios']),
+                     rng.choice(GENRES), faker.city(), rng.randint(16, 100), past_date(rng), True))
+    return {'users': rows}
+
+
+def generate_clubs(first, last):
+    """ The new clubs among the pool indices first to last, and the members, organisers, memberships,
+    applications and posts of every club among them """
+
+    rng = task_random('clubs', first)
+    faker, users, clubs, scale = _worker['faker'], _worker['users'], _worker['clubs'], _worker['scale']
+    rows = {'clubs': [], 'members': [], 'organisers': [], 'memberships': [], 'applications': [], 'posts': []}
+    for index in range(first, last):
+        club_id = clubs[index]
+        if clubs.is_new(index):
+            owner_id = users[rng.randrange(len(users))]
+            location = faker.city()
+            rows['clubs'].append((club_id, f'{location[:28]} Book Club {club_id}', rng.choice(_worker['descriptions']),
+                                  location, owner_id, rng.random() < 0.5, True))
+        else:
+            owner_id = _worker['club_owners'][club_id]
+
+        counts = [randint(rng, scale['members']), randint(rng, scale['organisers']),
+                  randint(rng, scale['applications'])]
+        people = users.sample(rng, sum(counts), exclude=owner_id)
+        members, organisers = people[:counts[0]], people[counts[0]:counts[0] + counts[1]]
+        applicants = people[counts[0] + counts[1]:]
+        rows['members'] += [(club_id, user_id) for user_id in members]
+        rows['organisers'] += [(club_id, user_id) for user_id in organisers]
+        # The membership of the owner of a fixed club was made with the club
+        roles = ([(owner_id, 'owner')] if clubs.is_new(index) else []) + \
+            [(user_id, 'organiser') for user_id in organisers] + [(user_id, 'member') for user_id in members]
+        rows['memberships'] += [(club_id, user_id, role, past_date(rng)) for user_id, role in roles]
+        rows['applications'] += [(user_id, club_id) for user_id in applicants]
+
+        authors = [owner_id] + organisers + members
+        rows['posts'] += [(rng.choice(authors), club_id, rng.choice(_worker['club_posts']), past_date(rng))
+                          for i in range(randint(rng, scale['club_posts']))]
+    return rows
+
+
+def generate_chat(rng, user_id, receiver_id, chat, rows):
+    scale = _worker['scale']
+    count = randint(rng, scale['messages'])
+    date = past_date(rng)
+    unread = rng.random() < UNREAD_CHANCE
+    for number in range(count):
+        sender_id, to_id = (user_id, receiver_id) if rng.random() < 0.5 else (receiver_id, user_id)
+        date += timedelta(seconds=rng.uniform(10, 6 * 3600))
+        rows['messages'].append((chat, sender_id, to_id, rng.choice(_worker['messages']), min(date, _worker['now']),
+                                 not (unread and number == count - 1)))
+    rows['chats'].append((user_id, receiver_id, unread))
+
+
+def generate_activity(first, last):
+    """ The user posts, follows, chats, messages and ratings of the users among the pool indices first to last.
+    Messages refer to their chat by its position in the chats returned """
+
+    rng = task_random('activity', first)
+    users, books, scale = _worker['users'], _worker['books'], _worker['scale']
+    rows = {'user_posts': [], 'follows': [], 'chats': [], 'messages': [], 'ratings': []}
+    for index in range(first, last):
+        user_id = users[index]
+        rows['user_posts'] += [(user_id, rng.choice(_worker['user_posts']), past_date(rng))
+                               for i in range(randint(rng, scale['user_posts']))]
+        rows['follows'] += [(followee_id, user_id) for followee_id
+                            in users.sample(rng, randint(rng, scale['follows']), exclude=user_id)]
+
+        # Each pair of users shares one chat, so chats only start with users later in the pool
+        later = range(index + 1, len(users))
+        for receiver_index in rng.sample(later, min(randint(rng, scale['chats']), len(later))):
+            generate_chat(rng, user_id, users[receiver_index], len(rows['chats']), rows)
+
+        for book_id, isbn in rng.sample(books, min(randint(rng, scale['ratings']), len(books))):
+            rows['ratings'].append((user_id, book_id, isbn, rng.randint(1, 10)))
+    return rows
@@ -0,0 +1,130 @@
+"""Signal handlers for the bookclub models."""
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from bookclub.inbox import add_unread
+from bookclub.memberships import invalidate_user_clubs
+from bookclub.models import Rating, RatingChange, User, Club, Membership, Post, UserPost, Message, Book
+from bookclub.search import SEARCH_CONDITIONS, SEARCH_FIELDS, index, unindex
+from bookclub.timelines import enqueue
+
+
+@receiver(post_save, sender=Rating)
+def log_rating_saved(sender, instance, created, **kwargs):
+    """Append an insert or update to the rating change log. Imported BX ratings are not logged"""
+    if instance.imported:
+        return
+    RatingChange.objects.create(
+        rating_pk=instance.pk,
+        user_pk=instance.user_id,
+        isbn=instance.isbn,
+        rating=int(instance.rating),
+        action=RatingChange.INSERT if created else RatingChange.UPDATE
+    )
+
+
+@receiver(post_delete, sender=Rating)
+def log_rating_deleted(sender, instance, **kwargs):
+    """Append a delete to the rating change log"""
+    if instance.imported:
+        return
+    RatingChange.objects.create(
+        rating_pk=instance.pk,
+        user_pk=instance.user_id,
+        isbn=instance.isbn,
+        action=RatingChange.DELETE
+    )
+
+
+@receiver(post_save, sender=Club)
+def sync_owner_membership(sender, instance, **kwargs):
+    """Keep the memberships in line when a club is created or changes owner"""
+    if not instance.memberships.filter(user_id=instance.owner_id, role=Membership.OWNER).exists():
+        memberships_changed(instance.sync_memberships())
+
+
+@receiver(pre_delete, sender=Club)
+def forget_disbanded_club(sender, instance, **kwargs):
+    """Forget the cached clubs of everyone in a club that is being disbanded"""
+    invalidate_user_clubs(instance.memberships.values_list('user_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Club.members.through)
+@receiver(m2m_changed, sender=Club.organisers.through)
+def sync_role_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the memberships in line when users join, leave or change role in a club"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        clubs = [instance]
+    elif action == 'post_clear':
+        clubs = instance.get_all_clubs()
+    else:
+        clubs = Club.objects.filter(pk__in=pk_set)
+    for club in clubs:
+        memberships_changed(club.sync_memberships())
+
+
+def memberships_changed(user_ids):
+    """Forget the cached clubs of the users and rebuild their timelines"""
+    invalidate_user_clubs(user_ids)
+    if user_ids:
+        enqueue('rebuild', sorted(user_ids))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=UserPost)
+def deliver_post(sender, instance, created, **kwargs):
+    """Push a new post to the timelines of its readers"""
+    if created:
+        enqueue('deliver', sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def rebuild_follower_timelines(sender, instance, action, reverse, pk_set, **kwargs):
+    """Rebuild the timelines of users who follow or unfollow someone"""
+    if reverse:
+        follower_ids = [instance.pk]
+    elif action == 'pre_clear':
+        # The followers a clear removes are gone by the time post_clear is sent
+        instance._cleared_follower_ids = list(instance.followers.values_list('id', flat=True))
+        return
+    elif action == 'post_clear':
+        follower_ids = instance.__dict__.pop('_cleared_follower_ids', [])
+    else:
+        follower_ids = sorted(pk_set or [])
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        enqueue('rebuild', follower_ids)
+
+
+@receiver(post_save, sender=Message)
+def count_sent_message(sender, instance, created, **kwargs):
+    """Add a new unread message to its receiver's unread count"""
+    if created and not instance.is_read:
+        add_unread(instance.receiver_user_id, 1)
+
+
+@receiver(post_delete, sender=Message)
+def uncount_deleted_message(sender, instance, **kwargs):
+    """Take an unread message that is deleted off its receiver's unread count"""
+    if not instance.is_read:
+        add_unread(instance.receiver_user_id, -1)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Club)
+@receiver(post_save, sender=User)
+def index_searched_fields(sender, instance, update_fields, **kwargs):
+    """Bring a saved book, club or user up to date in the search index, unless none of its searched fields were
+    saved, as when a user logs in"""
+    searched = {name for name, weight in SEARCH_FIELDS[sender]} | set(SEARCH_CONDITIONS.get(sender, {}))
+    if update_fields and not update_fields & searched:
+        return
+    index(instance)
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Club)
+@receiver(post_delete, sender=User)
+def unindex_deleted(sender, instance, **kwargs):
+    """Drop a deleted book, club or user from the search index"""
+    unindex(sender, instance.pk)
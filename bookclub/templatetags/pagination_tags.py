@@ -0,0 +1,12 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """ The query string of the current page with its cursor replaced, so paging keeps the other parameters """
+
+    query = context['request'].GET.copy()
+    query['cursor'] = cursor
+    return f'?{query.urlencode()}'
@@ -0,0 +1,28 @@
+"""Unit tests of the benchmark_search command."""
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from bookclub.models import Book
+
+
+class BenchmarkSearchTestCase(TestCase):
+    """Test case for benchmarking the search index against icontains scans"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'search_benchmark.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_benchmark_reports_both_paths_and_rolls_back(self):
+        call_command('benchmark_search', books=300, queries=8, output=self.output, stdout=io.StringIO())
+        with open(self.output) as file:
+            report = json.load(file)
+        self.assertEqual(report['books'], 300)
+        for path in ['full_text', 'icontains']:
+            self.assertGreater(report[path]['p99_ms'], 0)
+        self.assertFalse(Book.objects.exists())
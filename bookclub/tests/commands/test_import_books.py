@@ -0,0 +1,80 @@
+"""Unit tests of the import_books command."""
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from bookclub.models import Book
+
+BOOKS_CSV = '''"ISBN";"Book-Title";"Book-Author";"Year-Of-Publication";"Publisher";"Image-URL-S";"Image-URL-M";"Image-URL-L"
+"000000000x";"Popular Book";"Jane Doe";"1999";"Example Press";"http://s.example.com/1";"http://m.example.com/1";"http://l.example.com/1"
+"1111111111";"Too Old";"Jane Doe";"1700";"Example Press";"http://s.example.com/2";"http://m.example.com/2";"http://l.example.com/2"
+"2222222222";"Too New";"Jane Doe";"2050";"Example Press";"http://s.example.com/3";"http://m.example.com/3";"http://l.example.com/3"
+"3333333333";"Rarely Rated";"Jane Doe";"2001";"Example Press";"http://s.example.com/4";"http://m.example.com/4";"http://l.example.com/4"
+"4444444444";"Also Popular";"John Doe";"2005";"Example Press";"http://s.example.com/5";"http://m.example.com/5";"http://l.example.com/5"
+'''
+
+RATINGS_CSV = '''"User-ID";"ISBN";"Book-Rating"
+"1";"000000000x";"8"
+"2";"000000000x";"7"
+"1";"1111111111";"8"
+"2";"1111111111";"9"
+"1";"2222222222";"8"
+"2";"2222222222";"9"
+"1";"3333333333";"8"
+"2";"3333333333";"0"
+"1";"4444444444";"5"
+"2";"4444444444";"6"
+'''
+
+
+class ImportBooksTestCase(TestCase):
+    """Test case for importing the BX catalogue"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.books_path = os.path.join(self.directory.name, 'books.csv')
+        self.ratings_path = os.path.join(self.directory.name, 'ratings.csv')
+        self._write(self.books_path, BOOKS_CSV)
+        self._write(self.ratings_path, RATINGS_CSV)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_import_books_with_enough_explicit_ratings(self):
+        self._import()
+        self.assertEqual(set(Book.objects.values_list('isbn', flat=True)), {'000000000X', '4444444444'})
+        book = Book.objects.get(isbn='000000000X')
+        self.assertEqual(book.title, 'Popular Book')
+        self.assertEqual(book.pub_year, 1999)
+        self.assertEqual(book.large_url, 'http://l.example.com/1')
+
+    def test_import_again_leaves_books_unchanged(self):
+        self._import()
+        ids = dict(Book.objects.values_list('isbn', 'id'))
+        output = self._import()
+        self.assertIn('0 books created, 0 updated and 2 unchanged', output)
+        self.assertEqual(dict(Book.objects.values_list('isbn', 'id')), ids)
+
+    def test_import_updates_changed_books(self):
+        self._import()
+        self._write(self.books_path, BOOKS_CSV.replace('Popular Book', 'Popular Book, Second Edition'))
+        output = self._import()
+        self.assertIn('0 books created, 1 updated and 1 unchanged', output)
+        self.assertEqual(Book.objects.get(isbn='000000000X').title, 'Popular Book, Second Edition')
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_import_without_csv_fails(self):
+        os.remove(self.books_path)
+        with self.assertRaises(CommandError):
+            self._import()
+
+    def _write(self, path, content):
+        with open(path, 'w', encoding='latin-1') as file:
+            file.write(content)
+
+    def _import(self):
+        output = io.StringIO()
+        call_command('import_books', books=self.books_path, ratings=self.ratings_path, min_ratings=1, stdout=output)
+        return output.getvalue()
@@ -0,0 +1,101 @@
+"""Unit tests of the import_ratings command."""
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from bookclub.models import User, Book, Rating, RatingChange
+from bookclub.search import reindex, search
+
+RATINGS_CSV = '''"User-ID";"ISBN";"Book-Rating"
+"101";"12345678910";"8"
+"101";"12345678911";"0"
+"102";"12345678911";"6"
+"102";"0000000000";"9"
+"103";"12345678910";"10"
+"103";"12345678911";"3"
+"104";"12345678910";"5"
+'''
+
+
+class ImportRatingsTestCase(TestCase):
+    """Test case for importing the BX ratings"""
+
+    fixtures = ['bookclub/tests/fixtures/default_books.json', 'bookclub/tests/fixtures/default_users.json']
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'ratings.csv')
+        self.checkpoint = os.path.join(self.directory.name, 'checkpoint.json')
+        with open(self.path, 'w', encoding='latin-1') as file:
+            file.write(RATINGS_CSV)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_import_explicit_ratings_of_catalogue_books(self):
+        self._import()
+        ratings = set(Rating.objects.values_list('user__bx_user_id', 'book__isbn', 'rating', 'imported'))
+        self.assertEqual(ratings, {(101, '12345678910', 8, True), (102, '12345678911', 6, True),
+                                   (103, '12345678910', 10, True), (103, '12345678911', 3, True),
+                                   (104, '12345678910', 5, True)})
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_import_creates_inactive_users(self):
+        self._import()
+        users = User.objects.filter(bx_user_id__isnull=False)
+        self.assertEqual(users.count(), 4)
+        self.assertFalse(users.filter(is_active=True).exists())
+        self.assertFalse(users.first().has_usable_password())
+
+    def test_imported_readers_are_not_listed_or_searched(self):
+        self._import()
+        reindex()
+        readers = set(User.objects.filter(bx_user_id__isnull=False))
+        self.assertEqual(search(User, 'reader', per_page=20)[0], [])
+        self.assertEqual(search(User, 'bx', per_page=20)[0], [])
+        user = User.objects.get(email='johndoe@bookclub.com')
+        self.client.login(email=user.email, password='Password123')
+        self.assertFalse(readers & set(self.client.get(reverse('user_list')).context['users']))
+        self.assertFalse(readers & set(self.client.get(reverse('inbox')).context['users']))
+        reader = readers.pop()
+        reader.is_active = True
+        reader.save(update_fields=['is_active'])
+        self.assertEqual(search(User, f'reader {reader.bx_user_id}')[0], [reader])
+
+    def test_import_does_not_log_rating_changes(self):
+        self._import()
+        self.assertEqual(RatingChange.objects.count(), 0)
+
+    def test_import_twice_needs_restart(self):
+        self._import()
+        with self.assertRaises(CommandError):
+            self._import()
+        self._import(restart=True)
+        self.assertEqual(Rating.objects.count(), 5)
+        self.assertEqual(User.objects.filter(bx_user_id__isnull=False).count(), 4)
+
+    def test_interrupted_import_resumes(self):
+        self._import()
+        expected = set(Rating.objects.values_list('user__bx_user_id', 'book__isbn', 'rating'))
+        first_chunk_last_id = Rating.objects.order_by('id').values_list('id', flat=True)[0]
+        with open(self.checkpoint, 'w') as file:
+            json.dump({'path': self.path, 'chunk_size': 2, 'chunks_done': 1, 'imported': 1,
+                       'last_rating_id': first_chunk_last_id}, file)
+        self._import()
+        self.assertEqual(set(Rating.objects.values_list('user__bx_user_id', 'book__isbn', 'rating')), expected)
+        self.assertEqual(Rating.objects.count(), 5)
+
+    def test_checkpoint_of_other_options_is_refused(self):
+        with open(self.checkpoint, 'w') as file:
+            json.dump({'path': self.path, 'chunk_size': 100, 'chunks_done': 1, 'imported': 1,
+                       'last_rating_id': 0}, file)
+        with self.assertRaises(CommandError):
+            self._import()
+
+    def _import(self, **options):
+        call_command('import_ratings', path=self.path, checkpoint=self.checkpoint, chunk_size=2,
+                     stdout=io.StringIO(), **options)
@@ -0,0 +1,57 @@
+"""Unit tests of the loadtest command."""
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from bookclub.loadtest import summarise
+
+
+class LoadTestTestCase(TestCase):
+    """Test case for load testing the views"""
+
+    fixtures = [
+        'bookclub/tests/fixtures/default_users.json',
+        'bookclub/tests/fixtures/default_books.json',
+        'bookclub/tests/fixtures/default_clubs.json',
+        'bookclub/tests/fixtures/default_chats.json',
+        'bookclub/tests/fixtures/default_messages.json',
+        'bookclub/tests/fixtures/default_posts.json',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'loadtest.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_test_reports_each_scenario(self):
+        scenarios = ['book_list', 'book_profile', 'search_page', 'inbox', 'chat', 'club_members', 'feed']
+        stdout = io.StringIO()
+        call_command('loadtest', users=3, threads=1, requests=40, scenarios=scenarios, host='testserver',
+                     output=self.output, stdout=stdout)
+        with open(self.output) as file:
+            report = json.load(file)
+        self.assertEqual(sum(row['requests'] for row in report['results'].values()), 40)
+        self.assertTrue(set(report['results']) <= set(scenarios))
+        for row in report['results'].values():
+            self.assertEqual(row['errors'], 0)
+            self.assertGreater(row['mean_queries'], 0)
+            self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        self.assertIn('requests a second, 0 errors', stdout.getvalue())
+
+    def test_load_test_refuses_to_seed_seeded_database(self):
+        with self.assertRaises(CommandError):
+            call_command('loadtest', scale='small', output=self.output, stdout=io.StringIO())
+
+    def test_summary_counts_errors_and_throughput(self):
+        samples = [('inbox', 200, 0.01, 5), ('inbox', 500, 0.03, None), ('home', 302, 0.02, 10)]
+        summary = summarise(samples, 2.0)
+        self.assertEqual(summary['inbox']['requests'], 2)
+        self.assertEqual(summary['inbox']['errors'], 1)
+        self.assertEqual(summary['inbox']['requests_per_second'], 1.0)
+        self.assertEqual(summary['inbox']['mean_queries'], 5)
+        self.assertEqual(summary['home']['errors'], 0)
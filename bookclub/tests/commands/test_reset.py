@@ -0,0 +1,82 @@
+"""Unit tests of the reset and unseed commands."""
+import io
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase
+from unittest.mock import patch
+from bookclub.management.commands.reset import reset_plan
+from bookclub.models import User, Club, Book, Rating, RatingChange, Chat, Message, Post, UserPost, Application
+
+
+class ResetTestCase(TestCase):
+    """Test case for emptying the seeded tables in bulk"""
+
+    fixtures = [
+        'bookclub/tests/fixtures/default_users.json',
+        'bookclub/tests/fixtures/default_books.json',
+        'bookclub/tests/fixtures/default_clubs.json',
+        'bookclub/tests/fixtures/default_applications.json',
+        'bookclub/tests/fixtures/default_chats.json',
+        'bookclub/tests/fixtures/default_messages.json',
+        'bookclub/tests/fixtures/default_posts.json',
+        'bookclub/tests/fixtures/default_user_posts.json',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@bookclub.com')
+        self.other_user = User.objects.exclude(id=self.user.id).first()
+        self.user.followers.add(self.other_user)
+        Club.objects.first().members.add(self.other_user)
+        Rating.objects.create(user=self.user, book=Book.objects.first(), isbn=Book.objects.first().isbn, rating=7)
+        self.group = Group.objects.create(name='Moderators')
+        self.user.groups.add(self.group)
+
+    def test_plan_deletes_children_before_parents(self):
+        ordered, nulled = reset_plan()
+        position = {model: index for index, model in enumerate(ordered)}
+        for model in ordered:
+            for field in model._meta.concrete_fields:
+                if field.is_relation and field.related_model in position and field.related_model is not model:
+                    self.assertLess(position[model], position[field.related_model])
+        self.assertIn(User.followers.through, position)
+        self.assertNotIn(Group, position)
+        self.assertEqual(nulled, [])
+
+    def test_reset_empties_seeded_tables(self):
+        call_command('reset', stdout=io.StringIO())
+        for model in [User, Club, Book, Rating, Chat, Message, Post, UserPost, Application,
+                      User.followers.through, Club.members.through, User.groups.through]:
+            self.assertEqual(model.objects.count(), 0)
+        self.assertTrue(Group.objects.filter(id=self.group.id).exists())
+
+    def test_reset_does_not_send_delete_signals(self):
+        deletes = RatingChange.objects.filter(action=RatingChange.DELETE).count()
+        call_command('reset', stdout=io.StringIO())
+        self.assertEqual(RatingChange.objects.filter(action=RatingChange.DELETE).count(), deletes)
+        self.assertEqual(RatingChange.objects.last().action, RatingChange.RELOAD)
+
+    def test_safe_reset_sends_delete_signals(self):
+        call_command('reset', safe=True, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 0)
+        self.assertTrue(RatingChange.objects.filter(action=RatingChange.DELETE, user_pk=self.user.id).exists())
+
+    def test_safe_reset_deletes_only_ratings_through_the_orm(self):
+        deleted = []
+        delete = QuerySet.delete
+
+        def record(queryset):
+            deleted.append(queryset.model)
+            return delete(queryset)
+
+        with patch.object(QuerySet, 'delete', record):
+            call_command('reset', safe=True, stdout=io.StringIO())
+        self.assertEqual(deleted, [Rating])
+        self.assertEqual(Message.objects.count(), 0)
+
+    def test_unseed_resets(self):
+        output = io.StringIO()
+        call_command('unseed', stdout=output)
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Club.objects.count(), 0)
+        self.assertIn('successfully been unseeded', output.getvalue())
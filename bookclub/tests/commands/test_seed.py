@@ -0,0 +1,110 @@
+"""Unit tests of the seed command and the synthetic data it generates."""
+import io
+import random
+from django.core.management import call_command
+from django.test import TestCase
+from bookclub.models import User, Club, Book, Application, Chat, Membership, Message, Rating, TimelineEntry, UserPost
+from bookclub.seeding import SCALES, IdPool, init_worker, generate_users, generate_clubs, generate_activity
+
+TEST_SCALE = dict(SCALES['small'], users=60, clubs=6, members=(5, 10), organisers=(1, 3), applications=(1, 3),
+                  follows=(2, 8), chats=(0, 3), messages=(1, 5), ratings=(1, 2))
+
+
+class IdPoolTestCase(TestCase):
+    """Test case for the pools of ids rows are generated from"""
+
+    def setUp(self):
+        self.pool = IdPool([7, 3], 100, 105)
+
+    def test_pool_holds_fixed_ids_then_range(self):
+        self.assertEqual(len(self.pool), 7)
+        self.assertEqual([self.pool[index] for index in range(len(self.pool))], [7, 3, 100, 101, 102, 103, 104])
+        self.assertFalse(self.pool.is_new(1))
+        self.assertTrue(self.pool.is_new(2))
+
+    def test_sample_is_distinct_and_leaves_out_excluded_id(self):
+        rng = random.Random(0)
+        for count in range(8):
+            ids = self.pool.sample(rng, count, exclude=100)
+            self.assertEqual(len(ids), min(count, 6))
+            self.assertEqual(len(set(ids)), len(ids))
+            self.assertNotIn(100, ids)
+
+
+class SeedingTestCase(TestCase):
+    """Test case for the synthetic data generators"""
+
+    def setUp(self):
+        self.users = IdPool([1, 2], 10, 10 + TEST_SCALE['users'])
+        self.clubs = IdPool([1], 5, 5 + TEST_SCALE['clubs'])
+        init_worker(TEST_SCALE, self.users, self.clubs, {1: 2}, [(1, '12345678910'), (2, '12345678911')], 3)
+
+    def test_only_new_users_are_generated(self):
+        rows = generate_users(0, len(self.users))['users']
+        self.assertEqual([row[0] for row in rows], list(range(10, 10 + TEST_SCALE['users'])))
+        self.assertEqual(len({row[1] for row in rows}), len(rows))
+
+    def test_same_seed_generates_same_rows(self):
+        first = generate_activity(0, 20)
+        second = generate_activity(0, 20)
+        self.assertEqual(first, second)
+
+    def test_club_users_are_distinct(self):
+        rows = generate_clubs(0, len(self.clubs))
+        self.assertEqual(len(rows['clubs']), TEST_SCALE['clubs'])
+        self.assertTrue(all(len(club[1]) <= 48 for club in rows['clubs']))
+        owners = {club[0]: club[4] for club in rows['clubs']}
+        owners[1] = 2
+        in_club = rows['members'] + rows['organisers'] + [(club, user) for user, club in rows['applications']]
+        self.assertEqual(len(set(in_club)), len(in_club))
+        self.assertFalse(any(owners[club] == user for club, user in in_club))
+
+    def test_each_pair_of_users_shares_one_chat(self):
+        chats = generate_activity(0, len(self.users))['chats']
+        pairs = [frozenset([user, receiver]) for user, receiver, has_unread in chats]
+        self.assertEqual(len(set(pairs)), len(pairs))
+
+
+class SeedCommandTestCase(TestCase):
+    """Test case for the seed command"""
+
+    fixtures = ['bookclub/tests/fixtures/default_books.json']
+
+    def setUp(self):
+        SCALES['test'] = TEST_SCALE
+
+    def tearDown(self):
+        del SCALES['test']
+
+    def test_seed_at_scale(self):
+        books = Book.objects.count()
+        call_command('seed', scale='test', workers=1, seed=0, skip_books=True, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 4 + TEST_SCALE['users'])
+        self.assertEqual(Club.objects.count(), 3 + TEST_SCALE['clubs'])
+        self.assertEqual(Book.objects.count(), books)
+        self.assertTrue(Application.objects.exists())
+        self.assertTrue(UserPost.objects.exists())
+        self.assertEqual(Rating.objects.filter(imported=False).count(), Rating.objects.count())
+        self.assertGreater(Rating.objects.count(), 0)
+
+        john = User.objects.get(email='johndoe@bookclub.com')
+        self.assertTrue(john.followees.exists())
+        bush_house = Club.objects.get(name='Bush House Book Club')
+        self.assertGreaterEqual(bush_house.get_number_of_members(), TEST_SCALE['members'][0])
+        self.assertEqual(Membership.objects.count(), Club.objects.count() + Club.members.through.objects.count() +
+                         Club.organisers.through.objects.count())
+        self.assertEqual(bush_house.user_level(john), 'Owner')
+        self.assertTrue(TimelineEntry.objects.filter(user=john).exists())
+
+        chat = Chat.objects.first()
+        chat_messages = Message.objects.filter(chat=chat)
+        self.assertTrue(chat_messages.exists())
+        self.assertTrue(all({message.sender_user_id, message.receiver_user_id} == {chat.user_id, chat.receiver_id}
+                            for message in chat_messages))
+
+    def test_seed_needs_empty_database(self):
+        call_command('seed', scale='test', workers=1, seed=0, skip_books=True, stdout=io.StringIO())
+        output = io.StringIO()
+        call_command('seed', scale='test', workers=1, seed=0, skip_books=True, stdout=output)
+        self.assertIn('must first be unseeded', output.getvalue())
+        self.assertEqual(User.objects.count(), 4 + TEST_SCALE['users'])
@@ -0,0 +1,151 @@
+"""Unit tests for the Membership model"""
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from bookclub.memberships import get_user_club_roles, get_user_clubs, user_clubs_key
+from bookclub.models import User, Club, Membership
+
+
+class MembershipModelTestCase(TestCase):
+    """Test case for keeping memberships in line with the roles of a club"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_clubs.json",
+        "bookclub/tests/fixtures/default_users.json"]
+
+    def setUp(self):
+        self.owner = User.objects.get(pk=1)
+        self.user = User.objects.get(pk=2)
+        self.club = Club.objects.filter(owner=self.owner).first()
+
+    def _roles(self):
+        return dict(self.club.memberships.values_list('user_id', 'role'))
+
+    def test_owner_of_loaded_club_has_membership(self):
+        self.assertEqual(self._roles(), {self.owner.id: Membership.OWNER})
+        self.assertEqual(Membership.objects.count(), Club.objects.count())
+
+    def test_new_club_owner_has_membership(self):
+        club = Club.objects.create(name='New Club', location='London', owner=self.user)
+        self.assertEqual(club.user_level(self.user), 'Owner')
+
+    def test_make_member_adds_membership(self):
+        self.club.make_member(self.user)
+        self.assertEqual(self._roles()[self.user.id], Membership.MEMBER)
+        self.assertEqual(self.club.user_level(self.user), 'Member')
+
+    def test_promote_and_demote_change_role(self):
+        self.club.make_member(self.user)
+        joined_at = self.club.memberships.get(user=self.user).joined_at
+        self.club.make_organiser(self.user)
+        self.assertEqual(self._roles()[self.user.id], Membership.ORGANISER)
+        self.club.demote_organiser(self.user)
+        membership = self.club.memberships.get(user=self.user)
+        self.assertEqual(membership.role, Membership.MEMBER)
+        self.assertEqual(membership.joined_at, joined_at)
+
+    def test_remove_from_club_deletes_membership(self):
+        self.club.make_member(self.user)
+        self.club.remove_from_club(self.user)
+        self.assertNotIn(self.user.id, self._roles())
+        self.assertEqual(self.club.user_level(self.user), 'Not in club')
+
+    def test_make_owner_swaps_roles(self):
+        self.club.make_member(self.user)
+        self.club.make_owner(self.user)
+        self.assertEqual(self._roles(), {self.user.id: Membership.OWNER, self.owner.id: Membership.MEMBER})
+
+    def test_reverse_changes_sync_memberships(self):
+        self.user.member_of.add(self.club)
+        self.assertEqual(self._roles()[self.user.id], Membership.MEMBER)
+        self.user.member_of.clear()
+        self.assertNotIn(self.user.id, self._roles())
+
+    def test_club_users_carry_their_role(self):
+        self.club.make_member(self.user)
+        roles = {user.id: user.role for user in self.club.get_users_with_roles()}
+        self.assertEqual(roles, {self.owner.id: Membership.OWNER, self.user.id: Membership.MEMBER})
+        self.assertEqual(self.club.get_number_of_users(), 2)
+
+    def test_user_clubs_take_one_query(self):
+        for club in Club.objects.exclude(owner=self.user):
+            club.make_member(self.user)
+        with self.assertNumQueries(1):
+            clubs = list(self.user.get_all_clubs())
+        self.assertEqual(len(clubs), self.user.get_number_of_clubs())
+        self.assertEqual(len(clubs), Club.objects.count())
+
+    def test_user_can_only_have_one_membership_of_a_club(self):
+        with self.assertRaises(IntegrityError):
+            Membership.objects.create(club=self.club, user=self.owner, role=Membership.MEMBER)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UserClubsCacheTestCase(TestCase):
+    """Test case for the cached clubs of each user"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_clubs.json",
+        "bookclub/tests/fixtures/default_users.json"]
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.get(pk=1)
+        self.user = User.objects.get(pk=2)
+        self.club = Club.objects.filter(owner=self.owner).first()
+
+    def test_club_roles_are_read_from_cache(self):
+        self.assertEqual(get_user_club_roles(self.owner), dict(self.owner.memberships.values_list('club_id', 'role')))
+        with self.assertNumQueries(0):
+            get_user_club_roles(self.owner)
+
+    def test_users_have_their_own_club_lists(self):
+        self.club.make_member(self.user)
+        self.assertEqual(get_user_club_roles(self.owner)[self.club.id], Membership.OWNER)
+        self.assertEqual(get_user_club_roles(self.user)[self.club.id], Membership.MEMBER)
+
+    def test_joining_and_leaving_invalidate(self):
+        self.assertEqual(get_user_club_roles(self.user).get(self.club.id), None)
+        self.club.make_member(self.user)
+        self.assertEqual(get_user_club_roles(self.user)[self.club.id], Membership.MEMBER)
+        self.club.make_organiser(self.user)
+        self.assertEqual(get_user_club_roles(self.user)[self.club.id], Membership.ORGANISER)
+        self.club.remove_from_club(self.user)
+        self.assertNotIn(self.club.id, get_user_club_roles(self.user))
+
+    def test_disbanding_invalidates(self):
+        self.club.make_member(self.user)
+        get_user_club_roles(self.user)
+        self.club.delete()
+        self.assertNotIn(self.club.id, get_user_club_roles(self.user))
+
+    def test_user_clubs_carry_role(self):
+        self.club.make_member(self.user)
+        roles = {club.id: club.role for club in get_user_clubs(self.user)}
+        self.assertEqual(roles, dict(self.user.memberships.values_list('club_id', 'role')))
+        self.assertEqual(roles[self.club.id], Membership.MEMBER)
+
+
+class SharedUserClubsCacheTestCase(TestCase):
+    """Test case for the cached clubs of each user in the database cache every process shares"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_clubs.json",
+        "bookclub/tests/fixtures/default_users.json"]
+
+    def setUp(self):
+        self.owner = User.objects.get(pk=1)
+        self.user = User.objects.get(pk=2)
+        self.club = Club.objects.filter(owner=self.owner).first()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                           'LOCATION': 'bookclub_cache'}})
+    def test_invalidation_reaches_other_processes(self):
+        call_command('createcachetable', verbosity=0)
+        other_process = caches.create_connection('default')
+        roles = get_user_club_roles(self.user)
+        self.assertEqual(other_process.get(user_clubs_key(self.user.pk)), roles)
+        self.club.make_member(self.user)
+        self.assertIsNone(other_process.get(user_clubs_key(self.user.pk)))
+        self.assertEqual(get_user_club_roles(self.user)[self.club.id], Membership.MEMBER)
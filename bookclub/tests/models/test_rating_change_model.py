@@ -0,0 +1,46 @@
+"""Unit tests for the RatingChange model"""
+from django.test import TestCase
+from bookclub.models import User, Book, Rating, RatingChange
+
+
+class RatingChangeModelTestCase(TestCase):
+    """Test case for the rating change log of Bookwise"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_users.json",
+        "bookclub/tests/fixtures/default_books.json",
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(pk=1)
+        self.book = Book.objects.get(pk=1)
+
+    def test_creating_a_rating_logs_an_insert(self):
+        rating = Rating.objects.create(user=self.user, book=self.book, isbn=self.book.isbn, rating=6)
+        change = RatingChange.objects.last()
+        self.assertEqual(change.action, RatingChange.INSERT)
+        self.assertEqual(change.rating_pk, rating.pk)
+        self.assertEqual(change.user_pk, self.user.pk)
+        self.assertEqual(change.rating, 6)
+
+    def test_updating_a_rating_logs_an_update(self):
+        rating = Rating.objects.create(user=self.user, book=self.book, isbn=self.book.isbn, rating=6)
+        rating.rating = 8
+        rating.save()
+        change = RatingChange.objects.last()
+        self.assertEqual(change.action, RatingChange.UPDATE)
+        self.assertEqual(change.rating, 8)
+
+    def test_deleting_a_rating_logs_a_delete(self):
+        rating = Rating.objects.create(user=self.user, book=self.book, isbn=self.book.isbn, rating=6)
+        rating_pk = rating.pk
+        rating.delete()
+        change = RatingChange.objects.last()
+        self.assertEqual(change.action, RatingChange.DELETE)
+        self.assertEqual(change.rating_pk, rating_pk)
+
+    def test_changes_are_kept_in_order(self):
+        rating = Rating.objects.create(user=self.user, book=self.book, isbn=self.book.isbn, rating=6)
+        rating.delete()
+        actions = list(RatingChange.objects.values_list('action', flat=True))
+        self.assertEqual(actions[-2:], [RatingChange.INSERT, RatingChange.DELETE])
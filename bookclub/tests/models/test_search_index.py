@@ -0,0 +1,61 @@
+"""Unit tests for the full-text search index of books, clubs and users"""
+from django.test import TestCase
+from bookclub.models import Book, Club, User
+from bookclub.search import search, reindex
+
+
+class SearchIndexTestCase(TestCase):
+    """Test case for keeping the search index current and ranking its results"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_users.json",
+        "bookclub/tests/fixtures/default_books.json",
+        "bookclub/tests/fixtures/default_clubs.json"]
+
+    def _create_book(self, isbn, title, author):
+        return Book.objects.create(isbn=isbn, title=title, author=author, pub_year=2000, publisher='Penguin',
+                                   small_url='http://example.com/s.jpg', medium_url='http://example.com/m.jpg',
+                                   large_url='http://example.com/l.jpg')
+
+    def test_loaded_rows_are_found(self):
+        self.assertEqual(search(Book, 'book title')[0], list(Book.objects.filter(title__icontains='book title')
+                                                                .order_by('id')))
+        self.assertEqual(search(Club, 'temple')[0], list(Club.objects.filter(name='Temple Book Club')))
+        self.assertEqual(search(User, 'jane doe')[0], list(User.objects.filter(first_name='Jane')))
+
+    def test_words_match_as_prefixes_in_any_order(self):
+        book = self._create_book('900000000001', 'The Hobbit', 'Tolkien')
+        self.assertEqual(search(Book, 'tolk hob')[0], [book])
+
+    def test_title_matches_rank_above_author_matches(self):
+        by_author = self._create_book('900000000001', 'Collected Letters', 'Dickens')
+        by_title = self._create_book('900000000002', 'Reading Dickens', 'Smith')
+        self.assertEqual(search(Book, 'dickens')[0], [by_title, by_author])
+
+    def test_updates_and_deletes_reach_the_index(self):
+        book = self._create_book('900000000001', 'Emma', 'Austen')
+        book.title = 'Persuasion'
+        book.save()
+        self.assertEqual(search(Book, 'emma')[0], [])
+        self.assertEqual(search(Book, 'persuasion')[0], [book])
+        book.delete()
+        self.assertEqual(search(Book, 'persuasion')[0], [])
+
+    def test_bulk_inserts_are_found_after_reindex(self):
+        Book.objects.bulk_create([Book(isbn='900000000001', title='Middlemarch', author='Eliot', pub_year=1871,
+                                       publisher='Penguin', small_url='http://example.com/s.jpg',
+                                       medium_url='http://example.com/m.jpg', large_url='http://example.com/l.jpg')])
+        self.assertEqual(search(Book, 'middlemarch')[0], [])
+        reindex([Book])
+        self.assertEqual(search(Book, 'middlemarch')[0], list(Book.objects.filter(title='Middlemarch')))
+
+    def test_results_are_paginated(self):
+        books = [self._create_book(f'9000000000{number:02d}', f'Dune {number}', 'Herbert') for number in range(5)]
+        first, has_next = search(Book, 'dune', page=1, per_page=3)
+        second, has_more = search(Book, 'dune', page=2, per_page=3)
+        self.assertTrue(has_next)
+        self.assertFalse(has_more)
+        self.assertEqual(sorted(first + second, key=lambda book: book.id), books)
+
+    def test_punctuation_only_query_finds_nothing(self):
+        self.assertEqual(search(Book, '"*()'), ([], False))
@@ -0,0 +1,118 @@
+"""Unit tests for the TimelineEntry model and the delivery of posts to timelines"""
+from django.test import TestCase, override_settings
+from bookclub.models import User, Club, Post, UserPost, TimelineEntry
+from bookclub.timelines import deliver_missed, rebuild, timeline_posts
+
+
+class TimelineEntryModelTestCase(TestCase):
+    """Test case for the home timelines filled as posts are written"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_users.json",
+        "bookclub/tests/fixtures/default_clubs.json",
+        "bookclub/tests/fixtures/default_posts.json",
+        "bookclub/tests/fixtures/default_user_posts.json"]
+
+    def setUp(self):
+        self.john = User.objects.get(pk=1)
+        self.jane = User.objects.get(pk=2)
+        self.reader = User.objects.exclude(owner_of__isnull=False).exclude(id__in=[1, 2]).first()
+        self.club = Club.objects.get(pk=1)
+
+    def _entries(self):
+        return set(TimelineEntry.objects.values_list('user_id', 'post_id', 'user_post_id'))
+
+    def test_club_post_reaches_every_member(self):
+        self.club.make_member(self.reader)
+        post = Post.objects.create(author=self.john, club=self.club, text="Meeting moved")
+        readers = TimelineEntry.objects.filter(post=post).values_list('user_id', flat=True)
+        self.assertEqual(set(readers), set(self.club.get_all_users().values_list('id', flat=True)))
+        self.assertEqual(timeline_posts(self.reader)[0], post)
+
+    def test_user_post_reaches_followers_only(self):
+        self.reader._follow(self.jane)
+        post = UserPost.objects.create(author=self.jane, text="Just finished a book")
+        self.assertEqual(list(TimelineEntry.objects.filter(user_post=post).values_list('user_id', flat=True)),
+                         [self.reader.id])
+
+    def test_joining_a_club_brings_its_posts(self):
+        self.assertEqual(timeline_posts(self.reader, Post), [])
+        self.club.make_member(self.reader)
+        self.assertEqual(timeline_posts(self.reader, Post), list(Post.objects.filter(club=self.club)))
+        self.club.remove_from_club(self.reader)
+        self.assertEqual(timeline_posts(self.reader, Post), [])
+
+    def test_unfollowing_removes_posts(self):
+        self.reader._follow(self.jane)
+        self.assertEqual(timeline_posts(self.reader, UserPost), list(UserPost.objects.filter(author=self.jane)))
+        self.reader._unfollow(self.jane)
+        self.assertEqual(timeline_posts(self.reader, UserPost), [])
+
+    def test_deleting_a_post_removes_its_entries(self):
+        self.club.make_member(self.reader)
+        Post.objects.filter(club=self.club).delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader).exists())
+
+    @override_settings(TIMELINE_LENGTH=3)
+    def test_timelines_keep_newest_posts(self):
+        self.club.make_member(self.reader)
+        posts = [Post.objects.create(author=self.john, club=self.club, text=f"Post {number}") for number in range(5)]
+        self.assertEqual(timeline_posts(self.reader), posts[::-1][:3])
+
+    def test_rebuild_matches_delivery(self):
+        self.club.make_member(self.reader)
+        self.reader._follow(self.jane)
+        Post.objects.create(author=self.reader, club=self.club, text="Hello club")
+        UserPost.objects.create(author=self.jane, text="Hello followers")
+        delivered = self._entries()
+        TimelineEntry.objects.all().delete()
+        rebuild()
+        self.assertEqual(self._entries(), delivered)
+
+    @override_settings(TIMELINE_LENGTH=3)
+    def test_rebuild_breaks_ties_as_delivery_does(self):
+        self.club.make_member(self.reader)
+        Post.objects.filter(club=self.club).delete()
+        posts = [Post.objects.create(author=self.john, club=self.club, text=f"Post {number}") for number in range(5)]
+        Post.objects.filter(club=self.club).update(created_at=posts[0].created_at)
+        TimelineEntry.objects.filter(post__club=self.club).update(created_at=posts[0].created_at)
+        delivered = timeline_posts(self.reader)
+        rebuild()
+        self.assertEqual(timeline_posts(self.reader), delivered)
+        self.assertEqual(delivered, posts[::-1][:3])
+
+    def test_delivered_posts_are_marked(self):
+        self.club.make_member(self.reader)
+        post = Post.objects.create(author=self.john, club=self.club, text="Meeting moved")
+        post.refresh_from_db()
+        self.assertIsNotNone(post.delivered_at)
+
+    def test_sweep_delivers_posts_whose_jobs_were_lost(self):
+        self.club.make_member(self.reader)
+        self.reader._follow(self.jane)
+        Post.objects.create(author=self.reader, club=self.club, text="Hello club")
+        UserPost.objects.create(author=self.jane, text="Hello followers")
+        delivered = self._entries()
+        TimelineEntry.objects.filter(user=self.reader).delete()
+        Post.objects.update(delivered_at=None)
+        UserPost.objects.filter(author=self.jane).update(delivered_at=None)
+        self.assertIn(self.reader.id, deliver_missed())
+        self.assertEqual(self._entries(), delivered)
+        self.assertFalse(Post.objects.filter(delivered_at=None).exists())
+        self.assertEqual(deliver_missed(), set())
+
+    def test_rebuilding_every_timeline_marks_the_posts_delivered(self):
+        Post.objects.update(delivered_at=None)
+        rebuild([self.reader.id])
+        self.assertTrue(Post.objects.filter(delivered_at=None).exists())
+        rebuild()
+        self.assertFalse(Post.objects.filter(delivered_at=None).exists())
+
+    def test_home_feed_reads_one_query(self):
+        self.club.make_member(self.reader)
+        self.reader._follow(self.jane)
+        with self.assertNumQueries(1):
+            posts = timeline_posts(self.reader, count=5)
+            [(post.author.get_full_name(), getattr(post, 'club', None)) for post in posts]
+        self.assertEqual(len(posts), Post.objects.filter(club=self.club).count() +
+                         UserPost.objects.filter(author=self.jane).count())
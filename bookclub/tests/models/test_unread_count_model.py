@@ -0,0 +1,97 @@
+"""Unit tests for the UnreadCount model and the inbox badge"""
+import io
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookclub.inbox import unread_count, mark_chat_read, reconcile
+from bookclub.models import User, Chat, Message, UnreadCount
+
+
+class UnreadCountModelTestCase(TestCase):
+    """Test case for the unread message counters kept as messages are sent and read"""
+
+    fixtures = [
+        "bookclub/tests/fixtures/default_users.json",
+        "bookclub/tests/fixtures/default_chats.json",
+        "bookclub/tests/fixtures/default_messages.json"]
+
+    def setUp(self):
+        self.john = User.objects.get(pk=1)
+        self.jane = User.objects.get(pk=2)
+        self.chat = Chat.objects.get(pk=1)
+
+    def _send(self, sender, receiver):
+        return Message.objects.create(chat=self.chat, sender_user=sender, receiver_user=receiver, body="Hello")
+
+    def test_loaded_messages_are_counted(self):
+        self.assertEqual(unread_count(self.jane), 2)
+        self.assertEqual(unread_count(self.john), 0)
+
+    def test_sending_a_message_counts_it(self):
+        self._send(self.jane, self.john)
+        self._send(self.jane, self.john)
+        self.assertEqual(unread_count(self.john), 2)
+        self.assertEqual(unread_count(self.jane), 2)
+
+    def test_reading_a_chat_clears_its_messages(self):
+        self._send(self.jane, self.john)
+        self.assertEqual(mark_chat_read(self.chat, self.jane), 2)
+        self.assertEqual(unread_count(self.jane), 0)
+        self.assertEqual(unread_count(self.john), 1)
+        self.assertEqual(mark_chat_read(self.chat, self.jane), 0)
+        self.assertEqual(unread_count(self.jane), 0)
+
+    def test_deleting_an_unread_message_uncounts_it(self):
+        Message.objects.filter(pk=1).delete()
+        self.assertEqual(unread_count(self.jane), 1)
+
+    def test_reading_the_count_does_not_write(self):
+        with self.assertNumQueries(1):
+            unread_count(self.jane)
+
+    def test_reconcile_fixes_drift(self):
+        UnreadCount.objects.filter(user=self.jane).update(count=7)
+        Message.objects.bulk_create([Message(chat=self.chat, sender_user=self.jane, receiver_user=self.john,
+                                             body="Bulk")])
+        self.assertEqual(reconcile(), 2)
+        self.assertEqual(unread_count(self.jane), 2)
+        self.assertEqual(unread_count(self.john), 1)
+        self.assertEqual(reconcile(), 0)
+
+    def test_reconcile_locks_the_counters_before_counting_messages(self):
+        with CaptureQueriesContext(connection) as queries:
+            reconcile()
+        selects = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertIn(UnreadCount._meta.db_table, selects[0])
+        self.assertIn(Message._meta.db_table, selects[1])
+
+    def test_reconcile_command(self):
+        UnreadCount.objects.all().delete()
+        output = io.StringIO()
+        call_command('reconcile_unread_counts', stdout=output)
+        self.assertIn('Fixed 1 unread counts', output.getvalue())
+        self.assertEqual(unread_count(self.jane), 2)
+
+    def test_badge_shows_count(self):
+        self.client.login(email=self.jane.email, password='Password123')
+        response = self.client.get(reverse('club_posts'))
+        self.assertContains(response, '<span class="badge badge-light">2</span>', html=False)
+        self.client.get(reverse('chat', kwargs={'pk': self.chat.pk}))
+        self.assertEqual(unread_count(self.jane), 0)
+
+    def test_reading_a_chat_after_the_count_drifted_low(self):
+        UnreadCount.objects.filter(user=self.jane).update(count=1)
+        self.client.login(email=self.jane.email, password='Password123')
+        response = self.client.get(reverse('chat', kwargs={'pk': self.chat.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(unread_count(self.jane), 0)
+
+    def test_deleting_an_unread_message_without_a_counter(self):
+        UnreadCount.objects.filter(user=self.jane).delete()
+        Message.objects.filter(pk=1).delete()
+        self.assertFalse(UnreadCount.objects.filter(user=self.jane).exists())
+        UnreadCount.objects.create(user=self.jane, count=0)
+        Message.objects.filter(receiver_user=self.jane).delete()
+        self.assertEqual(unread_count(self.jane), 0)
@@ -187,7 +187,7 @@ class ApplicationViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertFalse(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_two_url = reverse('applications') + '?page=2'
+        page_two_url = reverse('applications') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_two_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'applications.html')
@@ -195,7 +195,7 @@ class ApplicationViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_three_url = reverse('applications') + '?page=3'
+        page_three_url = reverse('applications') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_three_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'applications.html')
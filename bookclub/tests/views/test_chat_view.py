@@ -1,6 +1,8 @@
 """Unit tests of the Chats View"""
 from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from bookclub.models import User, Club, Application, Chat, Message
 from bookclub.tests.helpers import reverse_with_next
@@ -25,3 +27,46 @@ class ChatViewTestCase(TestCase):
         response = self.client.get(reverse('chat', kwargs={'pk':self.chat.pk}))
         response_url = reverse('home')
         self.assertRedirects(response, response_url, status_code=302, target_status_code=200)
+
+    def _send(self, sender, receiver, count):
+        return [Message.objects.create(chat=self.chat, sender_user=sender, receiver_user=receiver,
+                                       body=f"Message {number}")
+                for number in range(count)]
+
+    def test_chat_shows_newest_messages_oldest_first(self):
+        """Test that a chat opens on its newest messages, with a link to the older ones."""
+        sent = self._send(self.john, self.jane, settings.MESSAGES_PER_PAGE + 5)
+        self.client.login(email=self.jane.email, password='Password123')
+        response = self.client.get(reverse('chat', kwargs={'pk': self.chat.pk}))
+        self.assertEqual(response.context['message_list'], sent[5:])
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertContains(response, 'Older messages')
+        page_obj = response.context['page_obj']
+        older_url = reverse('chat', kwargs={'pk': self.chat.pk}) + '?cursor=' + page_obj.next_cursor()
+        response = self.client.get(older_url)
+        self.assertEqual(response.context['message_list'], sent[:5])
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertContains(response, 'Newer messages')
+
+    def test_opening_chat_marks_only_received_messages_read(self):
+        """Test that opening a chat marks the messages the viewer received as read, and not those they sent."""
+        self._send(self.john, self.jane, 3)
+        self._send(self.jane, self.john, 2)
+        self.client.login(email=self.jane.email, password='Password123')
+        self.client.get(reverse('chat', kwargs={'pk': self.chat.pk}))
+        self.assertFalse(Message.objects.filter(receiver_user=self.jane, is_read=False).exists())
+        self.assertEqual(Message.objects.filter(receiver_user=self.john, is_read=False).count(), 2)
+
+    def test_chat_queries_do_not_grow_with_messages(self):
+        """Test that the number of queries to open a chat does not depend on its number of messages."""
+        self.client.login(email=self.jane.email, password='Password123')
+        self._send(self.john, self.jane, 2)
+        few = self._count_chat_queries()
+        self._send(self.john, self.jane, 10)
+        self._send(self.jane, self.john, 10)
+        self.assertEqual(self._count_chat_queries(), few)
+
+    def _count_chat_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('chat', kwargs={'pk': self.chat.pk}))
+        return len(queries)
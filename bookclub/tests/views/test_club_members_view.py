@@ -85,7 +85,7 @@ class ClubMembersViewTestCase(TestCase, LogInTester):
         page_obj = response.context['page_obj']
         self.assertFalse(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_two_url = self.url + '?page=2'
+        page_two_url = self.url + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_two_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'club_members.html')
@@ -93,7 +93,7 @@ class ClubMembersViewTestCase(TestCase, LogInTester):
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_three_url = self.url + '?page=3'
+        page_three_url = self.url + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_three_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'club_members.html')
@@ -82,7 +82,7 @@ class ClubPostViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertFalse(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_two_url = reverse('club_posts') + '?page=2'
+        page_two_url = reverse('club_posts') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_two_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'club_posts.html')
@@ -90,7 +90,7 @@ class ClubPostViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_three_url = reverse('club_posts') + '?page=3'
+        page_three_url = reverse('club_posts') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_three_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'club_posts.html')
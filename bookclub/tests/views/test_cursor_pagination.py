@@ -0,0 +1,95 @@
+"""Unit tests for the keyset cursor paginator used by the post, member, rating and application lists"""
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from bookclub.models import Book, Rating, User, UserPost
+from bookclub.pagination import CursorPaginator
+
+
+class CursorPaginatorTestCase(TestCase):
+    """Test case for paging through a queryset with cursors"""
+
+    fixtures = ["bookclub/tests/fixtures/default_users.json"]
+
+    def setUp(self):
+        self.john = User.objects.get(pk=1)
+        UserPost.objects.all().delete()
+        for number in range(7):
+            UserPost.objects.create(author=self.john, text=f"Post {number}")
+        created_at = timezone.now()
+        UserPost.objects.filter(text__in=["Post 2", "Post 3", "Post 4"]).update(created_at=created_at)
+        self.posts = list(UserPost.objects.order_by('-created_at', '-id'))
+        self.paginator = CursorPaginator(UserPost.objects.all(), 3)
+
+    def test_first_page(self):
+        page = self.paginator.get_page()
+        self.assertEqual(list(page), self.posts[:3])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_next_pages_cover_every_row_once(self):
+        seen = []
+        page = self.paginator.get_page()
+        seen.extend(page)
+        while page.has_next():
+            page = self.paginator.get_page(page.next_cursor())
+            self.assertTrue(page.has_previous())
+            seen.extend(page)
+        self.assertEqual(seen, self.posts)
+        self.assertEqual(len(page), 1)
+
+    def test_previous_page_returns_the_page_before(self):
+        first = self.paginator.get_page()
+        second = self.paginator.get_page(first.next_cursor())
+        back = self.paginator.get_page(second.previous_cursor())
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor_gives_first_page(self):
+        cursor = self.paginator.get_page().next_cursor()
+        for invalid in ["not-a-cursor", cursor[:-2] + "xx"]:
+            self.assertEqual(list(self.paginator.get_page(invalid)), self.posts[:3])
+
+    def test_page_reads_one_query(self):
+        cursor = self.paginator.get_page().next_cursor()
+        with self.assertNumQueries(1):
+            self.paginator.get_page(cursor)
+
+
+class ListSearchTestCase(TestCase):
+    """Test case for the search boxes of the paginated lists"""
+
+    fixtures = ["bookclub/tests/fixtures/default_users.json", "bookclub/tests/fixtures/default_books.json"]
+
+    def setUp(self):
+        self.john = User.objects.get(pk=1)
+        self.jane = User.objects.get(pk=2)
+        self.jane._follow(self.john)
+        self.needles = [UserPost.objects.create(author=self.john, text=f"Needle {number}")
+                        for number in range(settings.POSTS_PER_PAGE + 2)]
+        UserPost.objects.create(author=self.john, text="Haystack")
+        self.client.login(email=self.jane.email, password='Password123')
+
+    def test_search_covers_every_page_and_paging_keeps_it(self):
+        response = self.client.get(reverse('user_posts'), {'q': 'needle'})
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), self.needles[::-1][:settings.POSTS_PER_PAGE])
+        self.assertContains(response, 'q=needle&amp;cursor=')
+        response = self.client.get(reverse('user_posts'), {'q': 'needle', 'cursor': page_obj.next_cursor()})
+        self.assertEqual(list(response.context['page_obj']), self.needles[1::-1])
+        self.assertContains(response, 'value="needle"')
+
+    def test_search_without_matches_keeps_the_search_box(self):
+        response = self.client.get(reverse('user_posts'), {'q': 'nothing like this'})
+        self.assertEqual(len(response.context['page_obj']), 0)
+        self.assertContains(response, 'id=\'txt_searchall\'')
+
+    def test_search_filters_ratings(self):
+        book = Book.objects.first()
+        Rating.objects.create(user=self.jane, book=book, isbn=book.isbn, rating=8)
+        response = self.client.get(reverse('my_book_ratings'), {'q': book.title[:5]})
+        self.assertEqual([rating.book for rating in response.context['page_obj']], [book])
+        response = self.client.get(reverse('my_book_ratings'), {'q': 'no such title'})
+        self.assertEqual(len(response.context['page_obj']), 0)
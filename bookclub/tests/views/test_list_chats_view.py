@@ -1,8 +1,12 @@
 """Unit tests for the List Chats View"""
+from datetime import timedelta
 from django.conf import settings
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
-from bookclub.models import User, Club, Application
+from django.utils import timezone
+from bookclub.models import User, Club, Application, Chat, Message
 from bookclub.tests.helpers import reverse_with_next
 from django.contrib import messages
 
@@ -36,3 +40,66 @@ class ListChatsViewTestCase(TestCase):
         response = self.client.get(reverse('inbox'))
         html = response.content.decode('utf8')
         self.assertIn('My Inbox', html)
+
+    def _create_chats(self, count, first=0):
+        """Create chats between john and new users, each with a message to john."""
+        chats = []
+        for number in range(first, first + count):
+            user = User.objects.create_user(email=f'chatter{number}@bookclub.com', first_name='Chat',
+                                            last_name=f'User{number}', location='London', password='Password123')
+            chat = Chat.objects.create(user=user, receiver=self.john)
+            Message.objects.create(chat=chat, sender_user=user, receiver_user=self.john, body=f'Hello {number}')
+            chats.append(chat)
+        return chats
+
+    def test_inbox_lists_recently_active_chats_first(self):
+        """Testing that the chats with the newest messages come first, with their last message and unread count."""
+        chats = self._create_chats(3)
+        Message.objects.create(chat=chats[0], sender_user=self.john, receiver_user=chats[0].user, body='Latest')
+        self.client.login(email=self.john.email, password='Password123')
+        response = self.client.get(self.url)
+        page = list(response.context['page_obj'])
+        self.assertEqual(page, [chats[0], chats[2], chats[1]])
+        self.assertEqual(page[0].last_message.body, 'Latest')
+        self.assertEqual(page[0].other, chats[0].user)
+        self.assertEqual([chat.unread for chat in page], [1, 1, 1])
+        self.assertContains(response, 'Latest')
+
+    def test_inbox_orders_chats_by_message_date_not_id(self):
+        """Testing that the chats are ordered by the date of their last message, even when older messages were
+        inserted later, across pages."""
+        chats = self._create_chats(settings.USERS_PER_PAGE + 2)
+        now = timezone.now()
+        for number, chat in enumerate(chats):
+            Message.objects.filter(chat=chat).update(date=now - timedelta(days=number))
+        empty = Chat.objects.create(user=self.jane, receiver=self.john)
+        self.client.login(email=self.john.email, password='Password123')
+        response = self.client.get(self.url)
+        page_obj = response.context['page_obj']
+        self.assertEqual(list(page_obj), chats[:settings.USERS_PER_PAGE])
+        response = self.client.get(self.url + '?cursor=' + page_obj.next_cursor())
+        self.assertEqual(list(response.context['page_obj']), chats[settings.USERS_PER_PAGE:] + [empty])
+
+    def test_inbox_is_paginated(self):
+        """Testing that the chats are paged through by cursor."""
+        chats = self._create_chats(settings.USERS_PER_PAGE + 2)
+        self.client.login(email=self.john.email, password='Password123')
+        response = self.client.get(self.url)
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), settings.USERS_PER_PAGE)
+        self.assertTrue(page_obj.has_next())
+        response = self.client.get(self.url + '?cursor=' + page_obj.next_cursor())
+        self.assertEqual(list(response.context['page_obj']), chats[1::-1])
+
+    def test_inbox_queries_do_not_grow_with_chats(self):
+        """Testing that the number of queries for the inbox does not depend on the number of chats."""
+        self.client.login(email=self.john.email, password='Password123')
+        self._create_chats(2)
+        few = self._count_inbox_queries()
+        self._create_chats(settings.USERS_PER_PAGE * 2, first=2)
+        self.assertEqual(self._count_inbox_queries(), few)
+
+    def _count_inbox_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        return len(queries)
@@ -100,7 +100,7 @@ class MyApplicationViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertFalse(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_two_url = reverse('my_applications') + '?page=2'
+        page_two_url = reverse('my_applications') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_two_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'my_applications.html')
@@ -108,7 +108,7 @@ class MyApplicationViewTestCase(TestCase):
         page_obj = response.context['page_obj']
         self.assertTrue(page_obj.has_previous())
         self.assertTrue(page_obj.has_next())
-        page_three_url = reverse('my_applications') + '?page=3'
+        page_three_url = reverse('my_applications') + '?cursor=' + page_obj.next_cursor()
         response = self.client.get(page_three_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'my_applications.html')
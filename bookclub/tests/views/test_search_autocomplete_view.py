@@ -0,0 +1,86 @@
+"""Unit tests for the search suggestions and their prefix index"""
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from bookclub import autocomplete
+from bookclub.models import Book, User, Rating
+
+
+class SearchAutocompleteViewTest(TestCase):
+    """Test case for suggesting book titles as a search is typed"""
+
+    fixtures = ["bookclub/tests/fixtures/default_users.json"]
+
+    def setUp(self):
+        self.url = reverse('search_autocomplete')
+        self.user = User.objects.get(pk=1)
+        self.hobbit = self._create_book('900000000001', 'The Hobbit', 'J. R. R. Tolkien', ratings=2)
+        self.hobbies = self._create_book('900000000002', 'Hobbies for Everyone', 'Anne Smith', ratings=5)
+        self._create_book('900000000003', 'Les Misérables', 'Victor Hugo', ratings=0)
+        autocomplete.refresh()
+
+    def tearDown(self):
+        autocomplete.refresh()
+
+    def _create_book(self, isbn, title, author, ratings):
+        book = Book.objects.create(isbn=isbn, title=title, author=author, pub_year=2000, publisher='Penguin',
+                                   small_url='http://example.com/s.jpg', medium_url='http://example.com/m.jpg',
+                                   large_url='http://example.com/l.jpg')
+        for number in range(ratings):
+            Rating.objects.create(user=User.objects.all()[number], book=book, isbn=isbn, rating=7)
+        return book
+
+    def test_suggestions_are_ranked_by_popularity(self):
+        response = self.client.get(self.url, {'term': 'hobb'})
+        self.assertEqual(response.json(), ['Hobbies for Everyone', 'The Hobbit'])
+
+    def test_any_title_word_or_author_matches(self):
+        self.assertEqual(autocomplete.suggest('hobbit'), ['The Hobbit'])
+        self.assertEqual(autocomplete.suggest('tolkien'), ['The Hobbit'])
+        self.assertEqual(autocomplete.suggest('the hob'), ['The Hobbit'])
+        self.assertEqual(autocomplete.suggest('Miserables'), ['Les Misérables'])
+        self.assertEqual(autocomplete.suggest('xyz'), [])
+        self.assertEqual(autocomplete.suggest('  '), [])
+
+    def test_long_ranges_use_precomputed_suggestions(self):
+        for number in range(autocomplete.SCAN_LIMIT + 10):
+            Book.objects.create(isbn=f'8{number:011d}', title=f'Dune {number}', author='Frank Herbert', pub_year=1965,
+                                publisher='Chilton', small_url='http://example.com/s.jpg',
+                                medium_url='http://example.com/m.jpg', large_url='http://example.com/l.jpg')
+        autocomplete.refresh()
+        index = autocomplete.get_index()
+        self.assertIn('dune', index['top'])
+        self.assertEqual(autocomplete.suggest('dune'), sorted(f'Dune {number}' for number in
+                                                              range(autocomplete.SCAN_LIMIT + 10))[:5])
+
+    def test_saved_index_is_loaded_again_when_rebuilt(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'autocomplete.p')
+            with override_settings(AUTOCOMPLETE_INDEX_PATH=path, AUTOCOMPLETE_CHECK_SECONDS=0):
+                call_command('build_autocomplete', stdout=io.StringIO())
+                self.assertEqual(autocomplete.suggest('dracula'), [])
+                self._create_book('900000000004', 'Dracula', 'Bram Stoker', ratings=0)
+                self.assertEqual(autocomplete.suggest('dracula'), [])
+                stat = os.stat(path)
+                call_command('build_autocomplete', stdout=io.StringIO())
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+                self.assertEqual(autocomplete.suggest('dracula'), ['Dracula'])
+
+    @override_settings(AUTOCOMPLETE_CHECK_SECONDS=0)
+    def test_index_built_from_the_database_is_built_again_when_books_change(self):
+        self.assertEqual(autocomplete.suggest('dracula'), [])
+        self._create_book('900000000004', 'Dracula', 'Bram Stoker', ratings=0)
+        self.assertEqual(autocomplete.suggest('dracula'), ['Dracula'])
+        Rating.objects.filter(book=self.hobbies).delete()
+        self.assertEqual(autocomplete.suggest('hobb'), ['The Hobbit', 'Hobbies for Everyone'])
+
+    def test_rebuild_saved_index_saves_only_with_a_path(self):
+        autocomplete.rebuild_saved_index()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'autocomplete.p')
+            with override_settings(AUTOCOMPLETE_INDEX_PATH=path):
+                autocomplete.rebuild_saved_index()
+                self.assertEqual(autocomplete.load_index(path)['titles'][0], 'Hobbies for Everyone')
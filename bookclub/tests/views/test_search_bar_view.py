@@ -46,3 +46,33 @@ class SearchBarViewTest(TestCase):
         """Testing for working filter feature."""
         response = self.client.get(reverse('login'))
         self.assertQuerysetEqual(Book.objects.all(), Book.objects.filter(title__contains='Harry Potter'), transform= lambda x:x)
+
+
+class SearchResultsViewTest(TestCase):
+    """Test case for the results of the Search Bar View"""
+
+    fixtures = ["bookclub/tests/fixtures/default_users.json", "bookclub/tests/fixtures/default_books.json"]
+
+    def setUp(self):
+        self.url = reverse('search_page')
+        self.user = User.objects.get(pk=1)
+
+    def test_search_finds_matching_books_and_users(self):
+        """Test that a search lists the books and users matching every word."""
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.post(self.url, {'query': 'title2'})
+        self.assertEqual(response.context['books'], list(Book.objects.filter(title='The Book title2')))
+        response = self.client.post(self.url, {'query': 'john doe'})
+        self.assertEqual(response.context['users'], [self.user])
+        self.assertContains(response, 'The Book title')
+
+    def test_search_results_are_paginated(self):
+        """Test that more books than a page are split over pages."""
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url, {'query': 'book'})
+        self.assertFalse(response.context['has_next'])
+        with self.settings(SEARCH_RESULTS_PER_PAGE=2):
+            response = self.client.get(self.url, {'query': 'book', 'page': 2})
+        self.assertEqual(len(response.context['books']), 1)
+        self.assertFalse(response.context['has_next'])
+        self.assertEqual(response.context['page'], 2)
@@ -0,0 +1,55 @@
+"""Unit tests of the request tracing and the Trace Stats View."""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from bookclub.models import User
+from bookclub.tracing import span, histogram_summary, reset_histograms
+
+
+class TraceStatsViewTestCase(TestCase):
+    """Test case for the request tracing and the Trace Stats View"""
+
+    fixtures = ['bookclub/tests/fixtures/default_users.json']
+
+    def setUp(self):
+        self.url = reverse('trace_stats')
+        self.user = User.objects.get(email='johndoe@bookclub.com')
+        reset_histograms()
+
+    def test_trace_stats_url(self):
+        self.assertEqual(self.url, '/debug/traces/')
+
+    def test_span_is_added_to_the_histogram(self):
+        with span('test.stage'):
+            pass
+        summary = histogram_summary()['test.stage']
+        self.assertEqual(summary['count'], 1)
+        self.assertEqual(summary['p50_ms'], 1)
+        self.assertEqual(sum(summary['buckets'].values()), 1)
+
+    @override_settings(TRACE_RESPONSE_HEADER=True)
+    def test_home_page_reports_its_stages(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(reverse('home'))
+        self.assertIn('popular_books.load;dur=', response['Server-Timing'])
+        self.assertIn('home.cold_start;dur=', response['Server-Timing'])
+        self.assertIn('popular_books.load', histogram_summary())
+
+    @override_settings(TRACE_RESPONSE_HEADER=False)
+    def test_header_is_not_sent_when_disabled(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(reverse('home'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_trace_stats_are_staff_only(self):
+        self.client.login(email=self.user.email, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_staff_can_dump_trace_stats(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.login(email=self.user.email, password='Password123')
+        self.client.get(reverse('home'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('home.posts', response.json())
@@ -1,7 +1,7 @@
 from django.test import TestCase
 from bookclub.forms import ClubForm
 from django.urls import reverse
-from bookclub.models import Book, User, Rating
+from bookclub.models import Book, User, Rating, RatingChange
 
 class UpdateRatingsTestCase(TestCase):
     
@@ -33,4 +33,12 @@ class UpdateRatingsTestCase(TestCase):
         self.assertRedirects(request, redirect_url, status_code=302, target_status_code=200)
         self.rating = Rating.objects.get(user=self.user, book=self.book)
         self.assertEqual(self.rating.get_rating(), 7)
-    
\ No newline at end of file
+
+    def test_update_existing_rating_keeps_one_rating(self):
+        """Test that rating a book again updates the existing rating in place."""
+        self.client.login(email=self.user.email, password="Password123")
+        self.client.post(self.url, self.data)
+        self.client.post(self.url, {"ratings": 3})
+        self.assertEqual(Rating.objects.filter(user=self.user, book=self.book).count(), 1)
+        self.assertEqual(Rating.objects.get(user=self.user, book=self.book).get_rating(), 3)
+        self.assertEqual(RatingChange.objects.last().action, RatingChange.UPDATE)
@@ -0,0 +1,77 @@
+"""Unit tests for the viewer state that book and user lists mark their rows from"""
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from bookclub.models import Book, Club, Rating, User
+from bookclub.viewer import ViewerState
+
+
+class ViewerStateTestCase(TestCase):
+    """Test case for the viewer state"""
+
+    fixtures = ['bookclub/tests/fixtures/default_users.json',
+                'bookclub/tests/fixtures/default_books.json',
+                'bookclub/tests/fixtures/default_clubs.json']
+
+    def setUp(self):
+        self.john = User.objects.get(email='johndoe@bookclub.com')
+        self.jane = User.objects.get(email='janedoe@bookclub.com')
+        self.books = list(Book.objects.order_by('id'))
+
+    def test_viewer_state_holds_the_ids_the_viewer_is_related_to(self):
+        """Testing that the viewer state holds the viewer's books, followees, clubs and ratings."""
+        self.john.currently_reading_books.add(self.books[0])
+        self.john.favourite_books.add(self.books[1])
+        self.john.followees.add(self.jane)
+        Rating.objects.create(user=self.john, book=self.books[2], isbn=self.books[2].isbn, rating=5)
+        viewer = ViewerState(self.john)
+        self.assertEqual(viewer.reading_list_ids, frozenset([self.books[0].id]))
+        self.assertEqual(viewer.favourite_ids, frozenset([self.books[1].id]))
+        self.assertEqual(viewer.followee_ids, frozenset([self.jane.id]))
+        self.assertEqual(viewer.club_ids, frozenset(Club.objects.filter(memberships__user=self.john)
+                                                    .values_list('id', flat=True)))
+        self.assertEqual(viewer.rating_count, 1)
+
+    def test_viewer_state_loads_each_set_once(self):
+        """Testing that each set is queried the first time it is read only."""
+        viewer = ViewerState(self.john)
+        with self.assertNumQueries(1):
+            self.assertNotIn(self.books[0].id, viewer.reading_list_ids)
+            self.assertNotIn(self.books[1].id, viewer.reading_list_ids)
+
+    def test_anonymous_viewer_is_related_to_nothing(self):
+        """Testing that the viewer state of an anonymous user is empty and runs no queries."""
+        viewer = ViewerState(AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertEqual(viewer.reading_list_ids, frozenset())
+            self.assertEqual(viewer.followee_ids, frozenset())
+            self.assertEqual(viewer.club_ids, frozenset())
+            self.assertEqual(viewer.rating_count, 0)
+
+    def test_book_list_marks_reading_list_and_favourites(self):
+        """Testing that the book list marks the viewer's reading list and favourites."""
+        self.john.currently_reading_books.add(self.books[0], self.books[1])
+        self.john.favourite_books.add(self.books[2])
+        self.client.login(email=self.john.email, password='Password123')
+        response = self.client.get(reverse('book_list'))
+        self.assertContains(response, 'bi-bookmarks-fill', count=2)
+        self.assertContains(response, 'bi-star-fill', count=1)
+
+    def test_user_list_queries_do_not_grow_with_listed_users(self):
+        """Testing that the number of queries for the user list does not depend on how many users are listed
+        and followed."""
+        self.client.login(email=self.john.email, password='Password123')
+        few = self._count_queries(reverse('user_list'))
+        for number in range(settings.USERS_PER_PAGE):
+            self.john.followees.add(User.objects.create_user(
+                email=f'followee{number}@bookclub.com', first_name='Followed', last_name=f'User{number}',
+                location='London', password='Password123'))
+        self.assertEqual(self._count_queries(reverse('user_list')), few)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
@@ -0,0 +1,247 @@
+"""Home timelines, materialized per reader when posts are written.
+
+A club post is pushed to every member of its club and a user post to every follower of its author, one
+TimelineEntry per reader, so the home page and the post lists read a user's feed with one range scan of the
+(user, -created_at) index. Delivery runs in batches of readers on a background thread once the post's transaction
+commits, or inline when TIMELINE_DELIVERY is 'inline'. Each timeline keeps its newest TIMELINE_LENGTH entries.
+
+A delivered post is stamped with delivered_at. Jobs still queued when a process is recycled are run before it exits,
+for up to TIMELINE_DRAIN_SECONDS, and the posts of a process that was killed are delivered by the sweep each worker
+runs when it starts, or by the deliver_timelines command.
+
+Joining or leaving a club and following or unfollowing someone rebuild the timelines of the users concerned from
+the posts and memberships, which is also how timelines are filled for data inserted without the ORM.
+"""
+import atexit
+import logging
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from bookclub.models import User, Post, UserPost, Membership, TimelineEntry
+from bookclub.pagination import CursorPaginator, matching
+
+logger = logging.getLogger(__name__)
+
+SEARCHED_POST_FIELDS = {
+    Post: ['post__text', 'post__club__name', 'post__author__first_name', 'post__author__last_name'],
+    UserPost: ['user_post__text', 'user_post__author__first_name', 'user_post__author__last_name'],
+}
+
+_worker = {'thread': None, 'queue': queue.Queue(), 'lock': threading.Lock()}
+
+
+def club_post_readers(post):
+    return Membership.objects.filter(club_id=post.club_id).values_list('user_id', flat=True)
+
+
+def user_post_readers(user_post):
+    return User.followers.through.objects.filter(from_user_id=user_post.author_id).values_list('to_user_id',
+                                                                                               flat=True)
+
+
+def deliver(model, post_id):
+    """ Push a post to the timelines of its readers a batch at a time and mark it delivered. Returns the ids of the
+    readers """
+
+    post = model.objects.filter(id=post_id).first()
+    if post is None:
+        return []
+    if model is Post:
+        readers, field = club_post_readers(post), 'post'
+    else:
+        readers, field = user_post_readers(post), 'user_post'
+    reader_ids = list(readers.order_by().iterator())
+    for start in range(0, len(reader_ids), settings.TIMELINE_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user_id=user_id, created_at=post.created_at, **{field: post})
+             for user_id in reader_ids[start:start + settings.TIMELINE_BATCH_SIZE]],
+            ignore_conflicts=True)
+    model.objects.filter(id=post_id).update(delivered_at=timezone.now())
+    return reader_ids
+
+
+def deliver_missed():
+    """ Deliver the posts never marked delivered, such as those whose jobs were lost with a killed process. Posts
+    already on some timelines are only added to the others. Returns the ids of the readers whose timelines grew """
+
+    reader_ids = set()
+    for model in (Post, UserPost):
+        for post_id in list(model.objects.filter(delivered_at=None).order_by('id').values_list('id', flat=True)):
+            reader_ids.update(deliver(model, post_id))
+    return reader_ids
+
+
+def _tables():
+    quote = connection.ops.quote_name
+    return {
+        'timeline': quote(TimelineEntry._meta.db_table),
+        'post': quote(Post._meta.db_table),
+        'user_post': quote(UserPost._meta.db_table),
+        'membership': quote(Membership._meta.db_table),
+        'follow': quote(User.followers.through._meta.db_table),
+    }
+
+
+def _user_filter(column, user_ids):
+    if user_ids is None:
+        return '', []
+    return f"AND {column} IN ({', '.join(['%s'] * len(user_ids))})", list(user_ids)
+
+
+def trim(user_ids=None):
+    """ Drop the entries past the newest TIMELINE_LENGTH of each timeline, of every user when user_ids is None """
+
+    if user_ids is not None and not user_ids:
+        return
+    where, params = _user_filter('user_id', user_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            DELETE FROM {_tables()['timeline']} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS position
+                    FROM {_tables()['timeline']} WHERE 1 = 1 {where}
+                ) ranked WHERE position > %s
+            )""", params + [settings.TIMELINE_LENGTH])
+
+
+def rebuild(user_ids=None):
+    """ Refill timelines from the club posts of the users' clubs and the user posts of their followees, of every
+    user when user_ids is None, in set-based statements. Posts written at the same time are kept and numbered in
+    the order of their ids, so the entries kept are those delivery and trim would keep """
+
+    if user_ids is not None and not user_ids:
+        return
+    tables = _tables()
+    delete_where, delete_params = _user_filter('user_id', user_ids)
+    member_where, member_params = _user_filter('membership.user_id', user_ids)
+    follower_where, follower_params = _user_filter('follow.to_user_id', user_ids)
+    with transaction.atomic():
+        if user_ids is None:
+            # Marked before the timelines are read, so every post marked here is among those they are filled from
+            for model in (Post, UserPost):
+                model.objects.filter(delivered_at=None).update(delivered_at=timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {tables['timeline']} WHERE 1 = 1 {delete_where}", delete_params)
+            cursor.execute(f"""
+                INSERT INTO {tables['timeline']} (user_id, post_id, user_post_id, created_at)
+                SELECT user_id, post_id, user_post_id, created_at FROM (
+                    SELECT user_id, post_id, user_post_id, created_at,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY user_id ORDER BY created_at DESC, COALESCE(post_id, user_post_id) DESC
+                           ) AS position
+                    FROM (
+                        SELECT membership.user_id AS user_id, post.id AS post_id, NULL AS user_post_id,
+                               post.created_at AS created_at
+                        FROM {tables['post']} post
+                        JOIN {tables['membership']} membership ON membership.club_id = post.club_id
+                        WHERE 1 = 1 {member_where}
+                        UNION ALL
+                        SELECT follow.to_user_id, NULL, user_post.id, user_post.created_at
+                        FROM {tables['user_post']} user_post
+                        JOIN {tables['follow']} follow ON follow.from_user_id = user_post.author_id
+                        WHERE 1 = 1 {follower_where}
+                    ) candidates
+                ) ranked WHERE position <= %s
+                ORDER BY user_id, created_at, COALESCE(post_id, user_post_id)""",
+                           member_params + follower_params + [settings.TIMELINE_LENGTH])
+
+
+def run_job(job):
+    """ Run a delivery, sweep or rebuild job. Returns the users whose timelines grew and may need trimming """
+
+    name, args = job
+    if name == 'deliver':
+        return deliver(*args)
+    if name == 'sweep':
+        return deliver_missed()
+    rebuild(*args)
+    return []
+
+
+def run_worker(jobs):
+    """ Run queued jobs until the process exits, trimming the timelines that grew whenever the queue runs dry """
+
+    grown = set()
+    while True:
+        job = jobs.get()
+        close_old_connections()
+        try:
+            grown.update(run_job(job))
+            if jobs.empty() or len(grown) >= settings.TIMELINE_BATCH_SIZE:
+                trim(sorted(grown))
+                grown.clear()
+        except Exception:
+            logger.exception('Timeline job %s failed', job)
+        finally:
+            jobs.task_done()
+            close_old_connections()
+
+
+def enqueue(name, *args):
+    """ Queue a job for the background worker once the current transaction commits, or run it now. A new worker
+    first sweeps up the posts that earlier processes never delivered """
+
+    if settings.TIMELINE_DELIVERY == 'inline':
+        trim(run_job((name, args)))
+        return
+    with _worker['lock']:
+        if _worker['thread'] is None or not _worker['thread'].is_alive():
+            if _worker['thread'] is None:
+                atexit.register(drain)
+            _worker['queue'].put(('sweep', ()))
+            _worker['thread'] = threading.Thread(target=run_worker, args=(_worker['queue'],), daemon=True,
+                                                 name='timeline-worker')
+            _worker['thread'].start()
+    transaction.on_commit(lambda: _worker['queue'].put((name, args)))
+
+
+def wait_for_deliveries():
+    """ Block until the background worker has run every queued job """
+
+    _worker['queue'].join()
+
+
+def drain(timeout=None):
+    """ Wait up to timeout seconds, TIMELINE_DRAIN_SECONDS by default, for the background worker to run the jobs
+    still queued. Registered to run when the process exits; whatever is left is delivered by a later sweep """
+
+    thread = _worker['thread']
+    if thread is None or not thread.is_alive():
+        return
+    waiter = threading.Thread(target=wait_for_deliveries, daemon=True, name='timeline-drain')
+    waiter.start()
+    waiter.join(settings.TIMELINE_DRAIN_SECONDS if timeout is None else timeout)
+
+
+def timeline(user, model=None):
+    """ The user's timeline entries, newest first, with what their templates show. model limits them to club posts
+    (Post) or user posts (UserPost) """
+
+    entries = user.timeline.select_related('post__author', 'post__club', 'user_post__author')
+    if model is Post:
+        entries = entries.filter(post__isnull=False)
+    elif model is UserPost:
+        entries = entries.filter(user_post__isnull=False)
+    return entries
+
+
+def timeline_posts(user, model=None, count=None):
+    """ The posts of the user's timeline, newest first """
+
+    entries = timeline(user, model)
+    if count is not None:
+        entries = entries[:count]
+    return [entry.get_post() for entry in entries]
+
+
+def timeline_page(user, model=None, cursor=None, per_page=None, query=None):
+    """ The page of the user's timeline posts a cursor points to, read by seeking on the (user, -created_at) index.
+    query limits them to the posts whose text, author or club contains it """
+
+    fields = SEARCHED_POST_FIELDS.get(model) or SEARCHED_POST_FIELDS[Post] + SEARCHED_POST_FIELDS[UserPost]
+    entries = matching(timeline(user, model), query, fields)
+    page = CursorPaginator(entries, per_page or settings.POSTS_PER_PAGE).get_page(cursor)
+    page.object_list = [entry.get_post() for entry in page]
+    return page
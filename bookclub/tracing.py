@@ -0,0 +1,96 @@
+"""Lightweight timing spans for the request path.
+
+Code wraps a stage in `with span('name'):`. The middleware collects the spans of each request on request.spans
+and, when TRACE_RESPONSE_HEADER is set, reports them in a Server-Timing header. Every span is also added to an
+in-memory latency histogram per stage name, which the trace_stats view dumps for staff.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+
+BUCKET_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+
+_local = threading.local()
+_histograms = {}
+_lock = threading.Lock()
+
+
+def record(name, seconds):
+    milliseconds = seconds * 1000
+    bucket = next((i for i, bound in enumerate(BUCKET_BOUNDS_MS) if milliseconds <= bound), len(BUCKET_BOUNDS_MS))
+    with _lock:
+        histogram = _histograms.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                                  'buckets': [0] * (len(BUCKET_BOUNDS_MS) + 1)})
+        histogram['count'] += 1
+        histogram['total_ms'] += milliseconds
+        histogram['max_ms'] = max(histogram['max_ms'], milliseconds)
+        histogram['buckets'][bucket] += 1
+
+
+@contextmanager
+def span(name):
+    """ Time the block, attach it to the current request's spans and add it to the histogram of its name """
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start_time
+        spans = getattr(_local, 'spans', None)
+        if spans is not None:
+            spans.append((name, seconds))
+        record(name, seconds)
+
+
+def percentile_bound(buckets, count, percentile):
+    """ The upper bound of the bucket holding the percentile, or None if it is past the last bound """
+
+    seen = 0
+    for bound, bucket_count in zip(BUCKET_BOUNDS_MS + [None], buckets):
+        seen += bucket_count
+        if seen >= count * percentile / 100:
+            return bound
+    return None
+
+
+def histogram_summary():
+    with _lock:
+        histograms = {name: dict(histogram, buckets=list(histogram['buckets']))
+                      for name, histogram in _histograms.items()}
+    return {name: {
+        'count': histogram['count'],
+        'mean_ms': histogram['total_ms'] / histogram['count'],
+        'max_ms': histogram['max_ms'],
+        'p50_ms': percentile_bound(histogram['buckets'], histogram['count'], 50),
+        'p95_ms': percentile_bound(histogram['buckets'], histogram['count'], 95),
+        'p99_ms': percentile_bound(histogram['buckets'], histogram['count'], 99),
+        'buckets': {f'le_{bound}ms': bucket_count for bound, bucket_count
+                    in zip(BUCKET_BOUNDS_MS + ['inf'], histogram['buckets'])},
+    } for name, histogram in sorted(histograms.items())}
+
+
+def reset_histograms():
+    with _lock:
+        _histograms.clear()
+
+
+def server_timing(spans):
+    return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in spans)
+
+
+class TracingMiddleware:
+    """Collect the spans of each request and report them in a Server-Timing header"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.spans = _local.spans = []
+        try:
+            response = self.get_response(request)
+        finally:
+            _local.spans = None
+        if request.spans and getattr(settings, 'TRACE_RESPONSE_HEADER', False):
+            response['Server-Timing'] = server_timing(request.spans)
+        return response
@@ -0,0 +1,40 @@
+"""What the logged in user has in common with the rows a page lists.
+
+Book and user lists mark the rows the viewer is reading, has favourited or follows. The viewer state reads each of
+those, and the viewer's clubs and number of ratings, the first time a template asks for them and keeps them for the
+rest of the request, so every row is marked with a set lookup rather than a query of its own.
+"""
+from django.utils.functional import cached_property
+from bookclub.memberships import get_user_club_roles
+
+
+class ViewerState:
+    """The ids of the books, users and clubs the viewer of a page is related to"""
+
+    def __init__(self, user):
+        self.user = user
+
+    def _ids(self, relation):
+        if not self.user.is_authenticated:
+            return frozenset()
+        return frozenset(getattr(self.user, relation).values_list('id', flat=True))
+
+    @cached_property
+    def reading_list_ids(self):
+        return self._ids('currently_reading_books')
+
+    @cached_property
+    def favourite_ids(self):
+        return self._ids('favourite_books')
+
+    @cached_property
+    def followee_ids(self):
+        return self._ids('followees')
+
+    @cached_property
+    def club_ids(self):
+        return frozenset(get_user_club_roles(self.user)) if self.user.is_authenticated else frozenset()
+
+    @cached_property
+    def rating_count(self):
+        return self.user.get_number_of_ratings() if self.user.is_authenticated else 0
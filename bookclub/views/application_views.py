@@ -6,10 +6,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import Http404
 from bookclub.models import Club, Application
-from bookclub.views import club_views
 from django.views.generic.edit import View
-from django.core.paginator import Paginator
-from bookclub.views import config
+from bookclub.pagination import CursorPaginator, matching
 
 
 class ApplicationsView(LoginRequiredMixin, View):
@@ -22,19 +20,15 @@ class ApplicationsView(LoginRequiredMixin, View):
     def render(self):
         current_user = self.request.user
         """Render all applications of this user's owned clubs"""
-        applicants = []
+        applicants = Application.objects.filter(club__owner=current_user).select_related('club', 'applicant')
+        query = self.request.GET.get('q', '')
+        applicants = matching(applicants, query, ['club__name', 'applicant__first_name', 'applicant__last_name',
+                                                  'applicant__public_bio', 'applicant__location'])
 
-        owned_clubs = Club.objects.filter(owner=current_user)
+        paginator = CursorPaginator(applicants, settings.APPLICATIONS_PER_PAGE, ('id',))
+        page_obj = paginator.get_page(self.request.GET.get('cursor'))
 
-        for a in Application.objects.all():
-            if a.club in owned_clubs:
-                applicants.append(a)
-
-        paginator = Paginator(applicants, settings.APPLICATIONS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-
-        return render(self.request, 'applications.html', {'applicants': applicants, 'page_obj': page_obj})
+        return render(self.request, 'applications.html', {'page_obj': page_obj, 'query': query})
 
 
 class MyApplicationsView(LoginRequiredMixin, View):
@@ -48,22 +42,13 @@ class MyApplicationsView(LoginRequiredMixin, View):
 
     def render(self):
         current_user = self.request.user
-        """Render all applications of this user's owned clubs"""
-        clubs = []
-        my_applications = []
-        for c in Club.objects.all():
-            if c.owner is not current_user:
-                clubs.append(c)
-
-        for a in Application.objects.all():
-            if a.club in clubs and a.applicant == current_user:
-                my_applications.append(a)
+        """Render all applications of this user"""
+        my_applications = Application.objects.filter(applicant=current_user).select_related('club')
 
-        paginator = Paginator(my_applications, settings.APPLICATIONS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        paginator = CursorPaginator(my_applications, settings.APPLICATIONS_PER_PAGE, ('id',))
+        page_obj = paginator.get_page(self.request.GET.get('cursor'))
 
-        return render(self.request, 'my_applications.html', {'applications': my_applications, 'page_obj': page_obj})
+        return render(self.request, 'my_applications.html', {'page_obj': page_obj})
 
 
 def app_accept(request, pk):
@@ -74,7 +59,6 @@ def app_accept(request, pk):
             app.club.make_member(app.applicant)
             app.delete()
             messages.add_message(request, messages.SUCCESS, "User accepted!")
-            club_views.club_util(request)
             return redirect('applications')
         else:
             messages.add_message(request, messages.ERROR, "Action prohibited")
@@ -13,7 +13,6 @@ from bookclub.models import User
 from .mixins import LoginProhibitedMixin
 from django.contrib.auth.decorators import login_required
 from bookclub.helpers import login_prohibited
-from bookclub.views import club_views
 from django.contrib.sites.shortcuts import get_current_site
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -62,7 +61,6 @@ class LogInView(LoginProhibitedMixin, View):
                 messages.add_message(request, messages.ERROR, "Email is not verified, please check your inbox")
                 return redirect("login")
             form = login(request, user)
-            club_views.club_util(request)
             return redirect(self.next)
         messages.add_message(request, messages.ERROR, "The credentials provided were invalid!")
         return self.render()
@@ -5,6 +5,7 @@ from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
+from bookclub.pagination import CursorPaginator, matching
 from django.http import Http404
 from django.contrib import messages
 from django.shortcuts import redirect, render
@@ -13,7 +14,6 @@ from django.views.generic.detail import DetailView
 from django.views.generic.list import MultipleObjectMixin
 from bookclub.models import Book, Club, User, Rating
 from django.contrib import messages
-from bookclub.views import config
 
 
 class BooksListView(LoginRequiredMixin, ListView):
@@ -135,11 +135,13 @@ class Favourites(LoginRequiredMixin, ListView):
 def update_ratings(request, book_id):
     user = User.objects.get(pk=request.user.id)
     book = Book.objects.get(pk=book_id)
-    isbn = Book.objects.get(pk=book_id).isbn
-    if Rating.objects.filter(book=book, user=user).exists():
-        Rating.objects.get(book=book, user=user).delete()
-
-    Rating.objects.create(user=user, book=book, isbn=isbn, rating=request.POST.get('ratings', "0"))
+    isbn = book.isbn
+    rating = Rating.objects.filter(book=book, user=user).first()
+    if rating:
+        rating.rating = request.POST.get('ratings', "0")
+        rating.save()
+    else:
+        Rating.objects.create(user=user, book=book, isbn=isbn, rating=request.POST.get('ratings', "0"))
     messages.add_message(request, messages.SUCCESS,
                          "You have given " + book.title + " a rating of " + request.POST.get('ratings', "0"))
     return redirect('book_profile', book_id=book_id)
@@ -190,11 +192,11 @@ class MyBookRatings(LoginRequiredMixin, ListView):
         return self.render()
 
     def render(self):
-        user = User.objects.get(pk=self.request.user.id)
-        ratings = Rating.objects.filter(user=user)
+        ratings = Rating.objects.filter(user=self.request.user).select_related('book')
+        query = self.request.GET.get('q', '')
+        ratings = matching(ratings, query, ['book__title', 'book__author'])
 
-        paginator = Paginator(ratings, settings.APPLICATIONS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        paginator = CursorPaginator(ratings, settings.APPLICATIONS_PER_PAGE, ('-id',))
+        page_obj = paginator.get_page(self.request.GET.get('cursor'))
 
-        return render(self.request, 'my_book_ratings.html', {'ratings': ratings, 'page_obj': page_obj})
+        return render(self.request, 'my_book_ratings.html', {'page_obj': page_obj, 'query': query})
@@ -4,7 +4,8 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import redirect, render
 from django.views.generic import ListView
 from bookclub.models import Club
-from bookclub.views import config
+from bookclub.memberships import get_user_clubs
+from bookclub.pagination import CursorPaginator, matching
 from django.urls import reverse
 from django.contrib import messages
 from bookclub.templates import *
@@ -24,7 +25,6 @@ class ClubMemberListView(LoginRequiredMixin, ListView):
     pk_url_kwarg = 'club_id'
     context_object_name = 'club'
     ordering = ['-name']
-    paginate_by = settings.USERS_PER_PAGE
 
     def get(self, request, *args, **kwargs):
         """Handle get request, and redirect to book_list if book_id invalid."""
@@ -34,41 +34,23 @@ class ClubMemberListView(LoginRequiredMixin, ListView):
             return redirect('home')
 
     def get_queryset(self):
-        return Club.objects.get(id=self.kwargs['club_id']).get_all_users()
+        self.club = Club.objects.get(id=self.kwargs['club_id'])
+        return self.club.get_users_with_roles()
 
     def get_context_data(self, *args, **kwargs):
-        current_user_is_owner = False
         context = super().get_context_data(*args, **kwargs)
-        current_club_id = self.kwargs['club_id']
-        current_club = Club.objects.get(id=current_club_id)
-        all_users = current_club.get_all_users()
-        current_club = Club.objects.get(id=current_club_id)
-        if current_club.owner == self.request.user:
-            current_user_is_owner = True
-        paginator = Paginator(current_club.get_all_users(), settings.USERS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        for each in page_obj:
-            u_id = each.pk
-            if current_club.user_level(each) == "Member":
-                user_level = "Member"
-                u_id = each.pk
-            elif current_club.user_level(each) == "Organiser":
-                user_level = "Organiser"
-                u_id = each.pk
-            else:
-                user_level = "Owner"
-                u_id = each.pk
-                if each == self.request.user:
-                    current_user_is_owner = True
-
-        context['u_pk'] = u_id
-        context['club'] = current_club
-        context['all_users'] = all_users
+        user_level = self.club.user_level(self.request.user)
+        query = self.request.GET.get('q', '')
+        members = matching(self.object_list, query, ['first_name', 'last_name', 'public_bio', 'favourite_genre'])
+        paginator = CursorPaginator(members, settings.USERS_PER_PAGE, ('last_name', 'first_name', 'id'))
+        page_obj = paginator.get_page(self.request.GET.get('cursor'))
+        context['club'] = self.club
+        context['query'] = query
         context['page_obj'] = page_obj
+        context['is_paginated'] = page_obj.has_other_pages()
         context['user_level'] = user_level
-        context['c_pk'] = current_club_id
-        context['is_owner'] = current_user_is_owner
+        context['c_pk'] = self.club.id
+        context['is_owner'] = user_level == "Owner"
         context['current_user'] = self.request.user
         return context
 
@@ -177,26 +159,14 @@ class ClubUpdateView(LoginRequiredMixin, UpdateView):
             return redirect('club_list')
 
 
-def club_util(request):
-    user_clubs_list = []
-    clubs = Club.objects.all()
-
-    for temp_club in clubs:
-        if request.user in temp_club.get_all_users():
-            user_clubs_list.append(temp_club)
-
-    config.user_clubs = user_clubs_list
-
 @login_required
 def club_selector(request):
-    club_util(request)
-    return render(request, "club_switcher.html", {'user_clubs': config.user_clubs, 'user': request.user})
+    return render(request, "club_switcher.html", {'user_clubs': get_user_clubs(request.user), 'user': request.user})
 
 
 @login_required
 def club_selector_alt(request):
-    club_util(request)
-    return render(request, "club_switcher_alt.html", {"user_clubs": config.user_clubs, 'user': request.user})
+    return render(request, "club_switcher_alt.html", {"user_clubs": get_user_clubs(request.user), 'user': request.user})
 
 
 @login_required
@@ -206,7 +176,6 @@ def new_club(request):  # new club adapted from the chess club project
         form = ClubForm(request.POST)
         if form.is_valid():
             form.save(request.user)
-            club_util(request)
             messages.add_message(request, messages.SUCCESS, "Club has been created!")
             return redirect('club_selector')
     else:
@@ -245,12 +214,14 @@ def club_profile(request, club_id):
         return redirect('club_list')
 
     current_user = request.user
-    is_owner = club.user_level(current_user) == "Owner"
+    user_level = club.user_level(current_user)
     
     return render(request, 'club_profile.html', {
         'club': club,
         'current_user': current_user,
-        'is_owner': is_owner,
+        'user_level': user_level,
+        'is_owner': user_level == "Owner",
+        'is_in_club': user_level != "Not in club",
         'posts': posts,
         'meetings': meetings,
         'post_form': post_form,
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render, redirect
 from bookclub.templates import *
@@ -9,6 +10,8 @@ from django.urls import reverse
 from bookclub.models import *
 from django.views.generic.edit import View
 from django.db.models import Q
+from bookclub.inbox import inbox_page, mark_chat_read
+from bookclub.pagination import CursorPaginator
 
 
 
@@ -76,17 +79,17 @@ def createChatFromProfile(request, user_id):
 # Adapted from https://legionscript.medium.com/building-a-social-media-app-with-django-and-python-part-14-direct-messages-pt-1-1a6b8bd9fc40
 class ListChatsView(View):
     def get(self, request, *args, **kwargs):
-        chats = Chat.objects.filter(Q(user=request.user) | Q(receiver=request.user))
-        users = User.objects.all()
-        users_in_conversation_with = []
-        for chat in chats:
-            users_in_conversation_with.append(chat.user)
-            users_in_conversation_with.append(chat.receiver)
+        page_obj = inbox_page(request.user, request.GET.get('cursor'))
+        followers = (request.user.followers.filter(is_active=True)
+                     .exclude(id__in=Chat.objects.filter(user=request.user).values('receiver'))
+                     .exclude(id__in=Chat.objects.filter(receiver=request.user).values('user')))
+        users = User.objects.filter(is_active=True).exclude(id=request.user.id)
 
         context = {
-            'chats': chats,
-            'users': users,
-            'user_chats': users_in_conversation_with
+            'page_obj': page_obj,
+            'followers': followers[:settings.USERS_PER_PAGE],
+            'users': users[:settings.USERS_PER_PAGE],
+            'form': ChatForm()
         }
         return render(request, 'inbox.html', context)
 
@@ -115,22 +118,18 @@ class ChatView(View):
 
     def get(self, request, pk, *args, **kwargs):
         form = MessageForm()
-        chat = Chat.objects.get(pk=pk)
-        if Message.objects.filter(chat=chat).exists():
-            user_messages = Message.objects.filter(chat=chat)
-            for msg in user_messages:
-                if request.user == chat.receiver:
-                    msg.is_read = True
-                    msg.save()
-
+        chat = Chat.objects.select_related('user', 'receiver').get(pk=pk)
 
         if request.user == chat.receiver or request.user == chat.user:
-
-            message_list = Message.objects.filter(chat__pk__contains=pk)
+            mark_chat_read(chat, request.user)
+            paginator = CursorPaginator(Message.objects.filter(chat=chat).select_related('club'),
+                                        settings.MESSAGES_PER_PAGE, ('-date', '-id'))
+            page_obj = paginator.get_page(request.GET.get('cursor'))
             context = {
                 'chat': chat,
                 'form': form,
-                'message_list': message_list
+                'message_list': page_obj.object_list[::-1],
+                'page_obj': page_obj
             }
             return render(request, 'chat.html', context)
 
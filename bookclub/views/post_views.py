@@ -6,11 +6,10 @@ from django.views.generic.edit import CreateView
 from django.urls import reverse
 from bookclub.forms import PostForm
 from bookclub.models import Post, Club, User
-from bookclub.views import config
+from bookclub.timelines import timeline_page
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.edit import View
-from django.core.paginator import Paginator
 from django.conf import settings
 
 
@@ -56,22 +55,7 @@ class NewPostView(LoginRequiredMixin, CreateView):
 
 def get_all_club_posts(request):
 
-    user_clubs_list = []
-    clubs = Club.objects.all()
-
-    for club in clubs:
-        if request.user in club.get_all_users():
-            user_clubs_list.append(club)
-
-    all_club_posts = []
-
-    for club in user_clubs_list:
-        club_posts = list(set(Post.objects.filter(club=club)))
-        if club_posts:
-            for post in club_posts:
-                all_club_posts.append(post)
-    all_club_posts.sort(key=lambda p: p.created_at, reverse=True)
-    return all_club_posts
+    return timeline_page(request.user, Post, request.GET.get('cursor'), query=request.GET.get('q'))
 
 class ClubPostsView(LoginRequiredMixin, View):
     """View that handles club posts."""
@@ -83,10 +67,6 @@ class ClubPostsView(LoginRequiredMixin, View):
     def render(self):
         current_user = self.request.user
         """Render all club posts"""
-        club_posts = get_all_club_posts(self.request)
-
-        paginator = Paginator(club_posts, settings.POSTS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        page_obj = get_all_club_posts(self.request)
 
-        return render(self.request, 'club_posts.html', {'club_posts': club_posts, 'page_obj': page_obj})
+        return render(self.request, 'club_posts.html', {'page_obj': page_obj, 'query': self.request.GET.get('q', '')})
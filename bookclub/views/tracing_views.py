@@ -0,0 +1,10 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from bookclub.tracing import histogram_summary
+
+
+@staff_member_required
+def trace_stats(request):
+    """Dump the latency histograms of every traced stage in this process"""
+
+    return JsonResponse(histogram_summary())
@@ -6,10 +6,10 @@ from django.views.generic.edit import CreateView
 from django.urls import reverse
 from bookclub.forms import UserPostForm
 from bookclub.models import UserPost, Club, User
+from bookclub.timelines import timeline_page
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic.edit import View
-from django.core.paginator import Paginator
 from django.conf import settings
 
 
@@ -53,16 +53,7 @@ class UserNewPostView(LoginRequiredMixin, CreateView):
         return redirect('login')
 
 def get_all_follow_posts(request):
-    all_follow_posts = []
-    current_user = request.user
-
-    for follow in current_user.followees.all():
-        user_posts = list(set(UserPost.objects.filter(author=follow)))
-        if user_posts:
-            for post in user_posts:
-                all_follow_posts.append(post)
-    all_follow_posts.sort(key=lambda p: p.created_at, reverse=True)
-    return all_follow_posts
+    return timeline_page(request.user, UserPost, request.GET.get('cursor'), query=request.GET.get('q'))
 
 class UserPostsView(LoginRequiredMixin, View):
     """View that handles user posts."""
@@ -74,10 +65,6 @@ class UserPostsView(LoginRequiredMixin, View):
     def render(self):
         current_user = self.request.user
         """Render all user posts"""
-        user_posts = get_all_follow_posts(self.request)
-
-        paginator = Paginator(user_posts, settings.POSTS_PER_PAGE)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        page_obj = get_all_follow_posts(self.request)
 
-        return render(self.request, 'user_posts.html', {'user_posts': user_posts, 'page_obj': page_obj})
+        return render(self.request, 'user_posts.html', {'page_obj': page_obj, 'query': self.request.GET.get('q', '')})
@@ -14,7 +14,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView
 from django.template.loader import render_to_string
-from bookclub.views import config
+from bookclub.memberships import get_user_clubs
 from django.core.paginator import Paginator
 
 class UserClubsListView(LoginRequiredMixin, ListView):
@@ -87,7 +87,7 @@ class UsersListView(LoginRequiredMixin, ListView):
     model = User
     template_name = "user_list.html"
     context_object_name = "users"
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_active=True)
     paginate_by = settings.USERS_PER_PAGE
 
 
@@ -95,7 +95,6 @@ class UsersListView(LoginRequiredMixin, ListView):
 def user_profile(request, user_id):
     """ Individual User's Profile Page """
     user = User.objects.get(id=user_id)
-    club_util(request)
     current_user = request.user
     following = request.user.is_following(user)
     followable = request.user != user
@@ -111,7 +110,7 @@ def user_profile(request, user_id):
                       'current_user': current_user,
                       'following': following,
                       'followable': followable,
-                      'user_clubs': config.user_clubs,
+                      'user_clubs': get_user_clubs(request.user),
                       'currently_reading_books': currently_reading_books[:3],
                       'form': form,
                       'posts': posts
@@ -169,11 +168,6 @@ def unfollow_from_user_profile(request, user_id):
     return redirect('user_profile', user_id=user_id)
 
 
-def club_util(request):
-    user_clubs_list = request.user.get_all_clubs()
-    config.user_clubs = user_clubs_list
-
-
 @login_required
 def inviteMessage(request, user_id, club_id):
     club = Club.objects.get(pk=club_id)
@@ -0,0 +1,148 @@
+"""Throughput and latency benchmarks of the collaborative filtering engines on synthetic ratings.
+
+Each scale generates a rating set with a long-tailed book popularity, builds one Surprise trainset and, for every
+engine, measures the fit, the latency of scoring one user against every book as the dashboard does, the
+throughput of scoring users in batches as the precompute does and the peak memory allocated while fitting.
+"""
+import os
+import platform
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import surprise
+from surprise import SVD, BaselineOnly
+from recommender.scoring import export_model, score_users, top_n_items
+from recommender.stages import PRECOMPUTE_BATCH_SIZE, TOP_N
+from recommender.trainset import trainset_from_df
+from recommender.tuning import load_best_params
+
+BENCHMARK_RESULTS_PATH = 'data/benchmark.json'
+SCALES = {'10k': 10 ** 4, '100k': 10 ** 5, '1m': 10 ** 6, '10m': 10 ** 7}
+ENGINES = {
+    'svd': lambda: SVD(**load_best_params()),
+    'baseline_only': lambda: BaselineOnly(verbose=False),
+}
+RATINGS_PER_USER = 10
+RATINGS_PER_BOOK = 20
+LATENCY_SAMPLES = 200
+THROUGHPUT_USERS = 5000
+THROUGHPUT_MIN_SECONDS = 0.5
+REGRESSION_TOLERANCE = 0.2
+LOWER_IS_BETTER = ['trainset_seconds', 'fit_seconds', 'latency_p50_ms', 'latency_p99_ms', 'fit_peak_bytes']
+HIGHER_IS_BETTER = ['users_per_second']
+NOISE_FLOORS = {'trainset_seconds': 0.1, 'fit_seconds': 0.1, 'latency_p50_ms': 0.5, 'latency_p99_ms': 0.5,
+                'fit_peak_bytes': 2 ** 20}
+
+
+def generate_ratings(count, random_state=0):
+    """ Draw about count ratings. Book popularity follows a power law and ratings depend on user and book biases """
+
+    rng = np.random.RandomState(random_state)
+    users = max(1, count // RATINGS_PER_USER)
+    books = max(1, count // RATINGS_PER_BOOK)
+    popularity = 1 / np.arange(1, books + 1) ** 0.8
+    user_ids = rng.randint(0, users, count)
+    book_rows = rng.choice(books, count, p=popularity / popularity.sum())
+    user_bias = rng.normal(0, 1, users)
+    book_bias = rng.normal(0, 1, books)
+    ratings = np.clip(np.rint(7 + user_bias[user_ids] + book_bias[book_rows] + rng.normal(0, 1.5, count)), 1, 10)
+    dataframe = pd.DataFrame({'user_id': user_ids, 'isbn': book_rows.astype(str), 'rating': ratings.astype(np.int64)})
+    return dataframe.drop_duplicates(['user_id', 'isbn']).reset_index(drop=True)
+
+
+def percentile_ms(seconds, percentile):
+    return float(np.percentile(seconds, percentile) * 1000)
+
+
+def benchmark_engine(make_engine, trainset, random_state=0):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    algo = make_engine()
+    algo.fit(trainset)
+    fit_seconds = time.perf_counter() - start_time
+    fit_peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    model = export_model(algo, trainset)
+    rng = np.random.RandomState(random_state)
+    latencies = []
+    for row in rng.randint(0, trainset.n_users, LATENCY_SAMPLES):
+        start_time = time.perf_counter()
+        top_n_items(score_users(model, [row]), TOP_N)
+        latencies.append(time.perf_counter() - start_time)
+
+    users = np.arange(min(trainset.n_users, THROUGHPUT_USERS))
+    scored = 0
+    start_time = time.perf_counter()
+    while scored == 0 or time.perf_counter() - start_time < THROUGHPUT_MIN_SECONDS:
+        for start in range(0, len(users), PRECOMPUTE_BATCH_SIZE):
+            top_n_items(score_users(model, users[start:start + PRECOMPUTE_BATCH_SIZE]), TOP_N)
+        scored += len(users)
+    batch_seconds = time.perf_counter() - start_time
+
+    return {
+        'fit_seconds': fit_seconds,
+        'fit_peak_bytes': fit_peak_bytes,
+        'latency_p50_ms': percentile_ms(latencies, 50),
+        'latency_p99_ms': percentile_ms(latencies, 99),
+        'users_per_second': scored / batch_seconds,
+    }
+
+
+def environment():
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+            'surprise': surprise.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def run_benchmark(scales, engines, random_state=0, log=print):
+    """ Return {scale: {'ratings', 'users', 'books', 'trainset_seconds', 'engines': {engine: measurements}}} """
+
+    results = {}
+    for scale in scales:
+        ratings = generate_ratings(SCALES[scale], random_state)
+        start_time = time.perf_counter()
+        trainset = trainset_from_df(ratings)
+        trainset_seconds = time.perf_counter() - start_time
+        log(f'{scale}: {len(ratings)} ratings, {trainset.n_users} users, {trainset.n_items} books, '
+            f'trainset in {trainset_seconds:.2f}s')
+
+        results[scale] = {'ratings': len(ratings), 'users': trainset.n_users, 'books': trainset.n_items,
+                          'trainset_seconds': trainset_seconds, 'engines': {}}
+        for engine in engines:
+            measurements = benchmark_engine(ENGINES[engine], trainset, random_state)
+            results[scale]['engines'][engine] = measurements
+            log(f"  {engine}: fit {measurements['fit_seconds']:.2f}s, "
+                f"p50 {measurements['latency_p50_ms']:.2f}ms, p99 {measurements['latency_p99_ms']:.2f}ms, "
+                f"{measurements['users_per_second']:.0f} users/s, "
+                f"peak {measurements['fit_peak_bytes'] / 2 ** 20:.1f}MiB")
+    return results
+
+
+def is_regression(metric, current, baseline, tolerance):
+    """ Changes smaller than the metric's noise floor are never regressions, so timings of tiny scales can jitter """
+
+    if metric in LOWER_IS_BETTER:
+        return current > baseline * (1 + tolerance) and current - baseline > NOISE_FLOORS.get(metric, 0)
+    return current < baseline * (1 - tolerance)
+
+
+def compare_results(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """ List the measurements that are worse than the baseline by more than the tolerance. Scales and engines
+    missing from either run are not compared """
+
+    regressions = []
+    for scale, current in results.items():
+        if scale not in baseline:
+            continue
+        pairs = [(None, 'trainset_seconds', current['trainset_seconds'], baseline[scale]['trainset_seconds'])]
+        for engine, measurements in current['engines'].items():
+            for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+                if metric in measurements and metric in baseline[scale]['engines'].get(engine, {}):
+                    pairs.append((engine, metric, measurements[metric], baseline[scale]['engines'][engine][metric]))
+
+        for engine, metric, value, baseline_value in pairs:
+            if is_regression(metric, value, baseline_value, tolerance):
+                regressions.append({'scale': scale, 'engine': engine, 'metric': metric, 'value': value,
+                                    'baseline': baseline_value})
+    return regressions
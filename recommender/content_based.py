@@ -0,0 +1,129 @@
+"""Content-based recommendations built from the book catalogue, used for cold-start users."""
+import os
+import pickle
+import re
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+
+CONTENT_MODEL_PATH = 'data/content_model.p'
+N_FEATURES = 2 ** 18
+AUTHOR_BOOST = 0.25
+READING_LIST_WEIGHT = 0.5
+FAVOURITE_WEIGHT = 1.0
+
+_token_pattern = re.compile(r'[a-z0-9]+')
+_cached_model = {'mtime': None, 'model': None}
+
+
+def normalise(text):
+    return ' '.join(_token_pattern.findall(str(text).lower()))
+
+
+def book_tokens(doc):
+    """ Split a (title, author, publisher) triple into hashed features. Author and publisher are kept whole """
+
+    title, author, publisher = doc
+    tokens = _token_pattern.findall(str(title).lower())
+    tokens.append('author=' + normalise(author))
+    tokens.append('publisher=' + normalise(publisher))
+    return tokens
+
+
+def build_content_model(books):
+    """ Build the TF-IDF matrix and author index from (isbn, title, author, publisher) rows """
+
+    isbns = []
+    docs = []
+    authors = {}
+    for row, (isbn, title, author, publisher) in enumerate(books):
+        isbns.append(isbn)
+        docs.append((title, author, publisher))
+        authors.setdefault(normalise(author), []).append(row)
+
+    if docs:
+        vectorizer = HashingVectorizer(analyzer=book_tokens, n_features=N_FEATURES, alternate_sign=False, norm=None)
+        counts = vectorizer.transform(docs)
+        matrix = TfidfTransformer(sublinear_tf=True).fit_transform(counts).astype(np.float32).tocsr()
+    else:
+        matrix = sp.csr_matrix((0, N_FEATURES), dtype=np.float32)
+
+    return {
+        'isbns': np.array(isbns, dtype=object),
+        'rows': {isbn: row for row, isbn in enumerate(isbns)},
+        'matrix': matrix,
+        'authors': {author: np.array(rows, dtype=np.int64) for author, rows in authors.items()},
+        'book_authors': [normalise(doc[1]) for doc in docs],
+    }
+
+
+def build_content_model_from_db():
+    from bookclub.models import Book
+
+    books = Book.objects.order_by('id').values_list('isbn', 'title', 'author', 'publisher').iterator(chunk_size=5000)
+    return build_content_model(books)
+
+
+def save_content_model(model, path=CONTENT_MODEL_PATH):
+    with open(path, 'wb') as file:
+        pickle.dump(model, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_content_model(path=CONTENT_MODEL_PATH):
+    """ Load the content model once per process, reloading it only when the file on disk changes """
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _cached_model['mtime'] != mtime:
+        with open(path, 'rb') as file:
+            _cached_model['model'] = pickle.load(file)
+        _cached_model['mtime'] = mtime
+    return _cached_model['model']
+
+
+def get_seed_weights(user):
+    """ Weight every book the user has interacted with. Ratings below 6 count against a book """
+
+    weights = {}
+    for isbn in user.currently_reading_books.values_list('isbn', flat=True):
+        weights[isbn] = weights.get(isbn, 0) + READING_LIST_WEIGHT
+    for isbn in user.favourite_books.values_list('isbn', flat=True):
+        weights[isbn] = weights.get(isbn, 0) + FAVOURITE_WEIGHT
+    for isbn, rating in user.get_ratings().values_list('isbn', 'rating'):
+        weights[isbn] = weights.get(isbn, 0) + (rating - 5.5) / 4.5
+    return weights
+
+
+def recommend(model, seed_weights, top_n):
+    """ Score the whole catalogue against the weighted seed books with sparse dot products """
+
+    seeds = [(model['rows'][isbn], weight) for isbn, weight in seed_weights.items() if isbn in model['rows']]
+    if not seeds:
+        return []
+    seed_rows = np.array([row for row, weight in seeds], dtype=np.int64)
+    seed_weights = np.array([weight for row, weight in seeds], dtype=np.float32)
+
+    matrix = model['matrix']
+    profile = matrix[seed_rows].T.dot(seed_weights)
+    scores = matrix.dot(profile)
+
+    for row, weight in seeds:
+        if weight > 0:
+            author_rows = model['authors'].get(model['book_authors'][row])
+            if author_rows is not None:
+                scores[author_rows] += AUTHOR_BOOST * weight
+
+    scores[seed_rows] = -np.inf
+    top_n = min(top_n, len(scores))
+    candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [model['isbns'][row] for row in candidates if scores[row] > 0]
+
+
+def cold_start_recommender(user, top_n):
+    model = load_content_model()
+    if model is None:
+        return []
+    return recommend(model, get_seed_weights(user), top_n)
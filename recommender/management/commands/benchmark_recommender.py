@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from recommender.benchmark import (run_benchmark, compare_results, environment, BENCHMARK_RESULTS_PATH, ENGINES, SCALES,
+                                   REGRESSION_TOLERANCE)
+
+
+class Command(BaseCommand):
+    """Benchmark the recommender engines on synthetic ratings and compare the results with a saved baseline"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES),
+                            help='Numbers of ratings to generate. Defaults to every scale.')
+        parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES),
+                            help='Engines to benchmark. Defaults to every engine.')
+        parser.add_argument('--output', default=BENCHMARK_RESULTS_PATH, help='Where to write the JSON results.')
+        parser.add_argument('--compare', metavar='BASELINE',
+                            help='A previous results file. Fails if any measurement has regressed.')
+        parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                            help='Relative change allowed before a measurement is a regression. Defaults to 0.2.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)['results']
+            except (OSError, ValueError, KeyError) as error:
+                raise CommandError(f"Could not read the baseline {options['compare']}: {error}")
+
+        results = run_benchmark(options['scales'], options['engines'], log=self.stdout.write)
+        report = {'environment': environment(), 'results': results}
+        if baseline is not None:
+            report['baseline'] = options['compare']
+            report['regressions'] = compare_results(results, baseline, options['tolerance'])
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            for regression in report['regressions']:
+                self.stdout.write(self.style.ERROR(
+                    f"{regression['scale']} {regression['engine'] or 'trainset'} {regression['metric']}: "
+                    f"{regression['value']:.4g} against {regression['baseline']:.4g}"))
+            if report['regressions']:
+                raise CommandError(f"{len(report['regressions'])} measurements regressed against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from recommender.content_based import build_content_model_from_db, save_content_model, CONTENT_MODEL_PATH
+
+
+class Command(BaseCommand):
+    """Build the content-based model used to recommend books to users with fewer than 20 ratings"""
+
+    def handle(self, *args, **options):
+        model = build_content_model_from_db()
+        save_content_model(model)
+        print(f"Content model for {len(model['isbns'])} books saved to {CONTENT_MODEL_PATH}")
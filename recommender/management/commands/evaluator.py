@@ -8,6 +8,10 @@ from surprise import SVD, KNNBasic, KNNBaseline, KNNWithZScore, KNNWithMeans, Ba
     NormalPredictor, SlopeOne
 from surprise.model_selection import cross_validate
 from surprise import Dataset, Reader
+from recommender.metrics import split_holdout, ratings_matrix, ranking_metrics
+from recommender.scoring import export_model
+from recommender.stages import load_pickle, USER_ITEM_RATING_PATH
+from recommender.trainset import trainset_from_df
 
 
 def evaluator():
@@ -70,7 +74,33 @@ def evaluator():
     print('SlopeOne', cross_validate(SlopeOne(), data, measures=['RMSE'], cv=5, verbose=True))
 
 
+def ranking_evaluator(k, test_size, log=print):
+    """ Compare the top-k lists of the models with a held-out set of the cleaned ratings """
+
+    ratings = load_pickle(USER_ITEM_RATING_PATH)[['user_id', 'isbn', 'rating']]
+    train, test = split_holdout(ratings, test_fraction=test_size)
+    trainset = trainset_from_df(train)
+
+    for name, algo in [('SVD', SVD()), ('BaselineOnly', BaselineOnly(verbose=False))]:
+        algo.fit(trainset)
+        model = export_model(algo, trainset)
+        metrics = ranking_metrics(model, ratings_matrix(model, train), ratings_matrix(model, test), k=k)
+        log(name + ' ' + ', '.join(f'{metric}: {value:.4f}' if isinstance(value, float) else f'{metric}: {value}'
+                                   for metric, value in metrics.items()))
+
+
 class Command(BaseCommand):
 
+    def add_arguments(self, parser):
+        parser.add_argument('--ranking', action='store_true',
+                            help='Report top-k ranking metrics instead of cross-validated RMSE.')
+        parser.add_argument('-k', type=int, default=10, help='Length of the ranked lists. Defaults to 10.')
+        parser.add_argument('--test-size', type=float, default=0.2, help='Fraction of ratings held out.')
+
     def handle(self, *args, **options):
-        evaluator()
+        if options['ranking']:
+            if options['k'] < 1 or not 0 < options['test_size'] < 1:
+                raise CommandError('Expected -k >= 1 and 0 < --test-size < 1')
+            ranking_evaluator(options['k'], options['test_size'], log=self.stdout.write)
+        else:
+            evaluator()
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from recommender.pipeline import file_hash
+from recommender.sharding import parse_shard, users_in_shard, write_marker, clear_marker
+from recommender.stages import get_eligible_user_ids, load_pickle, precompute_recommendations, SVD_MODEL_PATH
+
+
+class Command(BaseCommand):
+    """Precompute the recommendations of one shard of the users from the trained model"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shard', default='0/1', help='The shard to compute, as i/n. Defaults to 0/1.')
+
+    def handle(self, *args, **options):
+        try:
+            index, count = parse_shard(options['shard'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        model_hash = file_hash(SVD_MODEL_PATH)
+        if model_hash is None:
+            raise CommandError(f'No trained model at {SVD_MODEL_PATH}. Run: python3 manage.py recommender')
+
+        clear_marker(index, count)
+        start_time = time.perf_counter()
+        model = load_pickle(SVD_MODEL_PATH)
+        user_ids = users_in_shard(get_eligible_user_ids(), index, count)
+        written = precompute_recommendations(model, user_ids)
+        seconds = time.perf_counter() - start_time
+
+        write_marker(index, count, {'model': model_hash, 'users': len(user_ids), 'recommendations': written,
+                                    'seconds': round(seconds, 3)})
+        self.stdout.write(f'Shard {index}/{count}: {written} recommendations for {len(user_ids)} users '
+                          f'in {seconds:.2f}s')
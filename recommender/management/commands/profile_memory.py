@@ -0,0 +1,53 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from recommender.benchmark import environment
+from recommender.memory import profile_stages, compare_reports, format_mib, MEMORY_PROFILE_PATH, SAMPLE_INTERVAL
+from recommender.stages import build_pipeline
+
+
+class Command(BaseCommand):
+    """Profile the memory of the recommender pipeline stages, or compare two saved profiles side by side"""
+
+    def add_arguments(self, parser):
+        stages = build_pipeline().stage_names()
+        parser.add_argument('--stages', nargs='+', choices=stages, default=stages,
+                            help='Stages to profile. They always run, whatever the pipeline state says.')
+        parser.add_argument('--output', default=MEMORY_PROFILE_PATH, help='Where to write the JSON report.')
+        parser.add_argument('--interval', type=float, default=SAMPLE_INTERVAL, help='Seconds between RSS samples.')
+        parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                            help='Compare two saved reports instead of profiling.')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            self.compare(*options['compare'])
+            return
+
+        stages = [stage for stage in build_pipeline().stages if stage.name in options['stages']]
+        report = {'environment': environment(),
+                  'stages': profile_stages(stages, options['interval'], log=self.stdout.write)}
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        for stage in report['stages']:
+            self.stdout.write(f"\n{stage['stage']}: top allocation sites near the peak")
+            for allocation in stage['top_allocations']:
+                self.stdout.write(f"  {format_mib(allocation['bytes']):>12} {allocation['count']:>9} blocks  "
+                                  f"{allocation['site']}")
+            self.stdout.write('  object count changes: ' + ', '.join(
+                f'{name} {change:+d}' for name, change in stage['object_changes'].items()))
+        self.stdout.write(f"\nReport written to {options['output']}")
+
+    def compare(self, before_path, after_path):
+        reports = []
+        for path in [before_path, after_path]:
+            try:
+                with open(path) as file:
+                    reports.append(json.load(file))
+            except (OSError, ValueError) as error:
+                raise CommandError(f'Could not read {path}: {error}')
+
+        header = ['stage', 'traced before', 'traced after', 'change', 'RSS before', 'RSS after', 'change']
+        rows = [header] + compare_reports(*reports)
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+        for row in rows:
+            self.stdout.write('  '.join(value.ljust(width) for value, width in zip(row, widths)))
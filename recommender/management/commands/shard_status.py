@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from recommender.pipeline import file_hash
+from recommender.sharding import read_markers
+from recommender.stages import SVD_MODEL_PATH
+
+
+class Command(BaseCommand):
+    """Report which shards of the recommendation precompute have finished with the current model"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', type=int, required=True, help='The number of shards the work was split into.')
+
+    def handle(self, *args, **options):
+        count = options['shards']
+        if count < 1:
+            raise CommandError('--shards must be at least 1.')
+
+        model_hash = file_hash(SVD_MODEL_PATH)
+        finished = 0
+        for index, marker in enumerate(read_markers(count)):
+            if marker is None:
+                self.stdout.write(f'Shard {index}/{count}: pending')
+            elif marker['model'] != model_hash:
+                self.stdout.write(f'Shard {index}/{count}: stale, finished {marker["finished_at"]} with an older model')
+            else:
+                finished += 1
+                self.stdout.write(f'Shard {index}/{count}: done at {marker["finished_at"]}, {marker["users"]} users, '
+                                  f'{marker["recommendations"]} recommendations in {marker["seconds"]}s')
+        self.stdout.write(f'{finished}/{count} shards complete')
@@ -0,0 +1,37 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from recommender.stages import load_pickle, rating_matrix_to_dataframe, RATING_MATRIX_PATH, USER_ITEM_RATING_PATH
+from recommender.tuning import successive_halving, save_results, TUNING_RESULTS_PATH
+
+
+class Command(BaseCommand):
+    """Search the SVD hyperparameters with successive halving and save the winner for the train stage"""
+
+    def add_arguments(self, parser):
+        parser.add_argument('--configs', type=int, default=27, help='Random configurations in the first rung.')
+        parser.add_argument('--eta', type=int, default=3, help='Keep 1/eta of the configurations at each rung.')
+        parser.add_argument('--min-fraction', type=float, default=1 / 9,
+                            help='Fraction of the training ratings used in the first rung.')
+        parser.add_argument('--validation', type=float, default=0.2, help='Fraction of ratings held out.')
+        parser.add_argument('--jobs', type=int, default=-1, help='Parallel trials. Defaults to every core.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['eta'] < 2 or not 0 < options['min_fraction'] <= 1 or not 0 < options['validation'] < 1:
+            raise CommandError('Expected --eta >= 2, 0 < --min-fraction <= 1 and 0 < --validation < 1')
+
+        if os.path.exists(RATING_MATRIX_PATH):
+            ratings = rating_matrix_to_dataframe(load_pickle(RATING_MATRIX_PATH))
+        else:
+            ratings = load_pickle(USER_ITEM_RATING_PATH)[['user_id', 'isbn', 'rating']]
+
+        results = successive_halving(ratings, n_configs=options['configs'], eta=options['eta'],
+                                     min_fraction=options['min_fraction'], validation_fraction=options['validation'],
+                                     n_jobs=options['jobs'], random_state=options['seed'], log=self.stdout.write)
+        save_results(results)
+
+        best = results['best']
+        self.stdout.write(f"Best RMSE {best['rmse']:.4f} with {best['params']}")
+        for point in best['learning_curve']:
+            self.stdout.write(f"  {point['fraction']:.3f} of the training ratings: RMSE {point['rmse']:.4f}")
+        self.stdout.write(f'Saved to {TUNING_RESULTS_PATH}. The next train stage will use these parameters.')
@@ -0,0 +1,155 @@
+"""Memory profiling of the recommender pipeline stages.
+
+Each stage runs with tracemalloc on while a background thread samples the resident set size from /proc/self/statm.
+The sampler also snapshots the traced allocations whenever they grow well past the last snapshot, so the
+allocation sites reported for a stage are the ones alive close to its peak rather than the ones left at its end.
+"""
+import gc
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MEMORY_PROFILE_PATH = 'data/memory_profile.json'
+SAMPLE_INTERVAL = 0.05
+SNAPSHOT_GROWTH = 1.2
+TOP_ALLOCATIONS = 10
+TOP_OBJECT_TYPES = 10
+TRACEBACK_FRAMES = 1
+MIB = 2 ** 20
+
+
+def rss_bytes():
+    """ The current resident set size, or None where /proc is not available """
+
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def object_counts():
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def top_allocations(snapshot, limit=TOP_ALLOCATIONS):
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, threading.__file__),
+                                       tracemalloc.Filter(False, __file__)])
+    return [{'site': f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}', 'bytes': stat.size,
+             'count': stat.count} for stat in snapshot.statistics('lineno')[:limit]]
+
+
+class Sampler(threading.Thread):
+    """Samples RSS and snapshots traced allocations near their peak until stopped"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.rss_peak = rss_bytes()
+        self.snapshot = None
+        self.snapshot_size = 0
+
+    def sample(self):
+        rss = rss_bytes()
+        if rss is not None:
+            self.rss_peak = max(self.rss_peak or 0, rss)
+        traced = tracemalloc.get_traced_memory()[0]
+        if traced > self.snapshot_size * SNAPSHOT_GROWTH:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = traced
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+def profile_stage(name, func, interval=SAMPLE_INTERVAL):
+    """ Run one stage and return its time, traced and RSS peaks, top allocation sites and object count changes """
+
+    gc.collect()
+    objects_before = object_counts()
+    rss_before = rss_bytes()
+    tracemalloc.start(TRACEBACK_FRAMES)
+    sampler = Sampler(interval)
+    sampler.start()
+    start_time = time.perf_counter()
+    try:
+        func()
+    finally:
+        seconds = time.perf_counter() - start_time
+        sampler.stop()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        allocations = top_allocations(sampler.snapshot or tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    rss_peak = sampler.rss_peak
+    del sampler
+
+    gc.collect()
+    object_changes = object_counts()
+    object_changes.subtract(objects_before)
+    return {
+        'stage': name,
+        'seconds': seconds,
+        'traced_peak_bytes': traced_peak,
+        'rss_start_bytes': rss_before,
+        'rss_peak_bytes': rss_peak,
+        'top_allocations': allocations,
+        'object_changes': dict(sorted(((type_name, change) for type_name, change in object_changes.items() if change),
+                                      key=lambda item: -abs(item[1]))[:TOP_OBJECT_TYPES]),
+    }
+
+
+def profile_stages(stages, interval=SAMPLE_INTERVAL, log=print):
+    """ Profile the stages in order. Stages whose input files are missing are left out """
+
+    report = []
+    for stage in stages:
+        missing = stage.missing_inputs()
+        if missing:
+            log(f"[{stage.name}] skipped, inputs not available: {', '.join(missing)}")
+            continue
+        log(f'[{stage.name}] profiling...')
+        result = profile_stage(stage.name, stage.func, interval)
+        log(f"[{stage.name}] {result['seconds']:.2f}s, traced peak {result['traced_peak_bytes'] / MIB:.1f} MiB, "
+            f"RSS peak {format_mib(result['rss_peak_bytes'])}")
+        report.append(result)
+    return report
+
+
+def format_mib(value):
+    return 'n/a' if value is None else f'{value / MIB:.1f} MiB'
+
+
+def format_change(before, after):
+    if before is None or after is None:
+        return 'n/a'
+    if not before:
+        return f'{(after - before) / MIB:+.1f} MiB'
+    return f'{(after - before) / before:+.0%}'
+
+
+def compare_reports(before, after):
+    """ Rows of stage, then the traced and RSS peaks of both runs with their change, for the stages of either run """
+
+    before_stages = {stage['stage']: stage for stage in before['stages']}
+    after_stages = {stage['stage']: stage for stage in after['stages']}
+    names = [stage['stage'] for stage in before['stages']]
+    names += [name for name in after_stages if name not in before_stages]
+
+    rows = []
+    for name in names:
+        old, new = before_stages.get(name, {}), after_stages.get(name, {})
+        row = [name]
+        for key in ['traced_peak_bytes', 'rss_peak_bytes']:
+            row += [format_mib(old.get(key)), format_mib(new.get(key)), format_change(old.get(key), new.get(key))]
+        rows.append(row)
+    return rows
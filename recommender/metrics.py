@@ -0,0 +1,70 @@
+"""Top-N ranking metrics computed for every test user at once.
+
+Users are scored against every item a block at a time, their training items are masked out and the top k items
+are compared with the held-out ratings in a sparse matrix, so no step loops over users in Python.
+"""
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from recommender.scoring import score_users, top_n_items
+
+RELEVANCE_THRESHOLD = 8
+BLOCK_SIZE = 2000
+
+
+def split_holdout(ratings, test_fraction=0.2, random_state=0):
+    """ Hold out a random fraction of the ratings as the test set """
+
+    test = ratings.sample(frac=test_fraction, random_state=random_state)
+    return ratings.drop(test.index), test
+
+
+def ratings_matrix(model, ratings):
+    """ A sparse users x items matrix of the ratings, in the model's row and column order. Ratings of users or
+    items the model does not know are dropped, since it cannot rank them """
+
+    user_rows = pd.Index(model['user_ids']).get_indexer(ratings['user_id'])
+    item_rows = pd.Index(model['isbns']).get_indexer(ratings['isbn'])
+    known = (user_rows >= 0) & (item_rows >= 0)
+    return sp.csr_matrix((ratings['rating'].to_numpy(dtype=np.float32)[known], (user_rows[known], item_rows[known])),
+                         shape=(len(model['user_ids']), len(model['isbns'])))
+
+
+def ranking_metrics(model, train_matrix, test_matrix, k=10, relevance_threshold=RELEVANCE_THRESHOLD,
+                    block_size=BLOCK_SIZE):
+    """ Mean precision@k, recall@k and NDCG@k over the users with a relevant held-out rating, and the fraction of
+    the catalogue that appears in anybody's top k """
+
+    relevant = (test_matrix >= relevance_threshold).astype(np.int8).tocsr()
+    relevant.eliminate_zeros()
+    relevant_counts = np.diff(relevant.indptr)
+    users = np.flatnonzero(relevant_counts)
+    discounts = 1 / np.log2(np.arange(2, k + 2))
+    ideal = np.cumsum(discounts)
+    train_matrix = train_matrix.tocsr()
+
+    precision = recall = ndcg = 0.0
+    recommended = np.zeros(test_matrix.shape[1], dtype=bool)
+    for start in range(0, len(users), block_size):
+        rows = users[start:start + block_size]
+        scores = score_users(model, rows)
+        seen = train_matrix[rows].tocoo()
+        scores[seen.row, seen.col] = -np.inf
+
+        top = top_n_items(scores, k)
+        recommended[top[np.isfinite(np.take_along_axis(scores, top, axis=1))]] = True
+        hits = np.take_along_axis(relevant[rows].toarray(), top, axis=1)
+        counts = relevant_counts[rows]
+
+        precision += hits.sum(axis=1).sum() / k
+        recall += (hits.sum(axis=1) / counts).sum()
+        ndcg += (hits.dot(discounts[:top.shape[1]]) / ideal[np.minimum(counts, k) - 1]).sum()
+
+    evaluated = max(len(users), 1)
+    return {
+        'users': len(users),
+        f'precision@{k}': precision / evaluated,
+        f'recall@{k}': recall / evaluated,
+        f'ndcg@{k}': ndcg / evaluated,
+        'coverage': recommended.sum() / max(test_matrix.shape[1], 1),
+    }
@@ -0,0 +1,132 @@
+"""A small runner for the offline recommender pipeline.
+
+Every stage declares the files it reads and writes. A stage is skipped when the content hashes of its inputs and
+outputs match the ones recorded after its last successful run, so only the stages downstream of a change rerun.
+"""
+import hashlib
+import json
+import os
+import time
+import tracemalloc
+
+PIPELINE_STATE_PATH = 'data/pipeline_state.json'
+
+
+class PipelineError(Exception):
+    pass
+
+
+def file_hash(path):
+    """ Return the sha1 of a file's contents, or None if it does not exist """
+
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Stage:
+    """A pipeline step. fingerprint is an optional callable for inputs that are not files, such as a DB table"""
+
+    def __init__(self, name, func, inputs=(), outputs=(), fingerprint=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.fingerprint = fingerprint
+
+    def input_signature(self):
+        signature = {path: file_hash(path) for path in self.inputs}
+        if self.fingerprint is not None:
+            signature['fingerprint'] = self.fingerprint()
+        return signature
+
+    def output_signature(self):
+        return {path: file_hash(path) for path in self.outputs}
+
+    def missing_inputs(self):
+        return [path for path in self.inputs if not os.path.exists(path)]
+
+
+class Pipeline:
+    """Runs stages in order, skipping the ones whose inputs and outputs are unchanged"""
+
+    def __init__(self, stages, state_path=PIPELINE_STATE_PATH, log=print):
+        self.stages = list(stages)
+        self.state_path = state_path
+        self.log = log
+
+    def stage_names(self):
+        return [stage.name for stage in self.stages]
+
+    def select(self, start=None, only=None):
+        """ Return the stages to force: everything from `start` onwards, or just the ones in `only` """
+
+        names = self.stage_names()
+        for name in ([start] if start else []) + list(only or []):
+            if name not in names:
+                raise PipelineError(f"Unknown stage '{name}'. Stages are: {', '.join(names)}")
+        if only:
+            return {name for name in names if name in only}
+        if start:
+            return set(names[names.index(start):])
+        return set()
+
+    def load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as file:
+            return json.load(file)
+
+    def save_state(self, state):
+        with open(self.state_path, 'w') as file:
+            json.dump(state, file, indent=2, sort_keys=True)
+
+    def is_up_to_date(self, stage, recorded, inputs):
+        if not recorded or recorded.get('inputs') != inputs:
+            return False
+        outputs = stage.output_signature()
+        return None not in outputs.values() and recorded.get('outputs') == outputs
+
+    def run(self, start=None, only=None, force=False):
+        forced = self.select(start, only)
+        state = self.load_state()
+        report = []
+
+        for stage in self.stages:
+            if only and stage.name not in forced:
+                continue
+
+            missing = stage.missing_inputs()
+            if missing:
+                if stage.name in forced:
+                    raise PipelineError(f"Stage '{stage.name}' is missing its inputs: {', '.join(missing)}")
+                self.log(f"[{stage.name}] skipped, inputs not available: {', '.join(missing)}")
+                report.append({'stage': stage.name, 'status': 'unavailable'})
+                continue
+
+            inputs = stage.input_signature()
+            if not force and stage.name not in forced and self.is_up_to_date(stage, state.get(stage.name), inputs):
+                self.log(f"[{stage.name}] skipped, inputs and outputs unchanged")
+                report.append({'stage': stage.name, 'status': 'skipped'})
+                continue
+
+            self.log(f"[{stage.name}] running...")
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            try:
+                stage.func()
+            finally:
+                seconds = time.perf_counter() - start_time
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.log(f"[{stage.name}] done in {seconds:.2f}s, peak memory {peak / 2 ** 20:.1f} MB")
+
+            state[stage.name] = {'inputs': inputs, 'outputs': stage.output_signature()}
+            self.save_state(state)
+            report.append({'stage': stage.name, 'status': 'ran', 'seconds': seconds, 'peak_bytes': peak})
+
+        return report
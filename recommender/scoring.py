@@ -0,0 +1,59 @@
+"""Vectorised scoring of users against every item with a trained matrix factorisation model."""
+import numpy as np
+
+
+def export_model(algo, trainset):
+    """ Keep only the arrays needed to score users, keyed by raw user and item ids in inner id order """
+
+    if hasattr(trainset, 'raw_user_ids'):
+        user_ids, isbns = trainset.raw_user_ids, trainset.raw_item_ids
+    else:
+        user_ids = [trainset.to_raw_uid(inner) for inner in range(trainset.n_users)]
+        isbns = [trainset.to_raw_iid(inner) for inner in range(trainset.n_items)]
+    return {
+        'user_ids': np.array(user_ids),
+        'isbns': np.array(isbns, dtype=object),
+        'global_mean': trainset.global_mean,
+        'bu': np.asarray(getattr(algo, 'bu', np.zeros(trainset.n_users))),
+        'bi': np.asarray(getattr(algo, 'bi', np.zeros(trainset.n_items))),
+        'pu': getattr(algo, 'pu', None),
+        'qi': getattr(algo, 'qi', None),
+    }
+
+
+def score_users(model, user_rows):
+    """ Return a (len(user_rows), n_items) matrix of predicted ratings """
+
+    user_rows = np.asarray(user_rows, dtype=np.int64)
+    scores = model['global_mean'] + model['bu'][user_rows, None] + model['bi'][None, :]
+    if model['pu'] is not None:
+        scores = scores + model['pu'][user_rows].dot(model['qi'].T)
+    return scores
+
+
+def top_n_items(scores, top_n):
+    """ Return the column indices of the top_n scores of every row, best first """
+
+    top_n = min(top_n, scores.shape[1])
+    if top_n <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def predict_pairs(model, user_rows, item_rows):
+    """ Predict one rating per (user row, item row) pair. A row of -1 is an unknown user or item, which falls back
+    to the biases that are known, like Surprise's own predictions """
+
+    user_rows = np.asarray(user_rows, dtype=np.int64)
+    item_rows = np.asarray(item_rows, dtype=np.int64)
+    known_user = user_rows >= 0
+    known_item = item_rows >= 0
+    predictions = np.full(len(user_rows), model['global_mean'], dtype=np.float64)
+    predictions[known_user] += model['bu'][user_rows[known_user]]
+    predictions[known_item] += model['bi'][item_rows[known_item]]
+    if model['pu'] is not None:
+        both = known_user & known_item
+        predictions[both] += np.einsum('ij,ij->i', model['pu'][user_rows[both]], model['qi'][item_rows[both]])
+    return predictions
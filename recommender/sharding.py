@@ -0,0 +1,63 @@
+"""Splitting the recommendation precompute across shards.
+
+Users are assigned to shards by a stable hash of their id, so every node agrees on the split without talking to
+the others. Each shard records its completion in a marker file that the shard_status command reports on.
+"""
+import json
+import os
+import zlib
+from datetime import datetime
+
+SHARD_MARKER_DIRECTORY = 'data/shards'
+
+
+def parse_shard(value):
+    """ Parse 'i/n' into (i, n), where 0 <= i < n """
+
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/n, not '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and {count - 1}")
+    return index, count
+
+
+def shard_of(user_id, count):
+    return zlib.crc32(str(user_id).encode()) % count
+
+
+def users_in_shard(user_ids, index, count):
+    return [user_id for user_id in user_ids if shard_of(user_id, count) == index]
+
+
+def marker_path(index, count, directory=SHARD_MARKER_DIRECTORY):
+    return os.path.join(directory, f'precompute-{index}-of-{count}.json')
+
+
+def write_marker(index, count, report, directory=SHARD_MARKER_DIRECTORY):
+    os.makedirs(directory, exist_ok=True)
+    report = dict(report, shard=index, shards=count, finished_at=datetime.now().isoformat(timespec='seconds'))
+    temporary_path = marker_path(index, count, directory) + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(report, file, indent=2)
+    os.replace(temporary_path, marker_path(index, count, directory))
+
+
+def clear_marker(index, count, directory=SHARD_MARKER_DIRECTORY):
+    if os.path.exists(marker_path(index, count, directory)):
+        os.remove(marker_path(index, count, directory))
+
+
+def read_markers(count, directory=SHARD_MARKER_DIRECTORY):
+    """ Return the marker of every shard, or None for the shards that have not finished """
+
+    markers = []
+    for index in range(count):
+        path = marker_path(index, count, directory)
+        if os.path.exists(path):
+            with open(path) as file:
+                markers.append(json.load(file))
+        else:
+            markers.append(None)
+    return markers
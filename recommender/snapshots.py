@@ -0,0 +1,146 @@
+"""Snapshots of the app's Rating table, kept current by replaying the rating change log.
+
+Ratings imported from the BX data set are left out, since the pipeline already reads them from the BX pickles.
+A snapshot holds every other rating keyed by its primary key, the number of ratings per ISBN and the id of the last
+change it includes. Bringing it up to date only reads the changes made since, so its cost follows what changed
+rather than the size of the table. Commands that change ratings in bulk without the log append a reload change
+instead, and a snapshot that meets one is rebuilt from the table.
+"""
+import os
+import pickle
+import pandas as pd
+
+RATING_SNAPSHOT_PATH = 'data/rating_snapshot.p'
+CHUNK_SIZE = 10000
+RATING_COLUMNS = ['rating_pk', 'user_id', 'isbn', 'rating']
+
+_current_snapshot = {'snapshot': None}
+
+
+def read_chunked(queryset, columns):
+    """ Read a values_list queryset into a DataFrame a chunk at a time """
+
+    frames = []
+    rows = []
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        rows.append(row)
+        if len(rows) == CHUNK_SIZE:
+            frames.append(pd.DataFrame(rows, columns=columns))
+            rows = []
+    frames.append(pd.DataFrame(rows, columns=columns))
+    return pd.concat(frames, ignore_index=True)
+
+
+def last_change():
+    from bookclub.models import RatingChange
+
+    return RatingChange.objects.order_by('-id').values_list('id', 'created_at').first() or (0, None)
+
+
+def full_snapshot():
+    """ Build a snapshot from the whole Rating table """
+
+    from bookclub.models import Rating
+
+    last_id, last_at = last_change()
+    rows = Rating.objects.filter(imported=False).order_by().values_list('id', 'user_id', 'isbn', 'rating')
+    ratings = read_chunked(rows, RATING_COLUMNS).set_index('rating_pk')
+    return {'last_change_id': last_id, 'last_change_at': last_at, 'ratings': ratings,
+            'isbn_counts': ratings['isbn'].value_counts()}
+
+
+def replay(snapshot, changes):
+    """ Apply a DataFrame of changes, in log order, to a snapshot. Only the last change of each rating matters """
+
+    if changes.empty:
+        return snapshot
+
+    latest = changes.drop_duplicates('rating_pk', keep='last').set_index('rating_pk')
+    ratings = snapshot['ratings']
+    replaced = ratings[ratings.index.isin(latest.index)]
+    upserts = latest[latest['action'] != 'delete'][['user_id', 'isbn', 'rating']]
+
+    isbn_counts = snapshot['isbn_counts'].sub(replaced['isbn'].value_counts(), fill_value=0)
+    isbn_counts = isbn_counts.add(upserts['isbn'].value_counts(), fill_value=0).astype('int64')
+    ratings = pd.concat([ratings[~ratings.index.isin(latest.index)], upserts])
+
+    return {'last_change_id': int(changes['id'].iloc[-1]),
+            'last_change_at': changes['created_at'].iloc[-1].to_pydatetime(),
+            'ratings': ratings, 'isbn_counts': isbn_counts[isbn_counts > 0]}
+
+
+def changes_since(change_id):
+    from bookclub.models import RatingChange
+
+    rows = RatingChange.objects.filter(id__gt=change_id).order_by('id') \
+        .values_list('id', 'rating_pk', 'user_pk', 'isbn', 'rating', 'action', 'created_at')
+    return read_chunked(rows, ['id', 'rating_pk', 'user_id', 'isbn', 'rating', 'action', 'created_at'])
+
+
+def log_bulk_change():
+    """ Record that ratings were changed without the log, so every snapshot taken before is rebuilt """
+
+    from bookclub.models import RatingChange
+
+    RatingChange.objects.create(rating_pk=0, action=RatingChange.RELOAD)
+
+
+def is_stale(snapshot):
+    """ A snapshot is unusable if the change it ends on is not in this database's log """
+
+    from bookclub.models import RatingChange
+
+    if not snapshot['last_change_id']:
+        return False
+    return not RatingChange.objects.filter(id=snapshot['last_change_id'],
+                                           created_at=snapshot['last_change_at']).exists()
+
+
+def refresh_snapshot(snapshot):
+    """ Bring a snapshot up to date, rebuilding it from the table if it is missing or stale, or if ratings were
+    changed in bulk since it was taken """
+
+    from bookclub.models import RatingChange
+
+    if snapshot is None or is_stale(snapshot):
+        return full_snapshot()
+    changes = changes_since(snapshot['last_change_id'])
+    if (changes['action'] == RatingChange.RELOAD).any():
+        return full_snapshot()
+    return replay(snapshot, changes)
+
+
+def load_snapshot(path=RATING_SNAPSHOT_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def save_snapshot(snapshot, path=RATING_SNAPSHOT_PATH):
+    with open(path, 'wb') as file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def update_snapshot_file(path=RATING_SNAPSHOT_PATH):
+    snapshot = refresh_snapshot(load_snapshot(path))
+    save_snapshot(snapshot, path)
+    return snapshot
+
+
+def current_snapshot():
+    """ The up to date snapshot for this process, starting from the snapshot file when there is one """
+
+    snapshot = _current_snapshot['snapshot']
+    if snapshot is None:
+        snapshot = load_snapshot()
+    snapshot = refresh_snapshot(snapshot)
+    _current_snapshot['snapshot'] = snapshot
+    return snapshot
+
+
+def current_ratings():
+    """ The app's ratings as a user_id, isbn, rating DataFrame """
+
+    ratings = current_snapshot()['ratings'].dropna(subset=['user_id'])
+    return ratings.astype({'user_id': 'int64', 'rating': 'int64'}).reset_index(drop=True)
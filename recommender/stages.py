@@ -0,0 +1,257 @@
+"""The stages of the offline recommender pipeline, run by the recommender management command."""
+import json
+import pickle
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from django.db import transaction
+from django.db.models import Count, Max
+from surprise import SVD
+from recommender.content_based import CONTENT_MODEL_PATH, build_content_model_from_db, save_content_model
+from recommender.pipeline import Pipeline, Stage, file_hash
+from recommender.scoring import export_model, score_users, top_n_items
+from recommender.snapshots import RATING_SNAPSHOT_PATH, last_change, update_snapshot_file
+from recommender.trainset import trainset_from_matrix
+from recommender.tuning import TUNING_RESULTS_PATH, load_best_params
+
+BOOKS_CSV_PATH = 'data/BX_Books.csv'
+USERS_CSV_PATH = 'data/BX-Users.csv'
+RATINGS_CSV_PATH = 'data/BX-Book-Ratings.csv'
+RAW_BOOKS_PATH = 'data/raw_books.p'
+RAW_USERS_PATH = 'data/raw_users.p'
+RAW_RATINGS_PATH = 'data/raw_ratings.p'
+USER_ITEM_RATING_PATH = 'data/user_item_rating.p'
+RATING_MATRIX_PATH = 'data/rating_matrix.p'
+SVD_MODEL_PATH = 'data/svd_model.p'
+PRECOMPUTED_PATH = 'data/precomputed.json'
+MOST_POPULAR_PATH = 'data/most_popular_item.p'
+
+RECOMMENDATION_THRESHOLD = 20
+TOP_N = 10
+PRECOMPUTE_BATCH_SIZE = 500
+
+
+def load_pickle(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def dump_pickle(obj, path):
+    with open(path, 'wb') as file:
+        pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def read_bx_csv(path):
+    dataframe = pd.read_csv(path, sep=';', on_bad_lines='skip', encoding="latin-1")
+    dataframe.columns = dataframe.columns.str.strip().str.lower().str.replace('-', '_')
+    return dataframe
+
+
+def load_datasets():
+    """ Load the BX books, users and ratings with normalised column names """
+
+    books = read_bx_csv(BOOKS_CSV_PATH)
+    books.drop(columns=['image_url_s', 'image_url_m', 'image_url_l'], inplace=True)
+    users = read_bx_csv(USERS_CSV_PATH)
+    ratings = read_bx_csv(RATINGS_CSV_PATH)
+    return books, users, ratings
+
+
+def clean_datasets(books, users, ratings):
+    """ Remove books with a publication year: zero, non-existent, in the future or too old for most readers """
+
+    books = books[books.year_of_publication != 0]
+    books = books[books.year_of_publication != np.nan]
+    book_dates_too_old = books[books.year_of_publication < 1800]
+    book_dates_future = books[books.year_of_publication > 2022]
+    books = books.loc[~(books.isbn.isin(book_dates_too_old.isbn))]
+    books = books.loc[~(books.isbn.isin(book_dates_future.isbn))]
+
+    """ Remove all implicit ratings """
+
+    ratings = ratings[ratings.book_rating != 0]
+
+    """ Get only books and users whom have more than 5 ratings respectively """
+
+    books_list = ratings.isbn.value_counts().rename_axis('isbn').reset_index(name='count')
+    books_list = books_list[books_list['count'] > 5]['isbn'].to_list()
+
+    users_list = ratings.user_id.value_counts().rename_axis('user_id').reset_index(name='count')
+    users_list = users_list[users_list['count'] > 5]['user_id'].to_list()
+
+    ratings = ratings[ratings['isbn'].isin(books_list)]
+    ratings = ratings[ratings['user_id'].isin(users_list)]
+
+    books_with_ratings = ratings.join(books.set_index('isbn'), on='isbn')
+
+    books_with_ratings.dropna(subset=['book_title'], inplace=True)
+
+    books_users_ratings = books_with_ratings.join(users.set_index('user_id'), on='user_id')
+
+    user_rating_df = books_users_ratings[['user_id', 'isbn', 'book_rating']]
+
+    return user_rating_df.rename(columns={'book_rating': 'rating'})
+
+
+def most_popular_books(user_rating_df):
+    most_popular_df = pd.DataFrame(user_rating_df, columns=['isbn', 'rating'])
+    most_popular_df = most_popular_df.groupby(['isbn']).agg('count')['rating'].reset_index()
+    most_popular_df = most_popular_df.sort_values('rating', ascending=False)
+    return most_popular_df.head(25)
+
+
+def get_app_ratings():
+    """ Ratings made in the app. App user ids are negated so they never collide with BX user ids """
+
+    ratings = load_pickle(RATING_SNAPSHOT_PATH)['ratings']
+    app_ratings = ratings[ratings['user_id'].notna() & (ratings['rating'] > 0)][['user_id', 'isbn', 'rating']]
+    app_ratings = app_ratings.astype({'user_id': np.int64, 'rating': np.int64}).reset_index(drop=True)
+    app_ratings['user_id'] = -app_ratings['user_id']
+    return app_ratings
+
+
+def rating_log_fingerprint():
+    change_id, created_at = last_change()
+    return f"{change_id}:{created_at}"
+
+
+def book_table_fingerprint():
+    from bookclub.models import Book
+
+    summary = Book.objects.aggregate(count=Count('id'), last=Max('id'))
+    return f"{summary['count']}:{summary['last']}"
+
+
+def ingest():
+    books, users, ratings = load_datasets()
+    dump_pickle(books, RAW_BOOKS_PATH)
+    dump_pickle(users, RAW_USERS_PATH)
+    dump_pickle(ratings, RAW_RATINGS_PATH)
+
+
+def clean():
+    user_rating_df = clean_datasets(load_pickle(RAW_BOOKS_PATH), load_pickle(RAW_USERS_PATH),
+                                    load_pickle(RAW_RATINGS_PATH))
+    dump_pickle(user_rating_df, USER_ITEM_RATING_PATH)
+
+
+def snapshot():
+    update_snapshot_file()
+
+
+def build_matrix():
+    """ Merge the BX and app ratings into a sparse user x item matrix """
+
+    ratings = pd.concat([load_pickle(USER_ITEM_RATING_PATH)[['user_id', 'isbn', 'rating']], get_app_ratings()],
+                        ignore_index=True)
+    ratings = ratings.drop_duplicates(['user_id', 'isbn'], keep='last')
+    user_codes, user_ids = pd.factorize(ratings['user_id'])
+    item_codes, isbns = pd.factorize(ratings['isbn'])
+    matrix = sp.csr_matrix((ratings['rating'].to_numpy(dtype=np.float32), (user_codes, item_codes)),
+                           shape=(len(user_ids), len(isbns)))
+    dump_pickle({'user_ids': np.asarray(user_ids), 'isbns': np.asarray(isbns, dtype=object), 'matrix': matrix},
+                RATING_MATRIX_PATH)
+
+
+def rating_matrix_to_dataframe(rating_matrix):
+    coo = rating_matrix['matrix'].tocoo()
+    return pd.DataFrame({'user_id': rating_matrix['user_ids'][coo.row],
+                         'isbn': rating_matrix['isbns'][coo.col],
+                         'rating': coo.data})
+
+
+def train():
+    """ Fit the SVD model, with the parameters found by the tune_svd command when it has been run """
+
+    trainset = trainset_from_matrix(load_pickle(RATING_MATRIX_PATH))
+    algo = SVD(**load_best_params())
+    algo.fit(trainset)
+    dump_pickle(export_model(algo, trainset), SVD_MODEL_PATH)
+
+
+def index():
+    save_content_model(build_content_model_from_db())
+
+
+def get_eligible_user_ids():
+    from bookclub.models import Rating
+
+    counts = Rating.objects.filter(user__isnull=False, imported=False).values('user_id').annotate(count=Count('id'))
+    return [row['user_id'] for row in counts.filter(count__gte=RECOMMENDATION_THRESHOLD).order_by('user_id')]
+
+
+def precompute_recommendations(model, user_ids):
+    """ Replace the stored recommendations of the given app users with their top-N catalogue books """
+
+    from bookclub.models import Book, Rating, RecommendedBook
+
+    catalogue = set(isbn.upper() for isbn in Book.objects.values_list('isbn', flat=True).iterator(chunk_size=10000))
+    in_catalogue = np.array([str(isbn).upper() in catalogue for isbn in model['isbns']], dtype=bool)
+    user_index = pd.Index(model['user_ids'])
+    item_index = pd.Index(model['isbns'])
+    written = 0
+
+    for start in range(0, len(user_ids), PRECOMPUTE_BATCH_SIZE):
+        batch = np.asarray(user_ids[start:start + PRECOMPUTE_BATCH_SIZE], dtype=np.int64)
+        rows = user_index.get_indexer(-batch)
+        known = rows >= 0
+        batch, rows = batch[known], rows[known]
+        if not len(batch):
+            continue
+
+        scores = score_users(model, rows)
+        scores[:, ~in_catalogue] = -np.inf
+        batch_position = {user_id: position for position, user_id in enumerate(batch.tolist())}
+        rated = list(Rating.objects.filter(user_id__in=batch.tolist()).values_list('user_id', 'isbn'))
+        if rated:
+            rated_rows = np.array([batch_position[user_id] for user_id, isbn in rated], dtype=np.int64)
+            rated_items = item_index.get_indexer([isbn for user_id, isbn in rated])
+            scores[rated_rows[rated_items >= 0], rated_items[rated_items >= 0]] = -np.inf
+
+        recommendations = []
+        for user_id, items in zip(batch.tolist(), top_n_items(scores, TOP_N)):
+            row = batch_position[user_id]
+            recommendations.extend(RecommendedBook(user_id=user_id, isbn=model['isbns'][item])
+                                   for item in items if np.isfinite(scores[row, item]))
+        with transaction.atomic():
+            RecommendedBook.objects.filter(user_id__in=batch.tolist()).delete()
+            RecommendedBook.objects.bulk_create(recommendations, batch_size=1000)
+        written += len(recommendations)
+
+    return written
+
+
+def precompute():
+    user_ids = get_eligible_user_ids()
+    written = precompute_recommendations(load_pickle(SVD_MODEL_PATH), user_ids)
+    with open(PRECOMPUTED_PATH, 'w') as file:
+        json.dump({'users': len(user_ids), 'recommendations': written}, file)
+
+
+def popularity():
+    """ Count BX and app ratings per book. The app's counts are kept up to date by the rating snapshot """
+
+    counts = load_pickle(USER_ITEM_RATING_PATH)['isbn'].value_counts()
+    counts = counts.add(load_pickle(RATING_SNAPSHOT_PATH)['isbn_counts'], fill_value=0).astype(np.int64)
+    most_popular_df = counts.rename_axis('isbn').reset_index(name='rating')
+    most_popular_df = most_popular_df.sort_values('rating', ascending=False, kind='stable')
+    dump_pickle(most_popular_df.head(25), MOST_POPULAR_PATH)
+
+
+def build_pipeline(log=print):
+    return Pipeline([
+        Stage('ingest', ingest, inputs=[BOOKS_CSV_PATH, USERS_CSV_PATH, RATINGS_CSV_PATH],
+              outputs=[RAW_BOOKS_PATH, RAW_USERS_PATH, RAW_RATINGS_PATH]),
+        Stage('clean', clean, inputs=[RAW_BOOKS_PATH, RAW_USERS_PATH, RAW_RATINGS_PATH],
+              outputs=[USER_ITEM_RATING_PATH]),
+        Stage('snapshot', snapshot, outputs=[RATING_SNAPSHOT_PATH], fingerprint=rating_log_fingerprint),
+        Stage('build_matrix', build_matrix, inputs=[USER_ITEM_RATING_PATH, RATING_SNAPSHOT_PATH],
+              outputs=[RATING_MATRIX_PATH]),
+        Stage('train', train, inputs=[RATING_MATRIX_PATH], outputs=[SVD_MODEL_PATH],
+              fingerprint=lambda: file_hash(TUNING_RESULTS_PATH)),
+        Stage('index', index, outputs=[CONTENT_MODEL_PATH], fingerprint=book_table_fingerprint),
+        Stage('precompute', precompute, inputs=[SVD_MODEL_PATH], outputs=[PRECOMPUTED_PATH],
+              fingerprint=lambda: f'{rating_log_fingerprint()}/{book_table_fingerprint()}'),
+        Stage('popularity', popularity, inputs=[USER_ITEM_RATING_PATH, RATING_SNAPSHOT_PATH],
+              outputs=[MOST_POPULAR_PATH]),
+    ], log=log)
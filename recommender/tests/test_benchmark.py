@@ -0,0 +1,37 @@
+"""Unit tests of the recommender benchmark."""
+from django.test import SimpleTestCase
+from surprise import BaselineOnly, Dataset, Reader
+from recommender.benchmark import generate_ratings, benchmark_engine, compare_results
+
+
+def results(fit_seconds, users_per_second, latency_p99_ms=1.0):
+    return {'10k': {'trainset_seconds': 1.0, 'engines': {'svd': {
+        'fit_seconds': fit_seconds, 'users_per_second': users_per_second, 'latency_p99_ms': latency_p99_ms}}}}
+
+
+class BenchmarkTestCase(SimpleTestCase):
+    """Test case for benchmarking the recommender engines"""
+
+    def test_generated_ratings_are_unique_and_in_range(self):
+        ratings = generate_ratings(5000)
+        self.assertFalse(ratings.duplicated(['user_id', 'isbn']).any())
+        self.assertTrue(ratings['rating'].between(1, 10).all())
+        self.assertGreater(len(ratings), 4000)
+        self.assertTrue(ratings.equals(generate_ratings(5000)))
+
+    def test_engine_measurements(self):
+        trainset = Dataset.load_from_df(generate_ratings(2000), Reader(rating_scale=(1, 10))).build_full_trainset()
+        measurements = benchmark_engine(lambda: BaselineOnly(verbose=False), trainset)
+        self.assertEqual(set(measurements), {'fit_seconds', 'fit_peak_bytes', 'latency_p50_ms', 'latency_p99_ms',
+                                             'users_per_second'})
+        self.assertLessEqual(measurements['latency_p50_ms'], measurements['latency_p99_ms'])
+
+    def test_slower_fits_and_lower_throughput_are_regressions(self):
+        regressions = compare_results(results(2.0, 500), results(1.0, 1000))
+        self.assertEqual({regression['metric'] for regression in regressions}, {'fit_seconds', 'users_per_second'})
+
+    def test_changes_within_the_tolerance_or_noise_floor_are_not_regressions(self):
+        self.assertEqual(compare_results(results(1.1, 900, latency_p99_ms=1.4), results(1.0, 1000)), [])
+
+    def test_missing_scales_are_not_compared(self):
+        self.assertEqual(compare_results(results(2.0, 500), {}), [])
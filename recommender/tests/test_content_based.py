@@ -0,0 +1,52 @@
+"""Unit tests of the content-based cold-start recommender."""
+from django.test import TestCase
+from bookclub.models import User, Book, Rating
+from recommender.content_based import build_content_model, build_content_model_from_db, get_seed_weights, recommend
+
+
+class ContentBasedRecommenderTestCase(TestCase):
+    """Test case for the content-based recommender"""
+
+    fixtures = ['bookclub/tests/fixtures/default_users.json',
+                'bookclub/tests/fixtures/default_books.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@bookclub.com')
+        self.books = [
+            ('0000000001', 'Dragons of Autumn', 'Margaret Weis', 'Wizards'),
+            ('0000000002', 'Dragons of Winter', 'Margaret Weis', 'Wizards'),
+            ('0000000003', 'Cooking for One', 'Anne Smith', 'Kitchen Press'),
+            ('0000000004', 'The Dragon Cookbook', 'Anne Smith', 'Kitchen Press'),
+            ('0000000005', 'Gardening Basics', 'Bob Green', 'Garden House'),
+        ]
+        self.model = build_content_model(self.books)
+
+    def test_model_has_one_row_per_book(self):
+        self.assertEqual(self.model['matrix'].shape[0], len(self.books))
+        self.assertEqual(list(self.model['authors']['margaret weis']), [0, 1])
+
+    def test_recommend_prefers_similar_books(self):
+        isbns = recommend(self.model, {'0000000001': 1.0}, 3)
+        self.assertEqual(isbns[0], '0000000002')
+        self.assertNotIn('0000000005', isbns)
+
+    def test_recommend_excludes_seed_books(self):
+        isbns = recommend(self.model, {'0000000001': 1.0, '0000000003': 1.0}, 5)
+        self.assertNotIn('0000000001', isbns)
+        self.assertNotIn('0000000003', isbns)
+
+    def test_recommend_without_known_seeds_is_empty(self):
+        self.assertEqual(recommend(self.model, {}, 5), [])
+        self.assertEqual(recommend(self.model, {'9999999999': 1.0}, 5), [])
+
+    def test_seed_weights_combine_ratings_favourites_and_reading_list(self):
+        book = Book.objects.get(pk=1)
+        self.user.favourite_books.add(book)
+        self.user.currently_reading_books.add(book)
+        Rating.objects.create(user=self.user, book=book, isbn=book.isbn, rating=1)
+        weights = get_seed_weights(self.user)
+        self.assertAlmostEqual(weights[book.isbn], 0.5)
+
+    def test_build_content_model_from_db(self):
+        model = build_content_model_from_db()
+        self.assertEqual(len(model['isbns']), Book.objects.count())
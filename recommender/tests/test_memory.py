@@ -0,0 +1,46 @@
+"""Unit tests of the memory profiler."""
+from django.test import SimpleTestCase
+from recommender.memory import profile_stage, profile_stages, compare_reports, rss_bytes
+from recommender.pipeline import Stage
+
+
+class Retained:
+    pass
+
+
+def allocate():
+    retained.append([Retained() for _ in range(10000)])
+    return bytearray(8 * 2 ** 20)
+
+
+retained = []
+
+
+class MemoryProfileTestCase(SimpleTestCase):
+    """Test case for profiling the memory of pipeline stages"""
+
+    def tearDown(self):
+        retained.clear()
+
+    def test_stage_profile(self):
+        result = profile_stage('allocate', allocate, interval=0.001)
+        self.assertGreaterEqual(result['traced_peak_bytes'], 8 * 2 ** 20)
+        self.assertEqual(result['object_changes']['Retained'], 10000)
+        self.assertTrue(any(allocation['site'].endswith('test_memory.py:12')
+                            for allocation in result['top_allocations']))
+        if rss_bytes() is not None:
+            self.assertGreaterEqual(result['rss_peak_bytes'], result['rss_start_bytes'])
+
+    def test_stages_with_missing_inputs_are_left_out(self):
+        stages = [Stage('missing', allocate, inputs=['does/not/exist.p']), Stage('allocate', allocate)]
+        report = profile_stages(stages, log=lambda message: None)
+        self.assertEqual([result['stage'] for result in report], ['allocate'])
+
+    def test_compare_reports_side_by_side(self):
+        before = {'stages': [{'stage': 'train', 'traced_peak_bytes': 2 ** 20, 'rss_peak_bytes': None}]}
+        after = {'stages': [{'stage': 'train', 'traced_peak_bytes': 2 ** 21, 'rss_peak_bytes': 2 ** 20},
+                            {'stage': 'index', 'traced_peak_bytes': 0, 'rss_peak_bytes': 0}]}
+        self.assertEqual(compare_reports(before, after), [
+            ['train', '1.0 MiB', '2.0 MiB', '+100%', 'n/a', '1.0 MiB', 'n/a'],
+            ['index', 'n/a', '0.0 MiB', 'n/a', 'n/a', '0.0 MiB', 'n/a'],
+        ])
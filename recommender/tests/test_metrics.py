@@ -0,0 +1,42 @@
+"""Unit tests of the ranking metrics."""
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from recommender.metrics import ratings_matrix, ranking_metrics
+
+
+class RankingMetricsTestCase(SimpleTestCase):
+    """Test case for the blocked top-k ranking metrics"""
+
+    def setUp(self):
+        self.model = {
+            'user_ids': np.array([1, 2, 3]),
+            'isbns': np.array(['a', 'b', 'c', 'd'], dtype=object),
+            'global_mean': 5.0,
+            'bu': np.zeros(3),
+            'bi': np.array([4.0, 3.0, 2.0, 1.0]),
+            'pu': None,
+            'qi': None,
+        }
+        self.train = pd.DataFrame({'user_id': [1, 2], 'isbn': ['a', 'd'], 'rating': [9, 5]})
+        self.test = pd.DataFrame({'user_id': [1, 1, 2, 3, 3], 'isbn': ['b', 'd', 'c', 'a', 'z'],
+                                  'rating': [9, 8, 10, 3, 9]})
+
+    def test_metrics_match_a_per_user_computation(self):
+        metrics = ranking_metrics(self.model, ratings_matrix(self.model, self.train),
+                                  ratings_matrix(self.model, self.test), k=2, block_size=1)
+        # User 1 is recommended b, c and has b, d relevant. User 2 is recommended a, b and has c relevant.
+        # User 3 has no relevant rating of a known book, so is not evaluated.
+        self.assertEqual(metrics['users'], 2)
+        self.assertAlmostEqual(metrics['precision@2'], (1 / 2 + 0) / 2)
+        self.assertAlmostEqual(metrics['recall@2'], (1 / 2 + 0) / 2)
+        self.assertAlmostEqual(metrics['ndcg@2'], (1 / (1 + 1 / np.log2(3)) + 0) / 2)
+        self.assertAlmostEqual(metrics['coverage'], 3 / 4)
+
+    def test_block_size_does_not_change_the_metrics(self):
+        train, test = ratings_matrix(self.model, self.train), ratings_matrix(self.model, self.test)
+        self.assertEqual(ranking_metrics(self.model, train, test, k=3, block_size=1),
+                         ranking_metrics(self.model, train, test, k=3, block_size=100))
+
+    def test_unknown_users_and_books_are_dropped(self):
+        self.assertEqual(ratings_matrix(self.model, self.test).nnz, 4)
@@ -0,0 +1,88 @@
+"""Unit tests of the recommender pipeline runner."""
+import os
+import tempfile
+from django.test import SimpleTestCase
+from recommender.pipeline import Pipeline, PipelineError, Stage
+
+
+class PipelineTestCase(SimpleTestCase):
+    """Test case for the stage-level caching of the pipeline runner"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = self._path('source.txt')
+        self.middle = self._path('middle.txt')
+        self.result = self._path('result.txt')
+        self._write(self.source, 'one')
+        self.calls = []
+        self.pipeline = Pipeline([
+            Stage('first', self._copy(self.source, self.middle, 'first'), inputs=[self.source],
+                  outputs=[self.middle]),
+            Stage('second', self._copy(self.middle, self.result, 'second'), inputs=[self.middle],
+                  outputs=[self.result]),
+        ], state_path=self._path('state.json'), log=lambda message: None)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_first_run_runs_every_stage(self):
+        self.pipeline.run()
+        self.assertEqual(self.calls, ['first', 'second'])
+        self.assertEqual(open(self.result).read(), 'one')
+
+    def test_unchanged_stages_are_skipped(self):
+        self.pipeline.run()
+        report = self.pipeline.run()
+        self.assertEqual(self.calls, ['first', 'second'])
+        self.assertEqual([stage['status'] for stage in report], ['skipped', 'skipped'])
+
+    def test_changed_input_reruns_downstream_stages(self):
+        self.pipeline.run()
+        self._write(self.source, 'two')
+        self.pipeline.run()
+        self.assertEqual(self.calls, ['first', 'second', 'first', 'second'])
+        self.assertEqual(open(self.result).read(), 'two')
+
+    def test_deleted_output_reruns_stage(self):
+        self.pipeline.run()
+        os.remove(self.result)
+        self.pipeline.run()
+        self.assertEqual(self.calls, ['first', 'second', 'second'])
+
+    def test_only_reruns_selected_stages(self):
+        self.pipeline.run()
+        self.pipeline.run(only=['first'])
+        self.assertEqual(self.calls, ['first', 'second', 'first'])
+
+    def test_from_reruns_stage_and_later_stages(self):
+        self.pipeline.run()
+        self.pipeline.run(start='second')
+        self.assertEqual(self.calls, ['first', 'second', 'second'])
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaises(PipelineError):
+            self.pipeline.run(only=['third'])
+
+    def test_missing_inputs_skip_the_stage(self):
+        os.remove(self.source)
+        report = self.pipeline.run()
+        self.assertEqual(report[0]['status'], 'unavailable')
+        self.assertEqual(self.calls, [])
+
+    def test_forced_stage_with_missing_inputs_fails(self):
+        os.remove(self.source)
+        with self.assertRaises(PipelineError):
+            self.pipeline.run(only=['first'])
+
+    def _copy(self, source, destination, name):
+        def copy():
+            self.calls.append(name)
+            self._write(destination, open(source).read())
+        return copy
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def _write(self, path, text):
+        with open(path, 'w') as file:
+            file.write(text)
@@ -0,0 +1,47 @@
+"""Unit tests of the recommendation precompute stage."""
+import numpy as np
+from django.test import TestCase
+from bookclub.models import User, Book, Rating, RecommendedBook
+from recommender.stages import get_eligible_user_ids, precompute_recommendations, RECOMMENDATION_THRESHOLD
+
+
+class PrecomputeTestCase(TestCase):
+    """Test case for writing precomputed recommendations"""
+
+    fixtures = ['bookclub/tests/fixtures/default_users.json',
+                'bookclub/tests/fixtures/default_books.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@bookclub.com')
+        isbns = list(Book.objects.order_by('id').values_list('isbn', flat=True))
+        self.model = {
+            'user_ids': np.array([-self.user.id, 276822]),
+            'isbns': np.array(isbns + ['0000000000'], dtype=object),
+            'global_mean': 5.0,
+            'bu': np.zeros(2),
+            'bi': np.array([3.0, 1.0, 2.0, 9.0]),
+            'pu': None,
+            'qi': None,
+        }
+
+    def test_eligible_users_have_enough_ratings(self):
+        self._create_ratings(RECOMMENDATION_THRESHOLD - 1)
+        self.assertEqual(get_eligible_user_ids(), [])
+        self._create_ratings(1)
+        self.assertEqual(get_eligible_user_ids(), [self.user.id])
+
+    def test_precompute_skips_rated_and_unknown_books(self):
+        Rating.objects.create(user=self.user, isbn=self.model['isbns'][0], rating=8)
+        written = precompute_recommendations(self.model, [self.user.id])
+        isbns = list(RecommendedBook.objects.filter(user=self.user).values_list('isbn', flat=True))
+        self.assertEqual(written, 2)
+        self.assertEqual(sorted(isbns), sorted(self.model['isbns'][1:3]))
+
+    def test_precompute_replaces_previous_recommendations(self):
+        RecommendedBook.objects.create(user=self.user, isbn='0000000000')
+        precompute_recommendations(self.model, [self.user.id])
+        self.assertFalse(RecommendedBook.objects.filter(user=self.user, isbn='0000000000').exists())
+
+    def _create_ratings(self, count):
+        for i in range(count):
+            Rating.objects.create(user=self.user, isbn=f'99999{i:05d}', rating=7)
@@ -0,0 +1,33 @@
+"""Unit tests of the vectorised scoring helpers."""
+import numpy as np
+from django.test import SimpleTestCase
+from recommender.scoring import score_users, top_n_items
+
+
+class ScoringTestCase(SimpleTestCase):
+    """Test case for scoring users against all items"""
+
+    def setUp(self):
+        self.model = {
+            'global_mean': 5.0,
+            'bu': np.array([1.0, -1.0]),
+            'bi': np.array([0.0, 2.0, -2.0]),
+            'pu': np.array([[1.0, 0.0], [0.0, 1.0]]),
+            'qi': np.array([[1.0, 0.0], [0.0, 0.0], [0.0, 3.0]]),
+        }
+
+    def test_score_users_matches_the_svd_prediction_rule(self):
+        scores = score_users(self.model, [0, 1])
+        expected = np.array([[7.0, 8.0, 4.0], [4.0, 6.0, 5.0]])
+        np.testing.assert_allclose(scores, expected)
+
+    def test_score_users_without_factors_uses_baselines(self):
+        self.model['pu'] = None
+        np.testing.assert_allclose(score_users(self.model, [1]), [[4.0, 6.0, 2.0]])
+
+    def test_top_n_items_are_sorted_best_first(self):
+        scores = np.array([[1.0, 3.0, 2.0], [3.0, -np.inf, 1.0]])
+        np.testing.assert_array_equal(top_n_items(scores, 2), [[1, 2], [0, 2]])
+
+    def test_top_n_items_is_capped_by_the_number_of_items(self):
+        self.assertEqual(top_n_items(np.zeros((1, 2)), 5).shape, (1, 2))
@@ -0,0 +1,35 @@
+"""Unit tests of the precompute sharding helpers."""
+import tempfile
+from django.test import SimpleTestCase
+from recommender.sharding import parse_shard, shard_of, users_in_shard, write_marker, clear_marker, read_markers
+
+
+class ShardingTestCase(SimpleTestCase):
+    """Test case for splitting users across shards"""
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+
+    def test_parse_shard_rejects_invalid_values(self):
+        for value in ['4/4', '-1/4', '0/0', 'one/two', '3']:
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual([shard_of(user_id, 5) for user_id in range(20)],
+                         [shard_of(user_id, 5) for user_id in range(20)])
+
+    def test_shards_partition_the_users(self):
+        user_ids = list(range(1, 1000))
+        shards = [users_in_shard(user_ids, index, 4) for index in range(4)]
+        self.assertEqual(sorted(sum(shards, [])), user_ids)
+        self.assertTrue(all(shards))
+
+    def test_markers_report_finished_shards(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_marker(1, 3, {'users': 5}, directory)
+            markers = read_markers(3, directory)
+            self.assertIsNone(markers[0])
+            self.assertEqual(markers[1]['users'], 5)
+            clear_marker(1, 3, directory)
+            self.assertEqual(read_markers(3, directory), [None, None, None])
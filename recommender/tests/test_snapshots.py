@@ -0,0 +1,67 @@
+"""Unit tests of the rating snapshots."""
+from django.test import TestCase
+from bookclub.models import User, Rating
+from recommender.snapshots import full_snapshot, refresh_snapshot, current_ratings, log_bulk_change
+
+
+class RatingSnapshotTestCase(TestCase):
+    """Test case for building snapshots by replaying the rating change log"""
+
+    fixtures = ['bookclub/tests/fixtures/default_users.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@bookclub.com')
+        self.first = Rating.objects.create(user=self.user, isbn='0000000001', rating=7)
+        self.second = Rating.objects.create(user=self.user, isbn='0000000002', rating=4)
+
+    def test_full_snapshot_reads_every_rating(self):
+        snapshot = full_snapshot()
+        self.assertEqual(len(snapshot['ratings']), 2)
+        self.assertEqual(snapshot['isbn_counts']['0000000001'], 1)
+
+    def test_replay_applies_inserts_updates_and_deletes(self):
+        snapshot = full_snapshot()
+        self.first.rating = 9
+        self.first.save()
+        self.second.delete()
+        Rating.objects.create(user=self.user, isbn='0000000003', rating=5)
+        snapshot = refresh_snapshot(snapshot)
+        ratings = snapshot['ratings'].set_index('isbn')['rating'].to_dict()
+        self.assertEqual(ratings, {'0000000001': 9, '0000000003': 5})
+        self.assertNotIn('0000000002', snapshot['isbn_counts'])
+        self.assertEqual(snapshot['isbn_counts']['0000000003'], 1)
+
+    def test_replay_matches_a_full_rebuild(self):
+        snapshot = full_snapshot()
+        for i in range(5):
+            Rating.objects.create(user=self.user, isbn=f'000000010{i}', rating=i + 1)
+        Rating.objects.filter(isbn='0000000101').get().delete()
+        replayed = refresh_snapshot(snapshot)['ratings'].sort_index()
+        rebuilt = full_snapshot()['ratings'].sort_index()
+        self.assertEqual(replayed[['isbn', 'rating']].values.tolist(), rebuilt[['isbn', 'rating']].values.tolist())
+
+    def test_refresh_without_changes_keeps_the_snapshot(self):
+        snapshot = full_snapshot()
+        self.assertIs(refresh_snapshot(snapshot), snapshot)
+
+    def test_snapshot_from_another_log_is_rebuilt(self):
+        snapshot = dict(full_snapshot(), last_change_id=10 ** 9)
+        self.assertEqual(len(refresh_snapshot(snapshot)['ratings']), 2)
+
+    def test_bulk_change_is_noticed(self):
+        snapshot = full_snapshot()
+        Rating.objects.filter(id=self.first.id).update(rating=1)
+        self.assertIs(refresh_snapshot(snapshot), snapshot)
+        log_bulk_change()
+        refreshed = refresh_snapshot(snapshot)
+        self.assertEqual(refreshed['ratings'].set_index('isbn')['rating'].to_dict(), {'0000000001': 1, '0000000002': 4})
+        self.assertEqual(refresh_snapshot(refreshed)['ratings'].to_dict(), refreshed['ratings'].to_dict())
+
+    def test_imported_ratings_are_left_out(self):
+        Rating.objects.create(user=self.user, isbn='0000000009', rating=3, imported=True)
+        self.assertEqual(len(full_snapshot()['ratings']), 2)
+
+    def test_current_ratings_has_integer_user_ids(self):
+        ratings = current_ratings()
+        self.assertEqual(list(ratings.columns), ['user_id', 'isbn', 'rating'])
+        self.assertEqual(set(ratings['user_id']), {self.user.id})
@@ -0,0 +1,53 @@
+"""Unit tests of the array trainsets."""
+import numpy as np
+import scipy.sparse as sp
+from django.test import SimpleTestCase
+from surprise import SVD, BaselineOnly, KNNBasic, Dataset, Reader
+from recommender.tests.test_tuning import synthetic_ratings
+from recommender.trainset import trainset_from_df, trainset_from_matrix
+
+
+class ArrayTrainsetTestCase(SimpleTestCase):
+    """Test case for building trainsets without Dataset.load_from_df"""
+
+    def setUp(self):
+        self.ratings = synthetic_ratings().sample(frac=1, random_state=1)
+        self.expected = Dataset.load_from_df(self.ratings, Reader(rating_scale=(1, 10))).build_full_trainset()
+        self.trainset = trainset_from_df(self.ratings)
+
+    def test_trainset_matches_load_from_df(self):
+        self.assertEqual((self.trainset.n_users, self.trainset.n_items, self.trainset.n_ratings),
+                         (self.expected.n_users, self.expected.n_items, self.expected.n_ratings))
+        self.assertEqual(dict(self.trainset.ur), dict(self.expected.ur))
+        self.assertEqual(dict(self.trainset.ir), dict(self.expected.ir))
+        self.assertEqual(list(self.trainset.all_ratings()), list(self.expected.all_ratings()))
+        self.assertEqual(self.trainset.global_mean, self.expected.global_mean)
+
+    def test_id_maps_match_load_from_df(self):
+        self.assertEqual(list(self.trainset.raw_user_ids),
+                         [self.expected.to_raw_uid(inner) for inner in range(self.expected.n_users)])
+        self.assertEqual(self.trainset.to_inner_iid('isbn3'), self.expected.to_inner_iid('isbn3'))
+        self.assertEqual(self.trainset.to_raw_iid(2), self.expected.to_raw_iid(2))
+        self.assertRaises(ValueError, self.trainset.to_inner_uid, 10 ** 6)
+
+    def test_algorithms_learn_the_same_model(self):
+        for make_algo in [lambda: SVD(n_factors=5, n_epochs=5, random_state=0), lambda: BaselineOnly(verbose=False)]:
+            expected, algo = make_algo().fit(self.expected), make_algo().fit(self.trainset)
+            np.testing.assert_array_equal(algo.bu, expected.bu)
+            np.testing.assert_array_equal(algo.bi, expected.bi)
+            self.assertEqual(algo.predict(3, 'isbn1').est, expected.predict(3, 'isbn1').est)
+            self.assertEqual(algo.predict(10 ** 6, 'isbn1').est, expected.predict(10 ** 6, 'isbn1').est)
+
+    def test_neighbourhood_algorithms_build_the_rating_lists(self):
+        algo = KNNBasic(verbose=False).fit(self.trainset)
+        expected = KNNBasic(verbose=False).fit(self.expected)
+        self.assertEqual(algo.predict(3, 'isbn1').est, expected.predict(3, 'isbn1').est)
+
+    def test_trainset_from_sparse_matrix(self):
+        matrix = sp.csr_matrix(np.array([[0, 5, 0], [0, 0, 0], [7, 0, 9]], dtype=np.float32))
+        trainset = trainset_from_matrix({'user_ids': np.array([10, 20, 30]),
+                                         'isbns': np.array(['a', 'b', 'c'], dtype=object), 'matrix': matrix})
+        self.assertEqual(list(trainset.raw_user_ids), [10, 30])
+        self.assertEqual(list(trainset.raw_item_ids), ['b', 'a', 'c'])
+        self.assertEqual(list(trainset.all_ratings()), [(0, 0, 5.0), (1, 1, 7.0), (1, 2, 9.0)])
+        self.assertEqual(trainset.to_inner_uid(30), 1)
@@ -0,0 +1,57 @@
+"""Unit tests of the successive halving hyperparameter search."""
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from surprise import SVD, Dataset, Reader
+from recommender.scoring import export_model, predict_pairs
+from recommender.tuning import (successive_halving, rung_fractions, sample_configs, save_results,
+                                load_best_params)
+
+
+def synthetic_ratings(users=40, items=30, per_user=12, seed=0):
+    rng = np.random.RandomState(seed)
+    rows = [(user, f'isbn{item}', int(rng.randint(1, 11)))
+            for user in range(users) for item in rng.choice(items, per_user, replace=False)]
+    return pd.DataFrame(rows, columns=['user_id', 'isbn', 'rating'])
+
+
+class SuccessiveHalvingTestCase(SimpleTestCase):
+    """Test case for tuning the SVD model"""
+
+    def test_rung_fractions_grow_by_eta_to_the_full_data(self):
+        self.assertEqual([round(fraction, 4) for fraction in rung_fractions(1 / 9, 3)], [0.1111, 0.3333, 1.0])
+        self.assertEqual(rung_fractions(1, 3), [1])
+
+    def test_sampled_configs_are_reproducible(self):
+        self.assertEqual(sample_configs(5, 1), sample_configs(5, 1))
+        self.assertEqual(set(sample_configs(1, 0)[0]), {'n_factors', 'n_epochs', 'lr_all', 'reg_all'})
+
+    def test_only_the_best_configurations_are_promoted(self):
+        results = successive_halving(synthetic_ratings(), n_configs=9, eta=3, n_jobs=1, log=lambda message: None)
+        self.assertEqual([len(rung['trials']) for rung in results['rungs']], [9, 3, 1])
+        promoted = {trial['config'] for trial in results['rungs'][1]['trials']}
+        first_rung = sorted(results['rungs'][0]['trials'], key=lambda trial: trial['rmse'])
+        self.assertEqual(promoted, {trial['config'] for trial in first_rung[:3]})
+        self.assertEqual(len(results['best']['learning_curve']), 3)
+        self.assertEqual(results['best']['rmse'], results['rungs'][-1]['trials'][0]['rmse'])
+
+    def test_best_params_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tuning_results.json')
+            self.assertEqual(load_best_params(path), {})
+            save_results({'best': {'params': {'n_factors': 20}}}, path)
+            self.assertEqual(load_best_params(path), {'n_factors': 20})
+
+    def test_pair_predictions_match_surprise(self):
+        ratings = synthetic_ratings()
+        trainset = Dataset.load_from_df(ratings, Reader(rating_scale=(1, 10))).build_full_trainset()
+        algo = SVD(n_factors=5, n_epochs=5, random_state=0)
+        algo.fit(trainset)
+        model = export_model(algo, trainset)
+        pairs = [(0, 'isbn1'), (3, 'isbn2'), (999, 'isbn1'), (0, 'unknown'), (999, 'unknown')]
+        user_rows = pd.Index(model['user_ids']).get_indexer([user for user, _ in pairs])
+        item_rows = pd.Index(model['isbns']).get_indexer([isbn for _, isbn in pairs])
+        expected = [algo.predict(user, isbn, clip=False).est for user, isbn in pairs]
+        np.testing.assert_allclose(predict_pairs(model, user_rows, item_rows), expected)
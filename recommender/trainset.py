@@ -0,0 +1,138 @@
+"""Surprise trainsets built from arrays instead of Dataset.load_from_df.
+
+Dataset.load_from_df copies every rating into a tuple and builds the id dictionaries and per-user and per-item
+rating lists one rating at a time in Python. ArrayTrainset keeps the ratings in NumPy arrays sorted by user and
+builds the dictionaries and lists only when an algorithm asks for them. SVD only iterates all_ratings(), so it
+never does.
+
+Inner ids are given in order of first appearance and every list keeps the order of the ratings, exactly as
+Dataset.load_from_df does, so an algorithm fitted on either trainset with the same random_state learns the same
+model.
+"""
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from surprise import Trainset
+
+RATING_SCALE = (1, 10)
+
+
+def grouped_pairs(keys, values, ratings, count):
+    """ A defaultdict from each key to its (value, rating) pairs, keeping the pairs in their original order """
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    pairs = list(zip(values[order].tolist(), ratings[order].tolist()))
+    bounds = np.searchsorted(sorted_keys, np.arange(count + 1)).tolist()
+    return defaultdict(list, {key: pairs[bounds[key]:bounds[key + 1]] for key in range(count)})
+
+
+def python_scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ArrayTrainset(Trainset):
+    """A Surprise Trainset over arrays of inner user ids, inner item ids and ratings.
+
+    raw_user_ids and raw_item_ids map inner ids to raw ids, as NumPy arrays.
+    """
+
+    def __init__(self, users, items, ratings, raw_user_ids, raw_item_ids, rating_scale=RATING_SCALE):
+        order = np.argsort(users, kind='stable')
+        self.users = users[order]
+        self.items = items[order]
+        self.ratings = ratings[order]
+        self._appearance_order = np.empty_like(order)
+        self._appearance_order[order] = np.arange(len(order))
+        self.raw_user_ids = raw_user_ids
+        self.raw_item_ids = raw_item_ids
+        self.n_users = len(raw_user_ids)
+        self.n_items = len(raw_item_ids)
+        self.n_ratings = len(ratings)
+        self.rating_scale = rating_scale
+        self._global_mean = None
+        self._ur = None
+        self._ir = None
+        self._raw2inner_users = None
+        self._raw2inner_items = None
+
+    @property
+    def ur(self):
+        if self._ur is None:
+            self._ur = grouped_pairs(self.users, self.items, self.ratings, self.n_users)
+        return self._ur
+
+    @property
+    def ir(self):
+        if self._ir is None:
+            appearance = self._appearance_order
+            self._ir = grouped_pairs(self.items[appearance], self.users[appearance], self.ratings[appearance],
+                                     self.n_items)
+        return self._ir
+
+    @property
+    def _raw2inner_id_users(self):
+        if self._raw2inner_users is None:
+            self._raw2inner_users = {raw: inner for inner, raw in enumerate(self.raw_user_ids.tolist())}
+        return self._raw2inner_users
+
+    @property
+    def _raw2inner_id_items(self):
+        if self._raw2inner_items is None:
+            self._raw2inner_items = {raw: inner for inner, raw in enumerate(self.raw_item_ids.tolist())}
+        return self._raw2inner_items
+
+    def knows_user(self, uid):
+        return isinstance(uid, (int, np.integer)) and 0 <= uid < self.n_users
+
+    def knows_item(self, iid):
+        return isinstance(iid, (int, np.integer)) and 0 <= iid < self.n_items
+
+    def to_raw_uid(self, iuid):
+        if not self.knows_user(iuid):
+            raise ValueError(str(iuid) + " is not a valid inner id.")
+        return python_scalar(self.raw_user_ids[iuid])
+
+    def to_raw_iid(self, iiid):
+        if not self.knows_item(iiid):
+            raise ValueError(str(iiid) + " is not a valid inner id.")
+        return python_scalar(self.raw_item_ids[iiid])
+
+    def all_ratings(self):
+        return zip(self.users.tolist(), self.items.tolist(), self.ratings.tolist())
+
+    @property
+    def global_mean(self):
+        if self._global_mean is None:
+            self._global_mean = np.mean(self.ratings)
+        return self._global_mean
+
+
+def build_trainset(user_index, item_index, ratings, raw_user_ids, raw_item_ids, rating_scale=RATING_SCALE):
+    """ Build a trainset from integer arrays indexing raw_user_ids and raw_item_ids, such as the rows and columns of
+    a sparse rating matrix. Users and items without ratings are left out """
+
+    users, user_rows = pd.factorize(np.asarray(user_index))
+    items, item_rows = pd.factorize(np.asarray(item_index))
+    return ArrayTrainset(users.astype(np.int64), items.astype(np.int64), np.asarray(ratings, dtype=np.float64),
+                         np.asarray(raw_user_ids)[user_rows], np.asarray(raw_item_ids, dtype=object)[item_rows],
+                         rating_scale)
+
+
+def trainset_from_df(ratings, rating_scale=RATING_SCALE):
+    """ The trainset Dataset.load_from_df(ratings).build_full_trainset() would build from user_id, isbn and rating
+    columns """
+
+    users, raw_user_ids = pd.factorize(ratings['user_id'])
+    items, raw_item_ids = pd.factorize(ratings['isbn'])
+    return ArrayTrainset(users.astype(np.int64), items.astype(np.int64),
+                         ratings['rating'].to_numpy(dtype=np.float64), np.asarray(raw_user_ids),
+                         np.asarray(raw_item_ids, dtype=object), rating_scale)
+
+
+def trainset_from_matrix(rating_matrix, rating_scale=RATING_SCALE):
+    """ The trainset of a {'user_ids', 'isbns', 'matrix'} rating matrix, as saved by the build_matrix stage """
+
+    coo = rating_matrix['matrix'].tocoo()
+    return build_trainset(coo.row, coo.col, coo.data, rating_matrix['user_ids'], rating_matrix['isbns'],
+                          rating_scale)
@@ -0,0 +1,106 @@
+"""Hyperparameter search for the SVD model with successive halving.
+
+Many random configurations are scored on a small subsample of the training ratings. Only the best 1/eta of them
+are promoted to a subsample eta times larger, until the survivors are trained on all of the training data. Every
+configuration is scored on the same held-out validation ratings.
+"""
+import json
+import math
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from surprise import SVD
+from recommender.scoring import export_model, predict_pairs
+from recommender.trainset import trainset_from_df
+
+TUNING_RESULTS_PATH = 'data/tuning_results.json'
+RATING_SCALE = (1, 10)
+
+
+def sample_configs(count, random_state):
+    """ Draw SVD configurations, with the learning and regularisation rates on a log scale """
+
+    rng = np.random.RandomState(random_state)
+    return [{
+        'n_factors': int(rng.choice([20, 50, 100, 150, 200])),
+        'n_epochs': int(rng.choice([10, 20, 30, 40])),
+        'lr_all': float(round(10 ** rng.uniform(-3, -1.5), 5)),
+        'reg_all': float(round(10 ** rng.uniform(-2.5, -0.5), 5)),
+    } for _ in range(count)]
+
+
+def split_ratings(ratings, validation_fraction, random_state):
+    """ Shuffle the ratings once and hold out a validation set. Subsamples are prefixes of the training part """
+
+    shuffled = ratings.sample(frac=1, random_state=random_state).reset_index(drop=True)
+    validation_size = int(len(shuffled) * validation_fraction)
+    return shuffled.iloc[validation_size:].reset_index(drop=True), shuffled.iloc[:validation_size]
+
+
+def validation_rmse(model, validation):
+    user_rows = pd.Index(model['user_ids']).get_indexer(validation['user_id'])
+    item_rows = pd.Index(model['isbns']).get_indexer(validation['isbn'])
+    predictions = np.clip(predict_pairs(model, user_rows, item_rows), *RATING_SCALE)
+    return float(np.sqrt(np.mean((predictions - validation['rating'].to_numpy()) ** 2)))
+
+
+def run_trial(params, train, validation, random_state):
+    start_time = time.perf_counter()
+    trainset = trainset_from_df(train, RATING_SCALE)
+    algo = SVD(random_state=random_state, **params)
+    algo.fit(trainset)
+    rmse = validation_rmse(export_model(algo, trainset), validation)
+    return {'params': params, 'rmse': rmse, 'seconds': round(time.perf_counter() - start_time, 3)}
+
+
+def rung_fractions(min_fraction, eta):
+    """ The subsample sizes of each rung, growing by eta until the whole training set """
+
+    rungs = max(0, math.ceil(round(math.log(1 / min_fraction, eta), 6)))
+    return [min(1.0, min_fraction * eta ** rung) for rung in range(rungs + 1)]
+
+
+def successive_halving(ratings, n_configs=27, eta=3, min_fraction=1 / 9, validation_fraction=0.2, n_jobs=-1,
+                       random_state=0, log=print):
+    train, validation = split_ratings(ratings, validation_fraction, random_state)
+    configs = sample_configs(n_configs, random_state)
+    history = {index: [] for index in range(len(configs))}
+    survivors = list(range(len(configs)))
+    rungs = []
+
+    for fraction in rung_fractions(min_fraction, eta):
+        subsample = train.iloc[:max(1, int(len(train) * fraction))]
+        log(f'Rung {len(rungs)}: {len(survivors)} configurations on {len(subsample)} ratings')
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(run_trial)(configs[index], subsample, validation, random_state) for index in survivors
+        )
+        for index, result in zip(survivors, results):
+            history[index].append({'fraction': fraction, 'rmse': result['rmse']})
+        rungs.append({'fraction': fraction, 'ratings': len(subsample),
+                      'trials': [dict(result, config=index) for index, result in zip(survivors, results)]})
+
+        ranked = [index for _, index in sorted(zip([result['rmse'] for result in results], survivors))]
+        survivors = ranked[:max(1, len(ranked) // eta)]
+
+    best = min(rungs[-1]['trials'], key=lambda trial: trial['rmse'])
+    return {
+        'best': {'params': best['params'], 'rmse': best['rmse'], 'learning_curve': history[best['config']]},
+        'rungs': rungs,
+        'validation_ratings': len(validation),
+    }
+
+
+def save_results(results, path=TUNING_RESULTS_PATH):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+
+
+def load_best_params(path=TUNING_RESULTS_PATH):
+    """ The winning SVD configuration, or no parameters if no search has been run """
+
+    try:
+        with open(path) as file:
+            return json.load(file)['best']['params']
+    except (OSError, ValueError, KeyError):
+        return {}
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bookclub.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +72,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'bookclub.context_processors.inbox',
+                'bookclub.context_processors.viewer',
             ],
         },
     },
@@ -89,6 +92,18 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The per-user club lists are cached in the database, so every process serving the app sees one copy and an
+# invalidation reaches them all at once. Migrating creates the table. Redis or Memcached are faster shared backends.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'bookclub_cache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -157,6 +172,25 @@ BOOKS_PER_PAGE = 10
 APPLICATIONS_PER_PAGE = 10
 CLUBS_PER_PAGE = 10
 POSTS_PER_PAGE = 10
+MESSAGES_PER_PAGE = 20
+SEARCH_RESULTS_PER_PAGE = 10
+
+# Home timelines keep the newest TIMELINE_LENGTH posts of each user. New posts are pushed to them in batches of
+# TIMELINE_BATCH_SIZE readers by a background thread, or inline as they are saved when TIMELINE_DELIVERY is 'inline'.
+# A process that exits waits up to TIMELINE_DRAIN_SECONDS for the posts still queued; keep it below the server's
+# graceful shutdown timeout
+TIMELINE_LENGTH = 500
+TIMELINE_BATCH_SIZE = 1000
+TIMELINE_DELIVERY = 'background'
+TIMELINE_DRAIN_SECONDS = 20
+
+# search_autocomplete suggests titles from a prefix index that build_autocomplete saves to AUTOCOMPLETE_INDEX_PATH.
+# Each process loads it again once it is rebuilt, checking at most every AUTOCOMPLETE_CHECK_SECONDS
+AUTOCOMPLETE_INDEX_PATH = 'data/autocomplete.p'
+AUTOCOMPLETE_CHECK_SECONDS = 30
+
+# Report the timing spans of each request in a Server-Timing response header
+TRACE_RESPONSE_HEADER = DEBUG
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -0,0 +1,15 @@
+"""Django settings for running the bookclub and recommender tests.
+
+Tests roll back their transactions, so nothing they write may outlive them in the cache and nothing waits on a
+commit that never comes. Nor may they suggest from the books of the development database.
+"""
+
+from system.settings import *
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+TIMELINE_DELIVERY = 'inline'
+AUTOCOMPLETE_INDEX_PATH = None
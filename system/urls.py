@@ -17,7 +17,7 @@ from django.urls import path
 from bookclub import views
 from bookclub.views import account_views, authentication_views, dashboard_views, book_views, club_views, user_views, \
     search_views, application_views, meeting_views, messaging_views, club_feed_views, post_views, user_feed_views, \
-    user_post_views
+    user_post_views, tracing_views
 from django.contrib.auth import views as auth_views
 
 urlpatterns = [
@@ -114,4 +114,5 @@ urlpatterns = [
           name='delete_meeting'),
      path('user_posts/', user_post_views.UserPostsView.as_view(), name='user_posts'),
      path('club_posts/', post_views.ClubPostsView.as_view(), name='club_posts'),
+     path('debug/traces/', tracing_views.trace_stats, name='trace_stats'),
 ]